@@ -0,0 +1,25 @@
+# -*-coding:Utf-8 -*
+
+"""
+Execute this file to analyse the balance of the maps of the game of roboc.
+The maps already analysed are read from the cache,
+unless the content of their file has changed since.
+"""
+
+import os
+
+import parameters.parameters as parameters
+from game_logic import balance
+
+if __name__ == '__main__':
+    results = balance.analyse_directory(parameters.dir_maps, parameters.balance_cache_file)
+    report = balance.format_report(results, parameters.balance_distance)
+
+    directory = os.path.dirname(parameters.balance_report_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(parameters.balance_report_file, "w") as report_file:
+        report_file.write(report)
+
+    print(report)
+    print("Rapport écrit dans {}.".format(parameters.balance_report_file))
@@ -0,0 +1,230 @@
+# -*-coding:Utf-8 -*
+
+"""
+This module contains the analysis of the balance of the maps:
+how long the players take to escape, and how fair the random spawns are.
+The results are cached by the content of the map files.
+"""
+
+import hashlib
+import heapq
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import parameters.parameters as parameters
+from game_logic import rules
+from game_logic.simulation import Simulation
+from graphical_layout.distance_field import PASSABLE, UNREACHABLE
+from graphical_layout.grid import WALL, EXIT
+from graphical_layout.map import Map
+from graphical_layout.map_loader import list_map_files
+from graphical_layout.map_parser import MapError
+from sessions.common_session_tools.bot_interactor import greedy
+
+# Version of the analysis, part of the keys of the cache.
+VERSION = 2
+
+# Reason why a valid map can't be analysed.
+NO_SPAWN_ERROR = "La carte {} n'a aucune case de départ."
+
+# Columns of the report: title and key of the result of the analysis of a map.
+COLUMNS = [
+    ("carte", "name"),
+    ("départs", "spawns"),
+    ("min", "shortest"),
+    ("moy", "average"),
+    ("<=K", "within_k"),
+    ("gain P", "drill_gain"),
+    ("gain P max", "drill_gain_max"),
+    ("écart", "spread"),
+    ("proche gagne", "closest_wins"),
+]
+
+
+def drilling_distances(grid):
+    """
+    Returns the number of turns from each cell to the exit when the players
+    may open doors in the walls: going through a wall costs one more turn,
+    to open the door. Computed with Dijkstra's algorithm from the exit.
+    """
+    cells = grid.cells
+    neighbours = tuple(grid.offsets.values())
+    distances = [UNREACHABLE] * len(cells)
+
+    exit_index = cells.find(EXIT)
+    distances[exit_index] = 0
+    heap = [(0, exit_index)]
+    while heap:
+        distance, index = heapq.heappop(heap)
+        if distance > distances[index]:
+            continue
+        # Turns to step into this cell from a neighbour.
+        cost = 2 if cells[index] == WALL else 1
+        for offset in neighbours:
+            neighbour = index + offset
+            if cells[neighbour] in PASSABLE or cells[neighbour] == WALL:
+                current = distances[neighbour]
+                if current == UNREACHABLE or current > distance + cost:
+                    distances[neighbour] = distance + cost
+                    heapq.heappush(heap, (distance + cost, neighbour))
+    return distances
+
+
+def analyse_map(name, content, settings):
+    """
+    Analyse the balance of one map.
+    Runs in the worker processes when the maps are analysed in parallel.
+    :param settings: dict of the settings of the analysis (see default_settings).
+    :return: dict of the results, or of the error if the map is invalid.
+    """
+    try:
+        game_map = Map(name, content)
+    except MapError as error:
+        return {"name": name, "error": str(error)}
+
+    grid = game_map.grid
+    field = game_map.get_distances()
+    drilling = drilling_distances(grid)
+
+    spawns = rules.spawn_positions(game_map)
+    if not spawns:
+        return {"name": name, "error": NO_SPAWN_ERROR.format(name)}
+    distances = [field.get(row, col) for row, col in spawns]
+    gains = [field.get(row, col) - drilling[grid.index(row, col)] for row, col in spawns]
+
+    # Spread of the distances to the exit between the players of a game,
+    # and how often the player closest to the exit wins when all play greedily.
+    players_number = min(settings["players"], len(spawns))
+    spread = 0
+    closest_wins = 0
+    for seed in range(0, settings["playouts"]):
+        simulation = Simulation(game_map, players_number, seed)
+        start = [field.get(r.row, r.col) for r in simulation.runners]
+        spread += max(start) - min(start)
+
+        winner = simulation.run(greedy, settings["max_rounds"], random.Random(seed))
+        if winner is not None and start[winner.identifier - 1] == min(start):
+            closest_wins += 1
+    playouts = max(1, settings["playouts"])
+
+    return {
+        "name": name,
+        "spawns": len(spawns),
+        "shortest": min(distances),
+        "average": sum(distances) / len(distances),
+        "within_k": sum(1 for distance in distances if distance <= settings["k"]),
+        "drill_gain": sum(gains) / len(gains),
+        "drill_gain_max": max(gains),
+        "spread": spread / playouts,
+        "closest_wins": closest_wins / playouts,
+    }
+
+
+def default_settings():
+    """
+    Returns the settings of the analysis, from the parameters.
+    """
+    return {"k": parameters.balance_distance,
+            "players": parameters.balance_players,
+            "playouts": parameters.balance_playouts,
+            "max_rounds": parameters.balance_max_rounds}
+
+
+def cache_key(content, settings):
+    """
+    Returns the key of the analysis of a map in the cache:
+    a hash of its content and of the settings of the analysis.
+    """
+    digest = hashlib.sha256(content.encode())
+    digest.update(json.dumps([VERSION, settings], sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+def analyse_directory(directory, cache_path=None, settings=None, workers=None):
+    """
+    Analyse all the maps of the directory, in the order of list_map_files.
+    The maps already analysed with the same content and settings are read from the cache.
+    If at least parameters.parallel_loading_threshold maps have to be analysed,
+    they are analysed in parallel by a pool of worker processes.
+    :param cache_path: location of the cache file, None for no cache.
+    :param workers: number of worker processes. By default, one per CPU.
+    :return: the list of the results.
+    """
+    if settings is None:
+        settings = default_settings()
+
+    cache = {}
+    if cache_path is not None:
+        try:
+            with open(cache_path, "r") as cache_file:
+                cache = json.load(cache_file)
+        except (OSError, ValueError):
+            cache = {}
+
+    keys = []
+    to_analyse = []
+    for map_name, map_path in list_map_files(directory):
+        with open(map_path, "r") as map_file:
+            content = map_file.read()
+        key = cache_key(content, settings)
+        keys.append((map_name, key))
+        if key not in cache:
+            to_analyse.append((key, map_name, content))
+
+    arguments = ([name for key, name, content in to_analyse],
+                 [content for key, name, content in to_analyse],
+                 [settings] * len(to_analyse))
+    if len(to_analyse) >= parameters.parallel_loading_threshold:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(analyse_map, *arguments))
+    else:
+        results = list(map(analyse_map, *arguments))
+
+    for (key, map_name, content), result in zip(to_analyse, results):
+        cache[key] = result
+
+    if cache_path is not None and to_analyse:
+        directory = os.path.dirname(cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Only the analyses of the current maps are kept.
+        used = {key: cache[key] for map_name, key in keys}
+        temporary_path = cache_path + '.tmp'
+        with open(temporary_path, "w") as cache_file:
+            json.dump(used, cache_file)
+        os.replace(temporary_path, cache_path)
+
+    # The name of a map is the name of its file, even if another file had the same content.
+    return [dict(cache[key], name=map_name) for map_name, key in keys]
+
+
+def format_report(results, k):
+    """
+    Returns the report of the analysis of the maps, as a compact text table.
+    """
+    titles = [title.replace("K", str(k)) for title, key in COLUMNS]
+    rows = []
+    errors = []
+    for result in results:
+        if "error" in result:
+            errors.append(result["error"])
+            continue
+        row = []
+        for title, key in COLUMNS:
+            value = result[key]
+            if key == "closest_wins":
+                row.append("{:.0%}".format(value))
+            elif isinstance(value, float):
+                row.append("{:.1f}".format(value))
+            else:
+                row.append(str(value))
+        rows.append(row)
+
+    widths = [max(len(row[i]) for row in [titles] + rows) for i in range(0, len(titles))]
+    lines = ["  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip()
+             for row in [titles] + rows]
+    for error in errors:
+        lines.append(" - {}".format(error))
+    return "\n".join(lines) + "\n"
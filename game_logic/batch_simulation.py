@@ -0,0 +1,195 @@
+# -*-coding:Utf-8 -*
+
+"""
+This module contains the class BatchSimulation.
+It plays thousands of headless games on the same map at once,
+with their states stored in NumPy arrays.
+
+NumPy is optional: the rest of the game doesn't need it.
+"""
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from game_logic import rules
+from graphical_layout.distance_field import PASSABLE, UNREACHABLE
+from graphical_layout.grid import WALL, DOOR, EXIT, OUTSIDE
+
+# Kinds of the commands: a move, or an instruction to create a door (P) or a wall (M).
+MOVE = 0
+OPEN = 1
+CLOSE = 2
+
+# Letter of each kind of command.
+KINDS = ('', 'P', 'M')
+
+# Policies choosing the commands of the players.
+POLICIES = ('random', 'greedy')
+
+
+class BatchSimulation:
+    """
+    Many games played on the same map, one step of all of them at once.
+
+    The grids of the games are stored as one array of cells per game,
+    aligned with the cells of the Grid of the map, and the positions
+    of the players as positions in these cells.
+    Each step plays the turn of the current player of every game still running,
+    with the rules of rules.check_move and rules.perform_move
+    applied to all the games together.
+    """
+
+    def __init__(self, game_map, games_number, players_number=1, seed=None):
+        """
+        Constructor of BatchSimulation.
+        The players are placed at random on the cells where they can appear.
+        :param game_map: map of the games.
+        :param games_number: number of games played at once.
+        :param players_number: number of players of each game.
+        :param seed: seed of the random number generator.
+        """
+        if numpy is None:
+            raise ImportError("BatchSimulation requires NumPy.")
+
+        self.game_map = game_map
+        grid = game_map.grid
+        self.random = numpy.random.default_rng(seed)
+
+        self.grids = numpy.tile(numpy.frombuffer(bytes(grid.cells), dtype=numpy.uint8),
+                                (games_number, 1))
+
+        # Offset of each direction, in the order of rules.DIRECTIONS.
+        self.offsets = numpy.array([grid.offsets[d] for d in rules.DIRECTIONS], dtype=numpy.int64)
+
+        # Distances of the cells to the exit on the map, for the greedy policy.
+        self.distances = numpy.array(game_map.get_distances().distances, dtype=numpy.int64)
+
+        # Each game draws distinct spawns for its players.
+        spawns = numpy.array([grid.index(row, col) for row, col in rules.spawn_positions(game_map)],
+                             dtype=numpy.int64)
+        if len(spawns) < players_number:
+            raise ValueError("Not enough cells for {} players.".format(players_number))
+        draws = self.random.random((games_number, len(spawns))).argsort(axis=1)[:, :players_number]
+        self.spawns = spawns[draws]
+        self.positions = self.spawns.copy()
+
+        # Whose turn it is to play, number of turns played, and the player who has won (-1 if none).
+        self.turn = numpy.zeros(games_number, dtype=numpy.int64)
+        self.how_many_rounds = numpy.zeros(games_number, dtype=numpy.int64)
+        self.winner = numpy.full(games_number, -1, dtype=numpy.int64)
+
+    def __len__(self):
+        return len(self.grids)
+
+    def running(self):
+        """
+        Returns the numbers of the games still running.
+        """
+        return numpy.flatnonzero(self.winner < 0)
+
+    def step(self, games, kinds, directions):
+        """
+        Play one turn in each of the given games.
+        :param games: numbers of the games.
+        :param kinds: kind of the command of the current player of each game.
+        :param directions: direction of the command, as an index in rules.DIRECTIONS.
+        """
+        players = self.turn[games]
+        positions = self.positions[games, players]
+        targets = positions + self.offsets[directions]
+        cells = self.grids[games, targets]
+
+        # rules.check_move, applied to all the games.
+        occupied = (self.positions[games] == targets[:, None]).any(axis=1)
+        valid = cells != OUTSIDE
+        valid &= (kinds != OPEN) | (cells == WALL)
+        valid &= (kinds != CLOSE) | (cells == DOOR)
+        valid &= (kinds != MOVE) | ((cells != WALL) & ~occupied)
+
+        # rules.perform_move.
+        opened = valid & (kinds == OPEN)
+        self.grids[games[opened], targets[opened]] = DOOR
+        closed = valid & (kinds == CLOSE)
+        self.grids[games[closed], targets[closed]] = WALL
+        moved = valid & (kinds == MOVE)
+        self.positions[games[moved], players[moved]] = targets[moved]
+
+        # rules.has_won, then the next turn of the games still running.
+        self.how_many_rounds[games] += 1
+        won = moved & (cells == EXIT)
+        self.winner[games[won]] = players[won]
+        going_on = games[~won]
+        self.turn[going_on] = (self.turn[going_on] + 1) % self.positions.shape[1]
+
+    def choose(self, games, policy):
+        """
+        Returns the kinds and directions of the commands chosen by the current players
+        of the given games, with the policy:
+        - "random": move in a random direction,
+        - "greedy": move to the free neighbour closest to the exit on the map,
+          ties broken at random, or at random if the exit can't be reached.
+        """
+        kinds = numpy.zeros(len(games), dtype=numpy.int64)
+        directions = self.random.integers(0, len(self.offsets), len(games))
+        if policy == 'random':
+            return kinds, directions
+
+        positions = self.positions[games, self.turn[games]]
+        neighbours = positions[:, None] + self.offsets[None, :]
+        distances = self.distances[neighbours].astype(numpy.float64)
+
+        cells = numpy.take_along_axis(self.grids[games], neighbours, axis=1)
+        blocked = ~numpy.isin(cells, list(PASSABLE)) | (distances == UNREACHABLE)
+        blocked |= (self.positions[games][:, :, None] == neighbours[:, None, :]).any(axis=1)
+
+        distances += self.random.random(distances.shape) * 0.5
+        distances[blocked] = numpy.inf
+        best = distances.argmin(axis=1)
+        reachable = numpy.isfinite(distances[numpy.arange(len(games)), best])
+        directions[reachable] = best[reachable]
+        return kinds, directions
+
+    def run(self, policy='greedy', max_rounds=None):
+        """
+        Play all the games until they are won, or until max_rounds turns are played.
+        """
+        games = self.running()
+        while len(games) > 0:
+            if max_rounds is not None:
+                games = games[self.how_many_rounds[games] < max_rounds]
+                if len(games) == 0:
+                    break
+            kinds, directions = self.choose(games, policy)
+            self.step(games, kinds, directions)
+            games = games[self.winner[games] < 0]
+
+    def stats(self):
+        """
+        Returns the number of turns of the games won: their distribution,
+        and their distribution for each spawn of the winner, by (row, col).
+        """
+        won = numpy.flatnonzero(self.winner >= 0)
+        turns = self.how_many_rounds[won]
+
+        by_spawn = {}
+        grid = self.game_map.grid
+        spawns = self.spawns[won, self.winner[won]]
+        for spawn in numpy.unique(spawns):
+            by_spawn[grid.position(int(spawn))] = distribution(turns[spawns == spawn])
+
+        return {"games": len(self), "won": len(won),
+                "turns": distribution(turns), "by_spawn": by_spawn}
+
+
+def distribution(turns):
+    """
+    Returns the distribution of an array of numbers of turns:
+    count, mean, minimum, median, 90th percentile and maximum.
+    """
+    if len(turns) == 0:
+        return {"count": 0}
+    return {"count": len(turns), "mean": float(turns.mean()), "min": int(turns.min()),
+            "median": float(numpy.median(turns)), "p90": float(numpy.percentile(turns, 90)),
+            "max": int(turns.max())}
@@ -1,280 +1,592 @@
-# -*-coding:Utf-8 -*
-
-
-import random
-from copy import deepcopy
-
-
-class Game:
-    """
-    One game is one attempt to escape a labyrinth.
-    """
-
-    def __init__(self, game_map, interactor):
-        """
-        Constructor of Game.
-        """
-
-        # Used to interact with the server
-        self.interactor = interactor
-
-        # The map (or labyrinth) the players have to escape from.
-        self.game_map = game_map
-
-        # The status of the game : ongoing or finished.
-        self.finished = False
-
-        # Store the winner
-        self.winner = None
-
-        # Stores the sockets used to communicate with each player
-        self.players = {}
-
-        # Stores all available positions for new players
-        self.available_positions = []
-        self.find_available_positions()
-
-        # The number of players
-        self.player_number = 0
-
-        # The number of players that left the game during the game.
-        self.gone_players_number = 0
-
-        # Whose turn it is to play among the players
-        self.turn = 0
-
-        # Store how many turns were played.
-        self.how_many_rounds = 0
-
-    def find_available_positions(self):
-        """
-        Find available positions for new players to come.
-        """
-        for i in range(0, self.game_map.height - 1):
-            for j in range(0, self.game_map.width - 1):
-                if self.game_map.grid[i][j] == " ":
-                    self.available_positions.append((i, j))
-
-    def add_player(self, player):
-        """
-        Add players to the game before it has started.
-        Computes their initial position at random
-        """
-
-        # Compute its initial position at random
-        position_choice = random.randint(0, len(self.available_positions)-1)
-        position = self.available_positions[position_choice]
-        player.row = position[0]
-        player.col = position[1]
-
-        # Compute identifier of the new player
-        player.identifier = self.player_number + 1
-
-        # Tells the player in which game it plays.
-        player.game = self
-        player.game_map = self.game_map
-
-        # Add the given player to the game
-        self.players[self.player_number] = player
-
-        # This position is not available anymore
-        self.available_positions.remove(position)
-
-        # Increment the number of players
-        self.player_number += 1
-
-    def launch(self):
-        """
-        Called at the beginning of the game.
-        - Greets all the players and makes them ready for the new game,
-        - Sends them the instructions and the current state of the game,
-        - Ask for the first move of the first player.
-        """
-        for player in self.players.values():
-            player.greet()
-
-        self.send_all('La partie commence! '
-                      'Vous devez vous échapper du labyrinthe...')
-        self.send_all(self.get_instructions())
-        self.send_all(self.get_current_state())
-
-        player = self.players[self.turn]
-
-        # Skip a line in the client
-        self.send_all("$", server=False)
-
-        # Inform the other players it is the turn of player.
-        message = "\nC'est au tour du Joueur {}.".format(player.identifier)
-        self.send_all(message, server=True, except_player=player)
-
-        # Tell the first player it is his / her turn to play.
-        player.ask_move()
-
-    def play(self):
-        """
-        Play one entire game.
-        - Launch the game.
-        - Then ask each player for his/her next move.
-        - Perform the move if it is valid
-        - Continue until one of the players has won the game.
-        """
-
-        self.launch()
-
-        # Game loop. Each iteration of the loop is one move from a player.
-        while not self.finished:
-
-            # Listen to the connected clients.
-            # For now, we only pay attention to the client whose turn it is to play.
-            player = self.players[self.turn]
-
-            while player.current_step is None:
-                self.wait_for_current_step()
-
-            if self.player_number == self.gone_players_number:
-                # Everyone has left the game
-                self.finished = True
-                break
-
-            if not player.has_left:
-                if player.check_move():
-                    player.perform_move()
-
-                # Increment the number of rounds played
-                self.how_many_rounds += 1
-
-                # Check if the player has won
-                self.finished = player.has_won()
-
-            self.next_turn()
-
-    def wait_for_current_step(self):
-        """
-        Scan all the messages received from the players.
-        Continue until the player whose turn it is to play
-        has sent a valid input.
-
-        If the future, the messages received here from the
-        other players could be used to implement a chat.
-        """
-        player = self.players[self.turn]
-
-        players_talking = []
-        for p in self.players.values():
-            selected = p.select(p is player)
-            if selected is not None:
-                players_talking.append(selected)
-
-        # Read messages received from clients
-        for p in players_talking:
-            received_message = p.recv()
-
-            if received_message == '0':
-                # A player has left the game.
-                message = "Le Joueur {} a quitté la partie.".format(p.identifier)
-                self.send_all(message, server=True, except_player=p)
-                p.send("Vous avez quitté la partie. Au revoir!")
-                p.send("0")
-                p.close()
-                self.gone_players_number += 1
-                player.current_step = "0"
-
-            if p is not player:
-                # For now, we just answer the player that
-                # it is not his/her turn to play.
-                # In the future, we could send the message
-                # to another player and make a chat.
-                p.send("Ce n'est pas encore à votre tour de jouer.")
-
-            elif not p.has_left:
-                # Get the input from the player whose turn it is to play.
-                move = received_message.upper()
-                if not player.check_input(move):
-                    player.send("Saisie incorrecte. "
-                                "Pour revoir les instructions, saisissez I.")
-                elif move == "I":
-                    player.send(self.get_instructions())
-                else:
-                    player.preprocess_move(move)
-
-    def next_turn(self):
-        """
-        Once the player whose turn it is has made a move,
-        go on to the next turn.
-        """
-        player = self.players[self.turn]
-        identifier = player.identifier
-        step = player.current_step
-
-        if self.finished:
-            self.winner = player
-            message = "Le Joueur {} a gagné la partie.".format(identifier)
-            self.send_all(message, server=True)
-        else:
-            if not player.has_left:
-                message = "Le Joueur {0} a joué {1}.".format(identifier, step)
-                self.send_all(message, server=True)
-
-                self.send_all(self.get_current_state())
-
-            next_player = None
-            while next_player is None or next_player.has_left:
-                self.turn += 1
-                self.turn = self.turn % self.player_number
-                next_player = self.players[self.turn]
-
-            next_id = next_player.identifier
-
-            # Skip a line in the client
-            self.send_all("$", server=False)
-
-            # Inform the other players it is the turn of next_player.
-            message = "\nC'est au tour du Joueur {}.".format(next_id)
-            self.send_all(message, server=True, except_player=next_player)
-
-            # Tell the next player it is his / her turn to play.
-            next_player.ask_move()
-
-    def send_all(self, message, server=False, except_player=None):
-        """
-        Send message to every player in the game.
-        If server is True, print the message to the server console.
-        If except_player is not None, don't send the message to him/her.
-        """
-        recipients = list(self.players.values())
-        if except_player is not None:
-            recipients.remove(except_player)
-        for player in recipients:
-            player.send(message)
-        if server:
-            self.interactor.print(message)
-
-    @staticmethod
-    def get_instructions():
-        """
-        Returns the instructions to play the game.
-        """
-        instructions = """\nLes commandes à votre disposition sont les suivantes:
-            - Les 4 directions : N (Nord), S (Sud), E (Est) et O (Ouest);
-            - Une direction suivie d'un nombre n > 0, pour avancer de n cases;
-            - M et une direction, pour murer une porte;
-            - P et une direction, pour Ouvrir une porte dans un mur.
-            - Pour revoir ces instructions, saisissez I. 
-            - Pour quitter, saisissez Ctrl + C ou Q.\n
-            """
-        return instructions
-
-    def get_current_state(self):
-        """
-        Returns a byte string containing the current state
-        of the game with the positions of each player.
-        Each player is represented on the map by his / her identifier.
-        """
-        shown_grid = deepcopy(self.game_map.grid)
-
-        # Position each player on the map
-        for player in self.players.values():
-            shown_grid[player.row][player.col] = str(player.identifier)
-
-        result = ''.join([c for row in shown_grid for c in row + ["\n"]])
-        return '\n'+result
+# -*-coding:Utf-8 -*
+
+import random
+
+import parameters.parameters as parameters
+from graphical_layout import frames
+from game_logic import rules
+from game_logic.occupancy import Occupancy
+from game_logic.replay import ReplayWriter
+from game_logic.scheduler import Scheduler
+from graphical_layout.render_cache import RenderCache
+
+
+class Game:
+    """
+    One game is one attempt to escape a labyrinth.
+    """
+
+    def __init__(self, game_map, interactor, scheduler=None, seed=None):
+        """
+        Constructor of Game.
+        :param scheduler: Scheduler running the deadlines of the game.
+                          It can be shared by several games.
+        :param seed: seed of the random number generator placing the players.
+                     If None, it is drawn at random.
+        """
+
+        # Used to interact with the server
+        self.interactor = interactor
+
+        # The map (or labyrinth) the players have to escape from.
+        self.game_map = game_map
+
+        # The status of the game : ongoing or finished.
+        self.finished = False
+
+        # Store the winner
+        self.winner = None
+
+        # Stores the sockets used to communicate with each player
+        self.players = {}
+
+        # Knows which player stands on each cell.
+        self.occupancy = Occupancy(self.find_available_positions())
+
+        # Stores all available positions for new players
+        self.available_positions = self.occupancy.free
+
+        # The number of players
+        self.player_number = 0
+
+        # The number of players that left the game during the game.
+        self.gone_players_number = 0
+
+        # Whose turn it is to play among the players
+        self.turn = 0
+
+        # Store how many turns were played.
+        self.how_many_rounds = 0
+
+        # Rendered state of the game, built when it is first needed.
+        self.render_cache = None
+
+        # Cells changed since the last state update sent to the players.
+        self.changed_cells = set()
+
+        # Number of deltas sent since the last keyframe.
+        self.deltas_since_keyframe = 0
+
+        # Runs the deadline of the current turn and of the whole game.
+        self.scheduler = scheduler if scheduler is not None else Scheduler()
+        self.turn_timer = None
+        self.game_timer = None
+
+        # Called when the game ends because of a deadline.
+        self.on_finished = None
+
+        # Places the players at random. Its seed is recorded in the replay log.
+        self.seed = seed if seed is not None else random.getrandbits(63)
+        self.generator = random.Random(self.seed)
+
+        # Replay log of the game, opened when the game is launched.
+        self.replay = None
+
+    def find_available_positions(self):
+        """
+        Returns the available positions for new players to come:
+        the blanks from which the exit can be reached.
+        """
+        return rules.spawn_positions(self.game_map)
+
+    def add_player(self, player):
+        """
+        Add players to the game before it has started.
+        Computes their initial position at random
+        """
+
+        # Compute its initial position at random
+        position = self.available_positions.sample(self.generator)
+        player.row = position[0]
+        player.col = position[1]
+
+        # Compute identifier of the new player
+        player.identifier = self.player_number + 1
+
+        # Tells the player in which game it plays.
+        player.game = self
+        player.game_map = self.game_map
+
+        # Add the given player to the game
+        self.players[self.player_number] = player
+
+        # This position is not available anymore
+        self.occupancy.add(player)
+
+        # The players shown on the grid have changed.
+        self.render_cache = None
+
+        # Increment the number of players
+        self.player_number += 1
+
+    def launch(self):
+        """
+        Called at the beginning of the game.
+        - Greets all the players and makes them ready for the new game,
+        - Sends them the instructions and the current state of the game,
+        - Ask for the first move of the first player.
+        """
+        self.start_replay()
+        self.cork_all()
+
+        for player in self.players.values():
+            player.greet()
+
+        self.send_all('La partie commence! '
+                      'Vous devez vous échapper du labyrinthe...')
+        self.send_all(self.get_instructions())
+        self.send_all(self.get_keyframe())
+
+        player = self.players[self.turn]
+
+        # Skip a line in the client
+        self.send_all("$", server=False)
+
+        # Inform the other players it is the turn of player.
+        message = "\nC'est au tour du Joueur {}.".format(player.identifier)
+        self.send_all(message, server=True, except_player=player)
+
+        # Tell the first player it is his / her turn to play.
+        player.ask_move()
+        self.start_turn_timer()
+
+        if parameters.game_timeout is not None:
+            self.game_timer = self.scheduler.schedule(parameters.game_timeout, self.game_expired)
+
+        self.flush_all()
+
+    def play(self):
+        """
+        Play one entire game.
+        - Launch the game.
+        - Then ask each player for his/her next move.
+        - Perform the move if it is valid
+        - Continue until one of the players has won the game.
+        """
+
+        self.launch()
+
+        # Game loop. Each iteration of the loop is one move from a player.
+        while not self.finished:
+
+            # Listen to the connected clients.
+            # For now, we only pay attention to the client whose turn it is to play.
+            player = self.players[self.turn]
+
+            while player.current_step is None and not self.finished:
+                self.wait_for_current_step()
+                self.scheduler.run_due()
+
+                # The turn may have been skipped by its deadline.
+                player = self.players[self.turn]
+
+            self.advance()
+
+    def advance(self):
+        """
+        Play the turns of the players whose next move is already known.
+        Stop when the game is over, or when the game has to wait
+        for the move of the player whose turn it is to play.
+
+        Called by play once the current player has sent a valid input.
+        Sessions receiving the messages of the players themselves
+        call it after each message passed to handle_message.
+        """
+        while not self.finished:
+            player = self.players[self.turn]
+            if player.current_step is None:
+                break
+
+            if self.player_number == self.gone_players_number:
+                # Everyone has left the game
+                self.finished = True
+                break
+
+            self.play_turn()
+
+        if self.finished:
+            self.end()
+
+    def play_turn(self):
+        """
+        Play the current move of the player whose turn it is to play,
+        then go on to the next turn.
+        """
+        player = self.players[self.turn]
+
+        # The messages of this turn are sent together at the end of the turn.
+        self.cork_all()
+
+        if not player.has_left:
+            # The player is active again.
+            player.missed_turns = 0
+
+            if player.check_move():
+                player.perform_move()
+                self.record_step(player)
+
+            # Increment the number of rounds played
+            self.how_many_rounds += 1
+            if self.replay is not None:
+                self.replay.end_turn(self)
+
+            # Check if the player has won
+            self.finished = player.has_won()
+
+        self.next_turn()
+
+        self.flush_all()
+
+    def wait_for_current_step(self):
+        """
+        Scan all the messages received from the players.
+        Continue until the player whose turn it is to play
+        has sent a valid input.
+
+        If the future, the messages received here from the
+        other players could be used to implement a chat.
+        """
+        player = self.players[self.turn]
+
+        players_talking = []
+        for p in self.players.values():
+            selected = p.select(p is player)
+            if selected is not None:
+                players_talking.append(selected)
+
+        # Read messages received from clients
+        for p in players_talking:
+            self.handle_message(p, p.recv())
+
+    def handle_message(self, p, received_message):
+        """
+        Handle a message received from the player p.
+        If p is the player whose turn it is to play,
+        and the message is a valid move, it becomes his/her current step.
+        """
+        player = self.players[self.turn]
+
+        if received_message == '0':
+            self.leave(p)
+            if p is player:
+                # The turn of the player who has left is over.
+                player.current_step = "0"
+
+        move = received_message.upper()
+        commands = move.split()
+
+        if p.has_left:
+            pass
+
+        elif move == "A":
+            # The player cancels the commands sent in advance.
+            p.cancel_commands()
+            p.send("Vos commandes en attente sont annulées.")
+
+        elif p is not player:
+            if p.check_script(commands):
+                # The commands will be played at the next turns of the player.
+                p.queue_commands(commands)
+                p.send("Ces commandes seront jouées à vos prochains tours.")
+            else:
+                # For now, we just answer the player that
+                # it is not his/her turn to play.
+                # In the future, we could send the message
+                # to another player and make a chat.
+                p.send("Ce n'est pas encore à votre tour de jouer.")
+
+        elif len(commands) > 1:
+            # Play the first command now, and the next ones at the next turns.
+            if player.check_script(commands):
+                player.queue_commands(commands[1:])
+                player.preprocess_move(commands[0])
+            else:
+                player.send("Saisie incorrecte. "
+                            "Pour revoir les instructions, saisissez I.")
+
+        else:
+            # Get the input from the player whose turn it is to play.
+            if not player.check_input(move):
+                player.send("Saisie incorrecte. "
+                            "Pour revoir les instructions, saisissez I.")
+            elif move == "I":
+                player.send(self.get_instructions())
+            else:
+                player.preprocess_move(move)
+
+    def leave(self, p):
+        """
+        The player p leaves the game. His/her cell is freed.
+        """
+        message = "Le Joueur {} a quitté la partie.".format(p.identifier)
+        self.send_all(message, server=True, except_player=p)
+        p.send("Vous avez quitté la partie. Au revoir!")
+        p.send("0")
+        p.close()
+        self.gone_players_number += 1
+        if self.replay is not None:
+            self.replay.leave(p)
+
+        self.occupancy.remove(p)
+        self.mark_changed(p.row, p.col)
+
+    def next_turn(self):
+        """
+        Once the player whose turn it is has made a move,
+        go on to the next turn.
+        """
+        player = self.players[self.turn]
+        identifier = player.identifier
+        step = player.current_step
+
+        if self.finished:
+            self.winner = player
+            message = "Le Joueur {} a gagné la partie.".format(identifier)
+            self.send_all(message, server=True)
+        else:
+            if not player.has_left:
+                message = "Le Joueur {0} a joué {1}.".format(identifier, step)
+                self.send_all(message, server=True)
+
+                self.send_all(self.get_state_update())
+
+            self.pass_turn()
+
+    def pass_turn(self):
+        """
+        Give the turn to the next player who hasn't left the game,
+        and ask him/her for his/her next move.
+        """
+        next_player = None
+        while next_player is None or next_player.has_left:
+            self.turn += 1
+            self.turn = self.turn % self.player_number
+            next_player = self.players[self.turn]
+
+        next_id = next_player.identifier
+
+        # Skip a line in the client
+        self.send_all("$", server=False)
+
+        # Inform the other players it is the turn of next_player.
+        message = "\nC'est au tour du Joueur {}.".format(next_id)
+        self.send_all(message, server=True, except_player=next_player)
+
+        # Tell the next player it is his / her turn to play.
+        next_player.ask_move()
+        self.start_turn_timer()
+
+    def start_turn_timer(self):
+        """
+        Start the deadline of the turn that has just begun.
+        """
+        if self.turn_timer is not None:
+            self.turn_timer.cancel()
+            self.turn_timer = None
+
+        if parameters.turn_timeout is not None:
+            player = self.players[self.turn]
+            self.turn_timer = self.scheduler.schedule(parameters.turn_timeout,
+                                                      self.turn_expired, player)
+
+    def start_replay(self):
+        """
+        Open the replay log of the game, once the players are placed.
+        """
+        if parameters.record_replays:
+            self.replay = ReplayWriter.create(self)
+
+    def record_step(self, player):
+        """
+        Record in the replay log the step the player has just performed.
+        """
+        if self.replay is not None:
+            self.replay.step(player, player.current_step)
+
+    def end(self):
+        """
+        Called once the game is over: cancel the deadlines, and write the end of the replay log.
+        """
+        self.stop_timers()
+        if self.replay is not None:
+            self.replay.close()
+            self.replay = None
+
+    def stop_timers(self):
+        """
+        Cancel the deadlines of the game once it is over.
+        """
+        for timer in [self.turn_timer, self.game_timer]:
+            if timer is not None:
+                timer.cancel()
+        self.turn_timer = None
+        self.game_timer = None
+
+    def turn_expired(self, player):
+        """
+        Called when the player whose turn it is hasn't played in time.
+        The player skips his/her turn. After parameters.max_missed_turns
+        turns missed in a row, he/she forfeits and leaves the game.
+        """
+        self.turn_timer = None
+        if self.finished or player is not self.players[self.turn] or player.current_step is not None:
+            return
+
+        player.missed_turns += 1
+        if player.missed_turns >= parameters.max_missed_turns:
+            message = "Le Joueur {} a déclaré forfait.".format(player.identifier)
+            self.send_all(message, server=True, except_player=player)
+            player.send("Vous n'avez pas joué depuis {} tours : vous déclarez forfait."
+                        .format(player.missed_turns))
+            self.handle_message(player, "0")
+        else:
+            self.cork_all()
+            message = "Temps écoulé : le Joueur {} passe son tour.".format(player.identifier)
+            self.send_all(message, server=True)
+            self.pass_turn()
+            self.flush_all()
+
+        self.advance()
+        if self.finished and self.on_finished is not None:
+            self.on_finished()
+
+    def game_expired(self):
+        """
+        Called when the game has lasted parameters.game_timeout seconds.
+        The game is over, without any winner.
+        """
+        self.game_timer = None
+        if self.finished:
+            return
+
+        self.finished = True
+        self.end()
+        self.send_all("Temps écoulé : la partie est terminée sans vainqueur.", server=True)
+        if self.on_finished is not None:
+            self.on_finished()
+
+    def send_all(self, message, server=False, except_player=None):
+        """
+        Send message to every player in the game.
+        The message is either a string or bytes already encoded.
+        If server is True, print the message to the server console.
+        If except_player is not None, don't send the message to him/her.
+        """
+        # The message is encoded once for all the recipients.
+        if isinstance(message, bytes):
+            data = message + b'\n'
+        else:
+            data = message.encode() + b'\n'
+        for player in self.players.values():
+            if player is not except_player:
+                player.post(data)
+        if server:
+            self.interactor.print(message)
+
+    def cork_all(self):
+        """
+        Hold back the messages sent to the players until flush_all is called.
+        """
+        for player in self.players.values():
+            player.cork()
+
+    def flush_all(self):
+        """
+        Send to each player all the messages held back since cork_all was called.
+        """
+        for player in self.players.values():
+            player.flush()
+
+    @staticmethod
+    def get_instructions():
+        """
+        Returns the instructions to play the game.
+        """
+        instructions = """\nLes commandes à votre disposition sont les suivantes:
+            - Les 4 directions : N (Nord), S (Sud), E (Est) et O (Ouest);
+            - Une direction suivie d'un nombre n > 0, pour avancer de n cases;
+            - M et une direction, pour murer une porte;
+            - P et une direction, pour Ouvrir une porte dans un mur.
+            - Plusieurs commandes séparées par des espaces (ex: E3 PN N2 MS),
+              jouées une par tour, même avant votre tour. Saisissez A pour les annuler.
+            - Pour revoir ces instructions, saisissez I. 
+            - Pour quitter, saisissez Ctrl + C ou Q.\n
+            """
+        return instructions
+
+    def mark_changed(self, row, col):
+        """
+        Record that the cell (row, col) has changed,
+        so that it is part of the next state update.
+        Update the rendered state accordingly.
+        """
+        self.changed_cells.add((row, col))
+
+        if self.render_cache is not None:
+            player = self.occupancy.get(row, col)
+            if player is not None:
+                character = frames.glyph(player.identifier)
+            else:
+                character = chr(self.game_map.grid.get(row, col))
+            self.render_cache.patch(row, col, character)
+
+    def get_render_cache(self):
+        """
+        Returns the rendered state of the game.
+        The cache is built the first time, with the players on the grid.
+        """
+        if self.render_cache is None:
+            self.render_cache = RenderCache(self.game_map)
+            for (row, col), player in self.occupancy.occupants.items():
+                self.render_cache.patch(row, col, frames.glyph(player.identifier))
+        return self.render_cache
+
+    def get_state_update(self):
+        """
+        Returns the frame to send to the players after a move:
+        - Periodically, a keyframe containing the whole grid,
+        - Otherwise, a delta containing only the cells that changed.
+        """
+        if self.deltas_since_keyframe >= parameters.keyframe_interval:
+            return self.get_keyframe()
+
+        render_cache = self.get_render_cache()
+        cells = [(row, col, render_cache.get(row, col))
+                 for row, col in sorted(self.changed_cells)]
+        positions = self.get_shared_positions(self.changed_cells)
+
+        self.changed_cells.clear()
+        self.deltas_since_keyframe += 1
+        return frames.encode_delta(cells, positions)
+
+    def get_keyframe(self):
+        """
+        Returns a keyframe containing the whole grid with the players, as bytes.
+        """
+        self.changed_cells.clear()
+        self.deltas_since_keyframe = 0
+        positions = self.get_shared_positions(self.occupancy.occupants)
+        return self.get_render_cache().keyframe() + frames.encode_positions(positions).encode()
+
+    def get_shared_positions(self, cells):
+        """
+        Returns the positions of the players standing on the given cells
+        who are shown with the shared glyph, as tuples (identifier, row, col).
+        """
+        if self.player_number <= len(frames.GLYPHS):
+            return []
+
+        positions = []
+        for row, col in sorted(cells):
+            player = self.occupancy.get(row, col)
+            if player is not None and player.identifier > len(frames.GLYPHS):
+                positions.append((player.identifier, row, col))
+        return positions
+
+    def get_current_state(self):
+        """
+        Returns a string containing the current state
+        of the game with the positions of each player.
+        Each player is represented on the map by his / her identifier.
+        """
+        return '\n' + self.get_render_cache().text()
@@ -0,0 +1,115 @@
+# -*-coding:Utf-8 -*
+
+"""
+This module contains the classes Occupancy and FreeCells.
+They index the cells of the map of a game by their occupant.
+"""
+
+import random
+
+
+class FreeCells:
+    """
+    Set of the free cells where a new player can appear.
+    A cell can be added, removed or drawn at random in constant time.
+    """
+
+    def __init__(self, positions):
+        """
+        Constructor of FreeCells.
+        :param positions: list of (row, col) of the free cells.
+        """
+        self.positions = list(positions)
+
+        # Index of each cell in positions.
+        self.indexes = {position: i for i, position in enumerate(self.positions)}
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, position):
+        return position in self.indexes
+
+    def __iter__(self):
+        return iter(self.positions)
+
+    def add(self, position):
+        """
+        Add a free cell.
+        """
+        if position not in self.indexes:
+            self.indexes[position] = len(self.positions)
+            self.positions.append(position)
+
+    def remove(self, position):
+        """
+        Remove a free cell: the last cell takes its place in positions.
+        """
+        i = self.indexes.pop(position)
+        last = self.positions.pop()
+        if i < len(self.positions):
+            self.positions[i] = last
+            self.indexes[last] = i
+
+    def sample(self, generator=random):
+        """
+        Returns a free cell drawn at random.
+        :param generator: random number generator used.
+        """
+        return self.positions[generator.randrange(len(self.positions))]
+
+
+class Occupancy:
+    """
+    Occupancy of the cells of the map of a game.
+    Knows which player stands on each cell, and which cells are free
+    for new players.
+    """
+
+    def __init__(self, positions):
+        """
+        Constructor of Occupancy.
+        :param positions: list of (row, col) of the cells where a player can appear.
+        """
+        # Player standing on each occupied cell.
+        self.occupants = {}
+
+        # Cells where a player can appear, and those among them which are free.
+        self.spawns = frozenset(positions)
+        self.free = FreeCells(positions)
+
+    def get(self, row, col):
+        """
+        Returns the player standing on the cell (row, col), or None.
+        """
+        return self.occupants.get((row, col))
+
+    def add(self, player):
+        """
+        Place a player on the cell of his/her position.
+        """
+        position = (player.row, player.col)
+        self.occupants[position] = player
+        if position in self.free:
+            self.free.remove(position)
+
+    def remove(self, player):
+        """
+        Remove a player from the cell of his/her position.
+        """
+        position = (player.row, player.col)
+        if self.occupants.get(position) is player:
+            del self.occupants[position]
+            if position in self.spawns:
+                self.free.add(position)
+
+    def move(self, player, old_row, old_col):
+        """
+        Move a player from the cell (old_row, old_col) to the cell of his/her position.
+        """
+        old_position = (old_row, old_col)
+        if self.occupants.get(old_position) is player:
+            del self.occupants[old_position]
+            if old_position in self.spawns:
+                self.free.add(old_position)
+        self.add(player)
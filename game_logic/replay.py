@@ -0,0 +1,342 @@
+# -*-coding:Utf-8 -*
+
+"""
+This module contains the replay logs of the games.
+A ReplayWriter records a game in an append-only binary log,
+and a Replay reads it back to rebuild the state of the game at any turn.
+
+Format of a log:
+- A header: the hash of the map, the seed of the game,
+  the size of the map and the spawn of each player.
+- Then one event after the other:
+  - A step played by a player: one byte for the step, and the index of the player,
+  - The departure of a player: one byte, and the index of the player,
+  - A turn where nothing changed: one byte,
+  - Periodically, a snapshot of the whole state of the game.
+  The end of each turn is marked by a flag in the byte of its last event.
+  The numbers are encoded as varints: one byte up to 127.
+"""
+
+import hashlib
+import os
+import struct
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import parameters.parameters as parameters
+from game_logic import rules
+from game_logic.occupancy import Occupancy
+from game_logic.simulation import Runner
+
+# Identifies a replay log, and the version of its format.
+MAGIC = b'RBRP'
+VERSION = 1
+
+# Header: magic, version, hash of the map, seed, width, height,
+# number of players, number of turns between two snapshots.
+HEADER = struct.Struct('<4sB32sQHHHH')
+
+# Spawn of a player: row, column.
+SPAWN = struct.Struct('<HH')
+
+# Codes of the events: the steps, in this order, then the other events.
+STEPS = ['N', 'E', 'S', 'O', 'PN', 'PE', 'PS', 'PO', 'MN', 'ME', 'MS', 'MO']
+STEP_CODES = {step: code for code, step in enumerate(STEPS)}
+LEAVE = 12
+PASS = 13
+SNAPSHOT = 14
+
+# Flag of the event ending a turn.
+END_OF_TURN = 0x10
+CODE_MASK = 0x0f
+
+# Writes the logs to the disk, one chunk after the other, out of the game loop.
+flusher = None
+
+
+def map_hash(grid):
+    """
+    Returns the hash of the cells of the grid of a map.
+    """
+    return hashlib.sha256(bytes(grid.cells)).digest()
+
+
+def encode_varint(value, buffer):
+    """
+    Append the varint encoding of a number to the buffer.
+    """
+    while value >= 0x80:
+        buffer.append((value & 0x7f) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def decode_varint(data, offset):
+    """
+    Returns the number encoded as a varint at offset in data,
+    and the offset of the next byte.
+    """
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def append_to_file(path, chunk):
+    """
+    Append a chunk of a log to its file.
+    """
+    with open(path, 'ab') as log_file:
+        log_file.write(chunk)
+
+
+class ReplayWriter:
+    """
+    Records the events of a game.
+    The events are encoded in a buffer in memory. Once the buffer is full,
+    and when the game is over, it is appended to the file of the log
+    by a background thread.
+    """
+
+    def __init__(self, path, game):
+        """
+        Constructor of ReplayWriter. Encodes the header of the log.
+        Called when the game is launched, before any move.
+        :param path: location of the file of the log.
+        :param game: game recorded.
+        """
+        self.path = path
+        self.buffer = bytearray()
+
+        # Position in the buffer of the byte of the last event, or None.
+        self.last_event = None
+
+        self.interval = parameters.replay_snapshot_interval
+        game_map = game.game_map
+        self.buffer += HEADER.pack(MAGIC, VERSION, map_hash(game_map.grid), game.seed,
+                                   game_map.width, game_map.height,
+                                   game.player_number, self.interval)
+        for i in range(0, game.player_number):
+            player = game.players[i]
+            self.buffer += SPAWN.pack(player.row, player.col)
+
+    @classmethod
+    def create(cls, game):
+        """
+        Returns a writer of the log of a game, in a new file of parameters.replay_dir.
+        """
+        os.makedirs(parameters.replay_dir, exist_ok=True)
+        path = os.path.join(parameters.replay_dir, uuid.uuid4().hex + '.rpl')
+        return cls(path, game)
+
+    def step(self, player, step):
+        """
+        Record a step played by the player.
+        Only the steps of STEPS change the state of the game: the others are not recorded.
+        """
+        if step not in STEP_CODES:
+            return
+        self.last_event = len(self.buffer)
+        self.buffer.append(STEP_CODES[step])
+        encode_varint(player.identifier - 1, self.buffer)
+
+    def leave(self, player):
+        """
+        Record the departure of the player.
+        """
+        self.last_event = len(self.buffer)
+        self.buffer.append(LEAVE)
+        encode_varint(player.identifier - 1, self.buffer)
+
+    def end_turn(self, game):
+        """
+        Record the end of a turn of the game,
+        and a snapshot of the game every self.interval turns.
+        """
+        if self.last_event is None:
+            self.buffer.append(PASS | END_OF_TURN)
+        else:
+            self.buffer[self.last_event] |= END_OF_TURN
+            self.last_event = None
+
+        if self.interval and game.how_many_rounds % self.interval == 0:
+            self.snapshot(game)
+
+        if len(self.buffer) >= parameters.replay_buffer_size:
+            self.flush()
+
+    def snapshot(self, game):
+        """
+        Record the whole state of the game: its turn, grid and the positions of the players.
+        The players who have left are at position 0.
+        """
+        grid = game.game_map.grid
+        self.buffer.append(SNAPSHOT)
+        encode_varint(game.how_many_rounds, self.buffer)
+        cells = zlib.compress(bytes(grid.cells))
+        encode_varint(len(cells), self.buffer)
+        self.buffer += cells
+        for i in range(0, game.player_number):
+            player = game.players[i]
+            encode_varint(0 if player.has_left else grid.index(player.row, player.col), self.buffer)
+
+    def flush(self):
+        """
+        Hand the buffer to the background thread appending it to the file.
+        Returns the Future of the writing.
+        """
+        global flusher
+        if flusher is None:
+            flusher = ThreadPoolExecutor(max_workers=1)
+        chunk = bytes(self.buffer)
+        self.buffer.clear()
+        return flusher.submit(append_to_file, self.path, chunk)
+
+    def close(self):
+        """
+        Write the end of the log.
+        Returns the Future of the writing.
+        """
+        return self.flush()
+
+
+class Replay:
+    """
+    A replay log read back.
+    The state of the game at a turn is rebuilt from the last snapshot
+    before this turn, then the events after it.
+    """
+
+    def __init__(self, data):
+        """
+        Constructor of Replay.
+        :param data: content of the log.
+        """
+        (magic, version, self.map_hash, self.seed, self.width, self.height,
+         self.players_number, self.interval) = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Invalid replay log.")
+        offset = HEADER.size
+
+        self.spawns = []
+        for i in range(0, self.players_number):
+            self.spawns.append(SPAWN.unpack_from(data, offset))
+            offset += SPAWN.size
+
+        self.data = data
+        self.start = offset
+
+        # Offset of each snapshot in data, by turn.
+        self.snapshots = {}
+        self.turns = 0
+        self.index()
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read the log of the file path.
+        """
+        with open(path, 'rb') as log_file:
+            return cls(log_file.read())
+
+    def index(self):
+        """
+        Find the snapshots of the log, and count the turns.
+        """
+        for offset, code, turn in self.events(self.start, 0):
+            if code == SNAPSHOT:
+                self.snapshots[turn] = offset
+            elif self.data[offset] & END_OF_TURN:
+                self.turns = turn
+
+    def events(self, offset, turn):
+        """
+        Iterate over the events from offset.
+        Yields the offset of each event, its code, and the turn it belongs to
+        (for a snapshot, the turn after which it was taken).
+        :param turn: number of turns played before the event at offset.
+        """
+        data = self.data
+        while offset < len(data):
+            byte = data[offset]
+            code = byte & CODE_MASK
+            if code == SNAPSHOT:
+                yield offset, code, turn
+                offset = self.skip_snapshot(offset)
+                continue
+            yield offset, code, turn + 1
+            offset += 1
+            if code != PASS:
+                offset = decode_varint(data, offset)[1]
+            if byte & END_OF_TURN:
+                turn += 1
+
+    def skip_snapshot(self, offset):
+        """
+        Returns the offset of the event after the snapshot at offset.
+        """
+        turn, offset = decode_varint(self.data, offset + 1)
+        length, offset = decode_varint(self.data, offset)
+        offset += length
+        for i in range(0, self.players_number):
+            offset = decode_varint(self.data, offset)[1]
+        return offset
+
+    def state_at(self, game_map, turn):
+        """
+        Rebuild the state of the game after the given number of turns.
+        :param game_map: map of the game, as it was before the game.
+        :return: the grid, and the (row, col) of each player (None if he/she has left).
+        """
+        if map_hash(game_map.grid) != self.map_hash:
+            raise ValueError("The replay log was not recorded on this map.")
+        game_map = game_map.copy()
+        grid = game_map.grid
+
+        occupancy = Occupancy(rules.spawn_positions(game_map))
+        runners = [Runner(i + 1, row, col) for i, (row, col) in enumerate(self.spawns)]
+        left = [False] * self.players_number
+
+        # Start from the last snapshot before the turn.
+        offset, played = self.start, 0
+        taken = [t for t in self.snapshots if t <= turn]
+        if taken:
+            played = max(taken)
+            offset = self.snapshots[played]
+            played, position = decode_varint(self.data, offset + 1)
+            length, position = decode_varint(self.data, position)
+            grid.cells[:] = zlib.decompress(self.data[position:position + length])
+            position += length
+            for runner in runners:
+                index, position = decode_varint(self.data, position)
+                if index == 0:
+                    left[runner.identifier - 1] = True
+                else:
+                    runner.row, runner.col = grid.position(index)
+            offset = position
+
+        for runner in runners:
+            if not left[runner.identifier - 1]:
+                occupancy.add(runner)
+
+        # Then play the events, with the rules of the game.
+        for event_offset, code, event_turn in self.events(offset, played):
+            if event_turn > turn:
+                break
+            if code in (PASS, SNAPSHOT):
+                continue
+            runner = runners[decode_varint(self.data, event_offset + 1)[0]]
+            if code == LEAVE:
+                occupancy.remove(runner)
+                left[runner.identifier - 1] = True
+            else:
+                rules.perform_move(grid, occupancy, runner, STEPS[code])
+
+        positions = [None if left[i] else (r.row, r.col) for i, r in enumerate(runners)]
+        return grid, positions
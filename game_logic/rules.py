@@ -0,0 +1,184 @@
+# -*-coding:Utf-8 -*
+
+"""
+This module contains the rules of the game, as functions of the state of a game.
+They are shared by the players of the live games and by the headless simulation,
+so that both always follow the same rules.
+"""
+
+from graphical_layout.distance_field import UNREACHABLE
+from graphical_layout.grid import WALL, DOOR, EXIT, EMPTY, OUTSIDE
+
+# Directions in which a player can move.
+DIRECTIONS = ('N', 'E', 'S', 'O')
+
+# Reasons why a move can't be performed.
+OUTSIDE_ERROR = "Attention, vous ne pouvez pas sortir par ici! La sortie est: U."
+NO_WALL_ERROR = "Il n'y a pas de mur ici pour créer une porte!"
+NO_DOOR_ERROR = "Il n'y a pas de porte à murer ici!"
+WALL_ERROR = "Attention, vous avez heurté un mur!"
+PLAYER_ERROR = "Attention, vous avez heurté un autre joueur!"
+
+
+def spawn_positions(game_map):
+    """
+    Returns the positions where the players can appear:
+    the blanks from which the exit can be reached.
+    """
+    positions = []
+    grid = game_map.grid
+    distances = game_map.get_distances()
+    for i in range(0, game_map.height):
+        for j in range(0, game_map.width):
+            if grid.get(i, j) == EMPTY and distances.get(i, j) != UNREACHABLE:
+                positions.append((i, j))
+    return positions
+
+
+def check_input(step):
+    """
+    Checks if the input entered by the user is valid.
+    The input can be :
+    - A direction, N, E, O or S
+    - A request to see the instructions again (I)
+    - A request to replace a door with a wall or the opposite.
+    """
+    valid = False
+    if len(step) == 1:
+        if step.upper() in ['I', 'Q', 'N', 'E', 'S', 'O']:
+            valid = True
+    elif len(step) > 1:
+        if step[0].upper() in ['N', 'E', 'S', 'O']:
+            try:
+                int(step[1:])
+            except ValueError:
+                pass
+            else:
+                if int(step[1:]) > 0:
+                    valid = True
+        elif len(step) == 2 \
+                and step[0].upper() in ['M', 'P'] \
+                and step[1].upper() in ['N', 'E', 'S', 'O']:
+            valid = True
+
+    return valid
+
+
+def split_move(move):
+    """
+    Split a valid move into the step played now and the steps played at the next turns:
+    - A direction is played now,
+    - A direction followed by a number n (ex N3) is played now,
+      and n - 1 more times at the next turns,
+    - An instruction to create a wall or a door is played now.
+    :return: (step, direction, steps_left), direction being None
+             if there are no steps left.
+    """
+    if len(move) > 1:
+        try:
+            steps = int(move[1:])
+        except ValueError:
+            # The player wants to transform a door into a wall or the opposite.
+            return move, None, 0
+        if steps > 1:
+            return move[0], move[0], steps - 1
+        return move[0], None, 0
+    return move, None, 0
+
+
+def take_one_step(row, col, direction):
+    """
+    Returns the cell reached from (row, col) in one step in the given direction.
+    """
+    if direction == 'N':
+        row -= 1
+    elif direction == 'S':
+        row += 1
+    elif direction == 'E':
+        col += 1
+    elif direction == 'O':
+        col -= 1
+    return row, col
+
+
+def check_move(grid, occupancy, player, step):
+    """
+    Checks if the step of the player can be performed.
+    - The player can't create a door if there is no wall.
+    - The player can't create a wall if there is no door.
+    - The player can't pass through walls.
+    - The player can't pass through other players.
+    - The player can't exit the map except through the exit U.
+    :param occupancy: Occupancy of the cells of the game.
+    :param player: player playing the step, with his/her row and col.
+    :return: None if the step is valid, else the reason why it isn't.
+    """
+    if len(step) == 2:
+        # If step is two characters long, it is an instruction to create a door or a wall.
+        command = step[0]
+        direction = step[1]
+    else:
+        # If step is just one character long, it means it is a move on the grid
+        command = ""
+        direction = step
+
+    new_row, new_col = take_one_step(player.row, player.col, direction)
+    cell = grid.get(new_row, new_col)
+
+    if cell == OUTSIDE:
+        # The player wants to go outside the map: get him/her back inside.
+        return OUTSIDE_ERROR
+
+    if command == 'P' and cell != WALL:
+        # The player wants to create a door in a wall, but there is no wall
+        return NO_WALL_ERROR
+
+    if command == 'M' and cell != DOOR:
+        # The player wants to transform a door into a wall, but there is no door.
+        return NO_DOOR_ERROR
+
+    if command == '' and cell == WALL:
+        # The player attempts to pass through a wall
+        return WALL_ERROR
+
+    if command == '':
+        # Check if the player attempts to pass through another player
+        other_player = occupancy.get(new_row, new_col)
+        if other_player is not None and other_player is not player:
+            return PLAYER_ERROR
+
+    return None
+
+
+def perform_move(grid, occupancy, player, step):
+    """
+    Perform a valid step of the player:
+    - Create the wall or the door he/she wanted,
+    - Or move him/her on the grid.
+    :return: the cells changed, as (row, col).
+    """
+    if len(step) == 2:
+        # The player wants to create a door or a wall.
+        new_row, new_col = take_one_step(player.row, player.col, step[1])
+        if step[0] == 'P':
+            # We want to create a door in a wall
+            grid.set(new_row, new_col, DOOR)
+
+        elif step[0] == 'M':
+            # We want to transform a door into a wall
+            grid.set(new_row, new_col, WALL)
+
+        return [(new_row, new_col)]
+
+    # The player wants to move on the grid.
+    old_row, old_col = player.row, player.col
+    player.row, player.col = take_one_step(old_row, old_col, step)
+    occupancy.move(player, old_row, old_col)
+    return [(old_row, old_col), (player.row, player.col)]
+
+
+def has_won(grid, player):
+    """
+    Check whether the player stands on the exit.
+    """
+    return grid.get(player.row, player.col) == EXIT
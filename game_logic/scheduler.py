@@ -0,0 +1,102 @@
+# -*-coding:Utf-8 -*
+
+"""
+This module contains the classes Scheduler and Timer.
+The Scheduler runs the deadlines of the games: one Scheduler
+can be shared by all the games of a server.
+"""
+
+import heapq
+import itertools
+import time
+
+
+class Timer:
+    """
+    A callback scheduled by a Scheduler.
+    """
+
+    def __init__(self, deadline, callback, args):
+        """
+        Constructor of Timer.
+        :param deadline: time (time.monotonic) when the callback is run.
+        :param callback: function called at the deadline with args.
+        """
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        """
+        Cancel the timer. Its callback will not be run.
+        """
+        self.cancelled = True
+
+
+class Scheduler:
+    """
+    Runs callbacks when their deadline is reached.
+
+    The timers are kept in a heap ordered by deadline.
+    A cancelled timer stays in the heap, and is dropped when it reaches the top:
+    cancelling is thus done in constant time.
+
+    The Scheduler doesn't wait by itself: the owner of the Scheduler calls run_due
+    regularly, or when the time returned by next_deadline is reached.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        """
+        Constructor of Scheduler.
+        :param clock: function returning the current time.
+        """
+        self.clock = clock
+        self.heap = []
+
+        # Breaks the ties between timers with the same deadline.
+        self.counter = itertools.count()
+
+        # Called with the new earliest deadline when it changes.
+        self.on_change = None
+
+    def __len__(self):
+        return len(self.heap)
+
+    def schedule(self, delay, callback, *args):
+        """
+        Run callback(*args) in delay seconds.
+        Returns the Timer, to cancel it if needed.
+        """
+        timer = Timer(self.clock() + delay, callback, args)
+        earliest = self.next_deadline()
+        heapq.heappush(self.heap, (timer.deadline, next(self.counter), timer))
+        if self.on_change is not None and (earliest is None or timer.deadline < earliest):
+            self.on_change(timer.deadline)
+        return timer
+
+    def next_deadline(self):
+        """
+        Returns the earliest deadline of the timers not cancelled, or None.
+        """
+        heap = self.heap
+        while heap and heap[0][2].cancelled:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def run_due(self):
+        """
+        Run the callbacks of all the timers whose deadline is reached.
+        """
+        now = self.clock()
+        heap = self.heap
+        while heap and heap[0][0] <= now:
+            deadline, count, timer = heapq.heappop(heap)
+            if not timer.cancelled:
+                timer.cancelled = True
+                timer.callback(*timer.args)
+
+        if self.on_change is not None:
+            deadline = self.next_deadline()
+            if deadline is not None:
+                self.on_change(deadline)
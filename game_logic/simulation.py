@@ -0,0 +1,125 @@
+# -*-coding:Utf-8 -*
+
+"""
+This module contains the class Simulation.
+It plays games without any player connected and without any message,
+to measure how the maps and the strategies of the bots play out.
+"""
+
+import random
+
+from game_logic import rules
+from game_logic.occupancy import Occupancy
+
+
+class Runner:
+    """
+    State of a player in a simulation.
+    """
+
+    __slots__ = ('identifier', 'row', 'col', 'direction', 'steps_left', 'game', 'game_map')
+
+    def __init__(self, identifier, row, col, game=None):
+        """
+        Constructor of Runner.
+        :param identifier: identifier of the player in the simulation.
+        :param row, col: initial position of the player.
+        :param game: Simulation the player plays in, if any.
+        """
+        self.identifier = identifier
+        self.row = row
+        self.col = col
+        self.game = game
+        self.game_map = game.game_map if game is not None else None
+
+        # Direction of a move of several steps, and the number of steps left.
+        self.direction = None
+        self.steps_left = 0
+
+
+class Simulation:
+    """
+    Headless game: the players play one after the other,
+    with the rules of the live games, as pure state transitions.
+    No message is formatted or sent, and no player is waited for.
+    """
+
+    def __init__(self, game_map, players_number, seed=None):
+        """
+        Constructor of Simulation.
+        The players are placed at random, like in the live games.
+        :param game_map: map of the game. The simulation plays on its own copy.
+        :param players_number: number of players.
+        :param seed: seed of the random number generator placing the players.
+        """
+        self.game_map = game_map.copy()
+        self.grid = self.game_map.grid
+        self.generator = random.Random(seed)
+
+        self.occupancy = Occupancy(rules.spawn_positions(self.game_map))
+        self.runners = []
+        for identifier in range(1, players_number + 1):
+            row, col = self.occupancy.free.sample(self.generator)
+            runner = Runner(identifier, row, col, self)
+            self.runners.append(runner)
+            self.occupancy.add(runner)
+
+        # Whose turn it is to play among the players
+        self.turn = 0
+
+        # Number of turns played, and the player who has won.
+        self.how_many_rounds = 0
+        self.winner = None
+
+    def play(self, move):
+        """
+        Play the turn of the player whose turn it is.
+        If the player is doing a move of several steps, the move given is ignored.
+        :param move: move of the player, as entered in a live game.
+        :return: False if the move is not a valid input, or if the game is over:
+                 the turn is not played.
+        """
+        runner = self.runners[self.turn]
+
+        if self.winner is not None:
+            return False
+        elif runner.direction is not None:
+            # Finish a previous move of several steps.
+            step = runner.direction
+            runner.steps_left -= 1
+            if runner.steps_left == 0:
+                runner.direction = None
+        elif move in ['I', 'Q'] or not rules.check_input(move):
+            return False
+        else:
+            step, direction, steps_left = rules.split_move(move)
+            if direction is not None:
+                runner.direction = direction
+                runner.steps_left = steps_left
+
+        if rules.check_move(self.grid, self.occupancy, runner, step) is None:
+            changed = rules.perform_move(self.grid, self.occupancy, runner, step)
+            if len(step) == 2:
+                self.game_map.update_distances(*changed[0])
+
+        self.how_many_rounds += 1
+        if rules.has_won(self.grid, runner):
+            self.winner = runner
+        else:
+            self.turn = (self.turn + 1) % len(self.runners)
+        return True
+
+    def run(self, strategy, max_rounds=None, generator=None):
+        """
+        Play until a player has won, or until max_rounds turns are played.
+        :param strategy: function choosing the move of a player,
+                         called with the player and generator.
+                         The strategies of the bots can be used.
+        :param generator: random number generator used by the strategy.
+        :return: the player who has won, or None.
+        """
+        if generator is None:
+            generator = self.generator
+        while self.winner is None and (max_rounds is None or self.how_many_rounds < max_rounds):
+            self.play(strategy(self.runners[self.turn], generator))
+        return self.winner
@@ -0,0 +1,274 @@
+# -*-coding:Utf-8 -*
+
+"""
+This module contains the class TickGame, a game where all the players
+play at the same time, and the function new_game.
+"""
+
+import parameters.parameters as parameters
+from game_logic.game import Game
+
+
+def new_game(game_map, interactor, scheduler=None, seed=None):
+    """
+    Returns a new game of the mode chosen in parameters.game_mode.
+    """
+    if parameters.game_mode == "ticks":
+        return TickGame(game_map, interactor, scheduler, seed)
+    return Game(game_map, interactor, scheduler, seed)
+
+
+class TickGame(Game):
+    """
+    A game where all the players play at the same time.
+
+    The game is divided in ticks of parameters.tick_duration seconds.
+    During a tick, each player sends one command.
+    At the end of the tick, or as soon as every player has sent a command,
+    all the commands are resolved together:
+    - The doors and walls are created first.
+      Several players editing the same cell cancel each other,
+      and a door can't be walled while a player stands in it.
+    - Then the players move.
+      A player can't move to a cell occupied at the beginning of the tick,
+      and the players moving to the same cell all bounce back.
+    The players are then sent one state update for the whole tick.
+    """
+
+    def __init__(self, game_map, interactor, scheduler=None, seed=None):
+        """
+        Constructor of TickGame.
+        """
+        Game.__init__(self, game_map, interactor, scheduler, seed)
+
+        # Runs the end of the current tick.
+        self.tick_timer = None
+
+    def launch(self):
+        """
+        Called at the beginning of the game.
+        - Greets all the players and makes them ready for the new game,
+        - Sends them the instructions and the current state of the game,
+        - Ask all the players for their first move.
+        """
+        self.start_replay()
+        self.cork_all()
+
+        for player in self.players.values():
+            player.greet()
+
+        self.send_all('La partie commence! Tous les joueurs jouent en même temps. '
+                      'Vous devez vous échapper du labyrinthe...')
+        self.send_all(self.get_instructions())
+        self.send_all(self.get_keyframe())
+
+        self.start_tick()
+
+        if parameters.game_timeout is not None:
+            self.game_timer = self.scheduler.schedule(parameters.game_timeout, self.game_expired)
+
+        self.flush_all()
+
+    def play(self):
+        """
+        Play one entire game.
+        Listen to all the players until the game is over.
+        The ticks are resolved by the scheduler.
+        """
+        self.launch()
+        while not self.finished:
+            self.wait_for_current_step()
+            self.advance()
+            self.scheduler.run_due()
+
+    def wait_for_current_step(self):
+        """
+        Read the messages received from all the players.
+        """
+        players_talking = []
+        for p in self.players.values():
+            selected = p.select(True)
+            if selected is not None:
+                players_talking.append(selected)
+
+        for p in players_talking:
+            self.handle_message(p, p.recv())
+
+    def handle_message(self, p, received_message):
+        """
+        Handle a message received from the player p.
+        If the message is a valid move, it becomes his/her command for this tick.
+        """
+        if received_message == '0':
+            self.leave(p)
+
+        elif not p.has_left:
+            move = received_message.upper()
+            commands = move.split()
+            if move == "A":
+                # The player cancels his/her command and the commands sent in advance.
+                p.cancel_commands()
+                p.current_step = None
+                p.send("Vos commandes en attente sont annulées.")
+            elif move == "I":
+                p.send(self.get_instructions())
+            elif not p.check_script(commands):
+                p.send("Saisie incorrecte. "
+                       "Pour revoir les instructions, saisissez I.")
+            else:
+                # New commands replace the ones sent before.
+                # The first one is played at the end of this tick.
+                p.queue_commands(commands[1:])
+                p.preprocess_move(commands[0])
+                p.send("Commande enregistrée pour ce tour.")
+
+    def advance(self):
+        """
+        Resolve the tick at once if all the players have sent their command.
+        """
+        if self.finished:
+            return
+
+        players = self.active_players()
+        if len(players) == 0:
+            # Everyone has left the game
+            self.finished = True
+        elif all(p.current_step is not None for p in players):
+            self.resolve_tick()
+
+        if self.finished:
+            self.end()
+
+    def active_players(self):
+        """
+        Returns the players who haven't left the game, in the order of their identifiers.
+        """
+        return [p for p in self.players.values() if not p.has_left]
+
+    def start_tick(self):
+        """
+        Ask all the players for their next command, and start the timer of the tick.
+        """
+        for player in self.active_players():
+            player.ask_move()
+
+        if self.tick_timer is not None:
+            self.tick_timer.cancel()
+        self.tick_timer = self.scheduler.schedule(parameters.tick_duration, self.tick_expired)
+
+    def tick_expired(self):
+        """
+        Called at the end of a tick: resolve the commands received.
+        """
+        self.tick_timer = None
+        if self.finished:
+            return
+
+        self.resolve_tick()
+        if self.finished:
+            self.end()
+            if self.on_finished is not None:
+                self.on_finished()
+
+    def stop_timers(self):
+        """
+        Cancel the deadlines of the game once it is over.
+        """
+        Game.stop_timers(self)
+        if self.tick_timer is not None:
+            self.tick_timer.cancel()
+            self.tick_timer = None
+
+    def resolve_tick(self):
+        """
+        Resolve all the commands of the tick, send the state update,
+        and start the next tick.
+        """
+        players = [p for p in self.active_players() if p.current_step is not None]
+        if len(players) == 0:
+            # Nobody has played: wait for the next tick.
+            self.tick_timer = self.scheduler.schedule(parameters.tick_duration,
+                                                      self.tick_expired)
+            return
+
+        self.cork_all()
+
+        edits = [p for p in players if len(p.current_step) == 2]
+        moves = [p for p in players if len(p.current_step) == 1]
+
+        # Cells occupied at the beginning of the tick.
+        occupied = set(self.occupancy.occupants)
+
+        for player in self.resolve_edits(edits, occupied):
+            player.perform_move()
+            self.record_step(player)
+
+        for player in self.resolve_moves(moves):
+            player.perform_move()
+            self.record_step(player)
+
+        self.how_many_rounds += 1
+        if self.replay is not None:
+            self.replay.end_turn(self)
+        summary = ", ".join("Joueur {0} : {1}".format(p.identifier, p.current_step)
+                            for p in players)
+        self.send_all("Tour {0} - {1}.".format(self.how_many_rounds, summary), server=True)
+        self.send_all(self.get_state_update())
+
+        for player in moves:
+            if player.has_won():
+                self.finished = True
+                self.winner = player
+                message = "Le Joueur {} a gagné la partie.".format(player.identifier)
+                self.send_all(message, server=True)
+                break
+
+        if not self.finished:
+            self.send_all("$", server=False)
+            self.start_tick()
+
+        self.flush_all()
+
+    def resolve_edits(self, edits, occupied):
+        """
+        Returns the players whose door or wall can be created.
+        :param occupied: cells occupied at the beginning of the tick.
+        """
+        targets = {}
+        for player in edits:
+            if player.check_move():
+                target = player.take_one_step(player.current_step[1])
+                targets.setdefault(target, []).append(player)
+
+        valid = []
+        for target, players in targets.items():
+            if len(players) > 1:
+                for player in players:
+                    player.send("Un autre joueur a modifié la même case : "
+                                "votre commande est annulée.")
+            elif players[0].current_step[0] == 'M' and target in occupied:
+                players[0].send("Impossible de murer une porte occupée par un joueur.")
+            else:
+                valid.append(players[0])
+        return valid
+
+    def resolve_moves(self, moves):
+        """
+        Returns the players who can move, once the doors and walls are created.
+        The other players stay where they are.
+        """
+        targets = {}
+        for player in moves:
+            if player.check_move():
+                target = player.take_one_step(player.current_step)
+                targets.setdefault(target, []).append(player)
+
+        valid = []
+        for target, players in targets.items():
+            if len(players) > 1:
+                for player in players:
+                    player.send("Plusieurs joueurs ont voulu aller sur la même case : "
+                                "vous restez sur place.")
+            else:
+                valid.append(players[0])
+        return valid
@@ -0,0 +1,170 @@
+# -*-coding:Utf-8 -*
+
+"""
+This module contains the class DistanceField.
+It knows the length of the shortest path from each cell of a map to the exit.
+"""
+
+import heapq
+from array import array
+from collections import deque
+
+from graphical_layout.grid import EMPTY, DOOR, EXIT
+
+# Distance of the cells from which the exit can't be reached.
+UNREACHABLE = -1
+
+# Codes of the cells a player can walk through.
+PASSABLE = frozenset([EMPTY, DOOR, EXIT])
+
+
+class DistanceField:
+    """
+    Distance from each cell of a grid to its exit, in number of steps.
+    The walls and the other players are not walked through.
+
+    The distances are stored in an array aligned with the cells of the grid,
+    so that a distance is read in constant time.
+    They are computed once by a breadth-first search from the exit,
+    then updated incrementally when a door is opened or walled.
+    """
+
+    def __init__(self, grid, distances=None, passable=PASSABLE):
+        """
+        Constructor of DistanceField.
+        :param grid: Grid of the map.
+        :param distances: distances already computed for the grid.
+                          If None, they are computed.
+        :param passable: codes of the cells walked through.
+        """
+        self.grid = grid
+        self.neighbours = tuple(grid.offsets.values())
+        self.passable = passable
+
+        if distances is None:
+            distances = array('i', [UNREACHABLE]) * len(grid.cells)
+            exit_index = grid.cells.find(EXIT)
+            if exit_index >= 0:
+                distances[exit_index] = 0
+                self.spread(distances, deque([exit_index]))
+        self.distances = distances
+
+    def spread(self, distances, queue):
+        """
+        Breadth-first search lowering the distances of the cells
+        around the cells of the queue.
+        """
+        cells = self.grid.cells
+        neighbours = self.neighbours
+        passable = self.passable
+        while queue:
+            index = queue.popleft()
+            distance = distances[index] + 1
+            for offset in neighbours:
+                neighbour = index + offset
+                if cells[neighbour] in passable:
+                    current = distances[neighbour]
+                    if current == UNREACHABLE or current > distance:
+                        distances[neighbour] = distance
+                        queue.append(neighbour)
+
+    def get(self, row, col):
+        """
+        Returns the distance from the cell (row, col) to the exit,
+        or UNREACHABLE.
+        """
+        return self.distances[self.grid.index(row, col)]
+
+    def copy(self, grid):
+        """
+        Returns a copy of the distances, for a copy of the grid.
+        """
+        return DistanceField(grid, array('i', self.distances), self.passable)
+
+    def update(self, row, col):
+        """
+        Update the distances after the cell (row, col) of the grid has changed:
+        - A wall turned into a door can only shorten the paths.
+          The distances are lowered around the door.
+        - A door turned into a wall can only lengthen the paths.
+          Only the cells whose shortest paths went through the door are computed again.
+        """
+        index = self.grid.index(row, col)
+        if self.grid.cells[index] in self.passable:
+            self.open(index)
+        else:
+            self.close(index)
+
+    def open(self, index):
+        """
+        The cell at index has become passable.
+        """
+        distances = self.distances
+        cells = self.grid.cells
+        passable = self.passable
+
+        reachable = [distances[index + offset] for offset in self.neighbours
+                     if cells[index + offset] in passable and distances[index + offset] != UNREACHABLE]
+        if reachable:
+            distances[index] = min(reachable) + 1
+            self.spread(distances, deque([index]))
+
+    def close(self, index):
+        """
+        The cell at index has become a wall.
+        """
+        distances = self.distances
+        cells = self.grid.cells
+        neighbours = self.neighbours
+        passable = self.passable
+
+        distance = distances[index]
+        distances[index] = UNREACHABLE
+        if distance == UNREACHABLE:
+            return
+
+        # Find the cells which were reached through the closed cell only.
+        # They are visited by increasing distance, so that whether a cell
+        # is still reached from another neighbour is known when it is visited.
+        affected = set()
+        queue = deque(index + offset for offset in neighbours
+                      if distances[index + offset] == distance + 1)
+        while queue:
+            cell = queue.popleft()
+            if cell in affected or cells[cell] not in passable:
+                continue
+            cell_distance = distances[cell]
+            supported = any(distances[cell + offset] == cell_distance - 1
+                            and cell + offset not in affected
+                            and cells[cell + offset] in passable
+                            for offset in neighbours)
+            if not supported:
+                affected.add(cell)
+                queue.extend(cell + offset for offset in neighbours
+                             if distances[cell + offset] == cell_distance + 1)
+
+        # Compute the distances of these cells again,
+        # from the cells around them whose distances haven't changed.
+        for cell in affected:
+            distances[cell] = UNREACHABLE
+
+        heap = []
+        for cell in affected:
+            for offset in neighbours:
+                neighbour = cell + offset
+                if neighbour not in affected and distances[neighbour] != UNREACHABLE:
+                    heap.append((distances[neighbour] + 1, cell))
+        heapq.heapify(heap)
+
+        while heap:
+            cell_distance, cell = heapq.heappop(heap)
+            current = distances[cell]
+            if current != UNREACHABLE and current <= cell_distance:
+                continue
+            distances[cell] = cell_distance
+            for offset in neighbours:
+                neighbour = cell + offset
+                if neighbour in affected and cells[neighbour] in passable:
+                    current = distances[neighbour]
+                    if current == UNREACHABLE or current > cell_distance + 1:
+                        heapq.heappush(heap, (cell_distance + 1, neighbour))
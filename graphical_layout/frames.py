@@ -0,0 +1,158 @@
+# -*-coding:Utf-8 -*
+
+"""
+This module contains the protocol used to send the state of a game
+to the clients, and the class GridView used by the clients to display it.
+
+The state of the game is sent in two kinds of frames:
+- A keyframe contains the whole grid.
+  It is sent when a game is launched, and then periodically.
+- A delta only contains the cells that changed since the previous frame.
+
+Frames are sent as one message.
+They start with FRAME_MARKER, so that the clients can tell them
+apart from the other messages of the server.
+
+Each player is shown on the grid by a glyph: a digit for the first players,
+then a letter. The players beyond share SHARED_GLYPH: their identifiers
+and positions are sent after the cells of the frame, following POSITIONS_MARKER.
+"""
+
+# First character of the frames. It can't be part of a message or a map.
+FRAME_MARKER = '\x1e'
+
+KEYFRAME = FRAME_MARKER + 'K'
+DELTA = FRAME_MARKER + 'D'
+
+# Separators used in the deltas and in the lists of positions.
+CELL_SEPARATOR = ';'
+FIELD_SEPARATOR = ','
+
+# Separates the cells of a frame from the positions of the players
+# shown with SHARED_GLYPH.
+POSITIONS_MARKER = '|'
+
+# Glyphs of the players, by identifier.
+# None of them can be found in a map.
+GLYPHS = '123456789abcdefghijklmnopqrstuvwxyz'
+SHARED_GLYPH = '*'
+
+
+def glyph(identifier):
+    """
+    Returns the character showing the player identifier on the grid.
+    """
+    if identifier <= len(GLYPHS):
+        return GLYPHS[identifier - 1]
+    return SHARED_GLYPH
+
+
+def encode_positions(positions):
+    """
+    Returns the list of positions to append to a frame.
+    :param positions: iterable of tuples (identifier, row, col)
+                      of players shown with SHARED_GLYPH.
+    """
+    encoded = CELL_SEPARATOR.join(
+        '{1}{0}{2}{0}{3}'.format(FIELD_SEPARATOR, identifier, row, col)
+        for identifier, row, col in positions)
+    if encoded:
+        return POSITIONS_MARKER + encoded
+    return ''
+
+
+def decode_positions(encoded):
+    """
+    Returns the positions appended to a frame, by identifier.
+    """
+    positions = {}
+    if encoded:
+        for position in encoded.split(CELL_SEPARATOR):
+            identifier, row, col = position.split(FIELD_SEPARATOR)
+            positions[int(identifier)] = (int(row), int(col))
+    return positions
+
+
+def encode_keyframe(rows, positions=()):
+    """
+    Returns a keyframe containing the given rows of the grid.
+    Rows are separated by '$', which the clients read as a newline.
+    :param positions: positions of all the players shown with SHARED_GLYPH.
+    """
+    return KEYFRAME + '$'.join(rows) + encode_positions(positions)
+
+
+def encode_delta(cells, positions=()):
+    """
+    Returns a delta.
+    :param cells: iterable of tuples (row, col, character).
+    :param positions: positions of the players shown with SHARED_GLYPH
+                      who have moved.
+    """
+    return DELTA + CELL_SEPARATOR.join(
+        '{1}{0}{2}{0}{3}'.format(FIELD_SEPARATOR, row, col, character)
+        for row, col, character in cells) + encode_positions(positions)
+
+
+def is_frame(message):
+    """
+    Returns True if the message received is a frame.
+    """
+    return message.startswith(FRAME_MARKER)
+
+
+class GridView:
+    """
+    Local copy of the grid of the game, kept by a client.
+    It is built from the keyframes and updated by the deltas.
+    """
+
+    def __init__(self):
+        """
+        Constructor of GridView.
+        """
+        self.rows = None
+
+        # Positions of the players shown with SHARED_GLYPH, by identifier.
+        self.positions = {}
+
+        # Identifier of the player using the client, once known.
+        self.identifier = None
+
+    def apply(self, message):
+        """
+        Update the grid with a frame received from the server.
+        Returns False if the frame can't be applied:
+        a delta received before any keyframe is ignored.
+        """
+        if message.startswith(KEYFRAME):
+            # The keyframe has been received with newlines between rows.
+            grid, separator, positions = message[len(KEYFRAME):].partition(POSITIONS_MARKER)
+            self.rows = [list(row) for row in grid.split('\n')]
+            self.positions = decode_positions(positions)
+            return True
+
+        if message.startswith(DELTA) and self.rows is not None:
+            cells, separator, positions = message[len(DELTA):].partition(POSITIONS_MARKER)
+            if cells:
+                for cell in cells.split(CELL_SEPARATOR):
+                    row, col, character = cell.split(FIELD_SEPARATOR, 2)
+                    self.rows[int(row)][int(col)] = character
+            self.positions.update(decode_positions(positions))
+            return True
+
+        return False
+
+    def render(self):
+        """
+        Returns the grid as a string to be displayed.
+        If the player is shown with SHARED_GLYPH, his/her position is shown with '@'.
+        """
+        rows = self.rows
+        position = self.positions.get(self.identifier)
+        if position is not None:
+            row, col = position
+            if rows[row][col] == SHARED_GLYPH:
+                rows = list(rows)
+                rows[row] = rows[row][:col] + ['@'] + rows[row][col + 1:]
+        return '\n' + '\n'.join(''.join(row) for row in rows) + '\n'
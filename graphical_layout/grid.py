@@ -0,0 +1,111 @@
+# -*-coding:Utf-8 -*
+
+"""
+This module contains the class Grid, and the codes of the cells of a grid.
+"""
+
+# Codes of the cells.
+# They are the ASCII codes of the characters used in the maps.
+WALL = ord('O')
+DOOR = ord('.')
+EXIT = ord('U')
+EMPTY = ord(' ')
+
+# Code of the cells surrounding the grid.
+OUTSIDE = 0
+
+
+class Grid:
+    """
+    Compact grid of a labyrinth.
+
+    The cells are stored row by row in a bytearray, one byte per cell.
+    The grid is surrounded by a border of OUTSIDE cells:
+    a cell one step outside of the labyrinth can thus be read
+    without checking the bounds first.
+    """
+
+    def __init__(self, width, height, cells=None):
+        """
+        Constructor of Grid.
+        :param width: number of columns of the labyrinth.
+        :param height: number of rows of the labyrinth.
+        :param cells: bytearray of the cells, border included.
+                      If None, all the cells are OUTSIDE.
+        """
+        self.width = width
+        self.height = height
+
+        # Number of bytes of one row, border included.
+        self.stride = width + 2
+
+        if cells is None:
+            cells = bytearray(self.stride * (height + 2))
+        self.cells = cells
+
+        # Offsets between a cell and its neighbours in each direction.
+        self.offsets = {'N': -self.stride, 'S': self.stride, 'E': 1, 'O': -1}
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Build a grid from a list of rows of equal length.
+        Each row is a string of map characters.
+        """
+        width = len(rows[0])
+        grid = cls(width, len(rows))
+        for row, content in enumerate(rows):
+            start = grid.index(row, 0)
+            grid.cells[start:start + width] = content.encode()
+        return grid
+
+    def index(self, row, col):
+        """
+        Returns the position of the cell (row, col) in cells.
+        """
+        return (row + 1) * self.stride + col + 1
+
+    def position(self, index):
+        """
+        Returns the (row, col) of the cell at the given position in cells.
+        """
+        row, col = divmod(index, self.stride)
+        return row - 1, col - 1
+
+    def get(self, row, col):
+        """
+        Returns the code of the cell (row, col).
+        Returns OUTSIDE if the cell is just outside of the labyrinth.
+        """
+        return self.cells[(row + 1) * self.stride + col + 1]
+
+    def set(self, row, col, code):
+        """
+        Sets the code of the cell (row, col).
+        """
+        self.cells[(row + 1) * self.stride + col + 1] = code
+
+    def row(self, row):
+        """
+        Returns the row of the labyrinth as a string.
+        """
+        start = self.index(row, 0)
+        return self.cells[start:start + self.width].decode()
+
+    def rows(self):
+        """
+        Returns the rows of the labyrinth as a list of strings.
+        """
+        return [self.row(row) for row in range(0, self.height)]
+
+    def count(self, code):
+        """
+        Returns the number of cells with the given code.
+        """
+        return self.cells.count(code)
+
+    def copy(self):
+        """
+        Returns an independent copy of the grid.
+        """
+        return Grid(self.width, self.height, bytearray(self.cells))
@@ -1,93 +1,131 @@
-# -*-coding:Utf-8 -*
-
-"""This module contains the class Map."""
-import parameters.parameters as parameters
-
-
-class Map:
-
-    """A map (or labyrinth)"""
-
-    # List of reasons that make a map invalid
-    INVALID_CHARS_ERROR = "La carte {} contient des caractères invalides."
-    U_COUNT_ERROR = "La carte {} ne peut contenir qu'un seul caractère 'U'."
-    NON_RECTANGULAR_ERROR = "La carte {} n'est pas rectangulaire."
-    TOO_SMALL_ERROR = "La carte {} est trop petite."
-    TOO_LARGE_ERROR = "La carte {} est trop volumineuse."
-
-    def __init__(self, name, content):
-        """
-        Constructor of a Map.
-        Construction fails if:
-        - "ccntent" contains only valid items for a map,
-        - The map has only one exit,
-        - The map is rectangular,
-        - The map is neither too small nor to big.
-
-        :param name: Name of the map
-        :param content: String to be converted into a usable map.
-        """
-        self.name = name
-
-        is_valid, message = self.is_valid(content.upper())
-        if not is_valid:
-            raise ValueError(message.format(self.name))
-
-        # Remove "X"s in the map if there are some.
-        # The initial position of the players is now computed at random.
-        content = content.replace('X', ' ')
-
-        # The map is loaded as a list of lists
-        self.grid = [list(row) for row in content.split('\n')]
-
-        # Maps are rectangular. We store their width and height.
-        self.width = len(self.grid[0])
-        self.height = len(self.grid)
-
-        # Initial positions of players are computed at random.
-        # They are chosen among the blank spots of the map.
-        # It is impossible to have more players than there are blanks.
-        # It is also impossible for now to have more than 9 players,
-        # because each player is represented on the map with an integer.
-        self.max_players = min(9, content.count(' '))
-
-    def __repr__(self):
-        return self.name
-
-    @staticmethod
-    def is_valid(content):
-        """
-        Check if content is a valid map, meaning:
-        - "ccntent" contains only valid items for a map,
-        - The map has only one exit,
-        - The map is rectangular,
-        - The map is neither too small nor to big.
-        :param content: String to be converted into a usable map.
-        """
-        # Check if there are invalid characters
-        invalid_characters = [c for c in content if c not in parameters.valid_map_items]
-        if len(invalid_characters) > 0:
-            return False, Map.INVALID_CHARS_ERROR
-
-        count_u = content.count('U')
-        if count_u != 1:
-            return False, Map.U_COUNT_ERROR
-
-        # Check if the map is a rectangle
-        row_lengths = set([len(row) for row in content.split('\n')])
-        if len(row_lengths) != 1:
-            return False, Map.NON_RECTANGULAR_ERROR
-
-        grid = [list(row) for row in content.split('\n')]
-        row_length = len(grid[0])
-        col_length = len(grid)
-
-        # Check if the map reaches minimum length requirements
-        if row_length < parameters.map_min_size or col_length < parameters.map_min_size:
-            return False, Map.TOO_SMALL_ERROR
-
-        # Check if the map exceeds maximum length requirements
-        if row_length > parameters.map_max_size or col_length > parameters.map_max_size:
-            return False, Map.TOO_LARGE_ERROR
-
-        return True, ""
+# -*-coding:Utf-8 -*
+
+"""This module contains the class Map."""
+from graphical_layout import map_parser
+from graphical_layout.distance_field import DistanceField
+from graphical_layout.map_parser import MapError, parse_map
+
+
+class Map:
+
+    """A map (or labyrinth)"""
+
+    # List of reasons that make a map invalid
+    INVALID_CHARS_ERROR = map_parser.INVALID_CHARS_ERROR
+    U_COUNT_ERROR = map_parser.U_COUNT_ERROR
+    NON_RECTANGULAR_ERROR = map_parser.NON_RECTANGULAR_ERROR
+    TOO_SMALL_ERROR = map_parser.TOO_SMALL_ERROR
+    TOO_LARGE_ERROR = map_parser.TOO_LARGE_ERROR
+    UNREACHABLE_EXIT_ERROR = map_parser.UNREACHABLE_EXIT_ERROR
+
+    def __init__(self, name, content):
+        """
+        Constructor of a Map.
+        Construction fails if:
+        - "ccntent" contains only valid items for a map,
+        - The map has only one exit,
+        - The map is rectangular,
+        - The map is neither too small nor to big,
+        - The exit can be reached from at least one blank.
+
+        :param name: Name of the map
+        :param content: String to be converted into a usable map.
+        """
+        self.name = name
+
+        # The map is checked and loaded as a compact grid in a single pass.
+        try:
+            parsed_map = parse_map(content)
+        except MapError as error:
+            error.name = self.name
+            raise
+
+        self.load(parsed_map)
+
+    @classmethod
+    def from_parsed_map(cls, name, parsed_map):
+        """
+        Create a Map from a map already checked and parsed.
+        :param name: Name of the map
+        :param parsed_map: ParsedMap returned by map_parser.parse_map.
+        """
+        game_map = cls.__new__(cls)
+        game_map.name = name
+        game_map.load(parsed_map)
+        return game_map
+
+    def load(self, parsed_map):
+        """
+        Set the attributes of the map from the result of its parsing.
+        """
+        self.grid = parsed_map.grid
+        self.open_cells = parsed_map.open_cells
+
+        # Maps are rectangular. We store their width and height.
+        self.width = self.grid.width
+        self.height = self.grid.height
+
+        # Results of the analysis of the map made when it was parsed.
+        self.reachable_spawns = parsed_map.analysis.reachable_spawns
+        self.exit_distance = parsed_map.analysis.exit_distance
+        self.doors_needed = parsed_map.analysis.doors_needed
+
+        # Initial positions of players are computed at random.
+        # They are chosen among the blank spots of the map from which the exit can be reached.
+        # It is impossible to have more players than there are such blanks.
+        self.max_players = self.reachable_spawns
+
+        # Distances from each cell to the exit, computed when first needed.
+        self.distances = None
+
+    def get_distances(self):
+        """
+        Returns the DistanceField of the map.
+        It is computed the first time, then kept up to date
+        with the doors and walls created.
+        """
+        if self.distances is None:
+            self.distances = DistanceField(self.grid)
+        return self.distances
+
+    def update_distances(self, row, col):
+        """
+        Update the distances to the exit once the cell (row, col)
+        has been turned into a door or a wall.
+        """
+        if self.distances is not None:
+            self.distances.update(row, col)
+
+    def copy(self):
+        """
+        Returns a copy of the map with its own grid.
+        Each game works on its own copy, so that the doors and walls
+        created during a game don't change the map of the other games.
+        """
+        game_map = Map.__new__(Map)
+        game_map.__dict__.update(self.__dict__)
+        game_map.grid = self.grid.copy()
+
+        # The distances are computed once for the map, and copied for each game.
+        game_map.distances = self.get_distances().copy(game_map.grid)
+        return game_map
+
+    def __repr__(self):
+        return self.name
+
+    @staticmethod
+    def is_valid(content):
+        """
+        Check if content is a valid map, meaning:
+        - "ccntent" contains only valid items for a map,
+        - The map has only one exit,
+        - The map is rectangular,
+        - The map is neither too small nor to big,
+        - The exit can be reached from at least one blank.
+        :param content: String or text file to be converted into a usable map.
+        """
+        try:
+            parse_map(content)
+        except MapError as error:
+            return False, error.template
+        return True, ""
@@ -0,0 +1,68 @@
+# -*-coding:Utf-8 -*
+
+"""
+This module contains the analysis of the maps made when they are loaded.
+It checks that the exit can be reached from the cells where the players appear.
+"""
+
+from graphical_layout.distance_field import DistanceField, UNREACHABLE
+from graphical_layout.grid import EMPTY, EXIT
+
+
+# Codes of the cells a player can walk through without using a door.
+OPEN = frozenset([EMPTY, EXIT])
+
+
+class MapAnalysis:
+    """
+    Result of the analysis of a map.
+    """
+
+    def __init__(self, reachable_spawns, exit_distance, doors_needed):
+        """
+        Constructor of MapAnalysis.
+        :param reachable_spawns: number of blank cells from which the exit can be reached.
+        :param exit_distance: length of the shortest path from a blank cell to the exit,
+                              or UNREACHABLE.
+        :param doors_needed: True if the exit can't be reached from any blank cell
+                             without going through a door.
+        """
+        self.reachable_spawns = reachable_spawns
+        self.exit_distance = exit_distance
+        self.doors_needed = doors_needed
+
+
+def closest_spawn(grid, distances):
+    """
+    Returns the number of blank cells from which the exit can be reached,
+    and the shortest of their distances to the exit (or UNREACHABLE).
+    """
+    count = 0
+    shortest = UNREACHABLE
+    cells = grid.cells
+    index = cells.find(EMPTY)
+    while index >= 0:
+        distance = distances[index]
+        if distance != UNREACHABLE:
+            count += 1
+            if shortest == UNREACHABLE or distance < shortest:
+                shortest = distance
+        index = cells.find(EMPTY, index + 1)
+    return count, shortest
+
+
+def analyse_map(grid):
+    """
+    Analyse the grid of a map with two breadth-first searches from the exit,
+    with and without going through the doors.
+    Each search visits every cell at most once: the analysis takes linear time.
+    :return: a MapAnalysis.
+    """
+    reachable_spawns, exit_distance = closest_spawn(grid, DistanceField(grid).distances)
+
+    doors_needed = False
+    if reachable_spawns > 0:
+        without_doors = DistanceField(grid, passable=OPEN).distances
+        doors_needed = closest_spawn(grid, without_doors)[0] == 0
+
+    return MapAnalysis(reachable_spawns, exit_distance, doors_needed)
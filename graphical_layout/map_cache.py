@@ -0,0 +1,229 @@
+# -*-coding:Utf-8 -*
+
+"""
+This module contains the class MapCache.
+It keeps on disk the maps already validated and parsed,
+so that they don't have to be parsed again at the next start of the server.
+"""
+
+import hashlib
+import json
+import os
+import struct
+
+import parameters.parameters as parameters
+from graphical_layout.grid import Grid
+from graphical_layout.map_analysis import MapAnalysis
+from graphical_layout.map_parser import ParsedMap
+
+# Identifies a cache file, and the version of its format.
+MAGIC = b'RBMC'
+VERSION = 3
+
+# Header of the file: magic, version, hash of the validation parameters, number of entries.
+HEADER = struct.Struct('<4sH32sI')
+
+# Key of an entry: length of the path, modification time (ns), size of the file.
+KEY = struct.Struct('<HqQ')
+
+# Validity and length of the name of the map.
+NAME = struct.Struct('<?H')
+
+# Metadata of a valid map: width, height, open cells, length of the cells,
+# then its analysis: reachable spawns, exit distance, doors needed.
+METADATA = struct.Struct('<HHIIIi?')
+
+# Metadata of an invalid map: length of the error message.
+ERROR = struct.Struct('<I')
+
+
+def settings_hash():
+    """
+    Returns the hash of the parameters deciding whether a map is valid.
+    A cache written with other parameters is discarded.
+    """
+    settings = [parameters.map_min_size, parameters.map_max_size, parameters.valid_map_items]
+    return hashlib.sha256(json.dumps(settings).encode()).digest()
+
+
+class CacheEntry:
+    """
+    Result of the loading of one map file, stored in the cache.
+    Either parsed_map or error is None.
+    """
+
+    def __init__(self, mtime_ns, size, name, parsed_map=None, error=None):
+        """
+        Constructor of CacheEntry.
+        :param mtime_ns: modification time of the file when it was parsed.
+        :param size: size of the file when it was parsed.
+        :param name: name of the map.
+        :param parsed_map: ParsedMap if the map is valid.
+        :param error: message explaining why the map is invalid.
+        """
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.name = name
+        self.parsed_map = parsed_map
+        self.error = error
+
+    def matches(self, stat):
+        """
+        Returns True if the entry is still up to date for a file
+        with the given os.stat result.
+        """
+        return self.mtime_ns == stat.st_mtime_ns and self.size == stat.st_size
+
+
+class MapCache:
+    """
+    Cache of the parsed maps, keyed by the path of their file.
+    An entry is only used if the modification time and
+    the size of the file have not changed since it was parsed,
+    and the whole cache only if the parameters validating the maps haven't changed.
+
+    The whole cache is read at once by load, and written at once by save.
+    Each map is stored with its grid as raw bytes, and its metadata.
+    """
+
+    def __init__(self, path=parameters.map_cache_file):
+        """
+        Constructor of MapCache.
+        :param path: location of the cache file.
+        """
+        self.path = path
+        self.entries = {}
+
+        # Paths of the map files used since the cache was loaded.
+        # Only these entries are saved.
+        self.used = set()
+        self.modified = False
+
+    def get(self, map_path, stat):
+        """
+        Returns the entry of the file map_path if it is up to date, else None.
+        :param stat: result of os.stat for map_path.
+        """
+        self.used.add(map_path)
+        entry = self.entries.get(map_path)
+        if entry is not None and entry.matches(stat):
+            return entry
+        return None
+
+    def put(self, map_path, stat, entry_name, parsed_map=None, error=None):
+        """
+        Store the result of the loading of the file map_path.
+        """
+        self.used.add(map_path)
+        self.entries[map_path] = CacheEntry(stat.st_mtime_ns, stat.st_size,
+                                            entry_name, parsed_map, error)
+        self.modified = True
+
+    def load(self):
+        """
+        Read the cache file.
+        If it is missing or can't be read, the cache starts empty.
+        """
+        self.entries = {}
+        try:
+            with open(self.path, 'rb') as cache_file:
+                data = cache_file.read()
+            self.entries = self.decode(data)
+        except (OSError, ValueError, struct.error):
+            self.entries = {}
+
+    def save(self):
+        """
+        Write the cache file if it has changed.
+        The entries of the files that have disappeared are dropped.
+        """
+        removed = set(self.entries) - self.used
+        if not self.modified and not removed:
+            return
+
+        for map_path in removed:
+            del self.entries[map_path]
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        temporary_path = self.path + '.tmp'
+        with open(temporary_path, 'wb') as cache_file:
+            cache_file.write(self.encode())
+        os.replace(temporary_path, self.path)
+        self.modified = False
+
+    def encode(self):
+        """
+        Returns the content of the cache file.
+        """
+        chunks = [HEADER.pack(MAGIC, VERSION, settings_hash(), len(self.entries))]
+        for map_path, entry in self.entries.items():
+            encoded_path = map_path.encode()
+            encoded_name = entry.name.encode()
+            chunks.append(KEY.pack(len(encoded_path), entry.mtime_ns, entry.size))
+            chunks.append(encoded_path)
+
+            is_valid = entry.parsed_map is not None
+            chunks.append(NAME.pack(is_valid, len(encoded_name)))
+            chunks.append(encoded_name)
+
+            if is_valid:
+                grid = entry.parsed_map.grid
+                analysis = entry.parsed_map.analysis
+                chunks.append(METADATA.pack(grid.width, grid.height,
+                                            entry.parsed_map.open_cells, len(grid.cells),
+                                            analysis.reachable_spawns, analysis.exit_distance,
+                                            analysis.doors_needed))
+                chunks.append(bytes(grid.cells))
+            else:
+                encoded_error = entry.error.encode()
+                chunks.append(ERROR.pack(len(encoded_error)))
+                chunks.append(encoded_error)
+        return b''.join(chunks)
+
+    @staticmethod
+    def decode(data):
+        """
+        Returns the entries stored in the content of a cache file.
+        Raises ValueError if the content is not a valid cache.
+        """
+        magic, version, settings, count = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION or settings != settings_hash():
+            raise ValueError("Invalid map cache.")
+        offset = HEADER.size
+
+        entries = {}
+        for i in range(0, count):
+            path_length, mtime_ns, size = KEY.unpack_from(data, offset)
+            offset += KEY.size
+            map_path = data[offset:offset + path_length].decode()
+            offset += path_length
+
+            is_valid, name_length = NAME.unpack_from(data, offset)
+            offset += NAME.size
+            entry_name = data[offset:offset + name_length].decode()
+            offset += name_length
+
+            if is_valid:
+                (width, height, open_cells, cells_length,
+                 reachable_spawns, exit_distance, doors_needed) = METADATA.unpack_from(data, offset)
+                offset += METADATA.size
+                cells = bytearray(data[offset:offset + cells_length])
+                offset += cells_length
+                analysis = MapAnalysis(reachable_spawns, exit_distance, doors_needed)
+                parsed_map = ParsedMap(Grid(width, height, cells), open_cells, analysis)
+                entry = CacheEntry(mtime_ns, size, entry_name, parsed_map=parsed_map)
+            else:
+                error_length, = ERROR.unpack_from(data, offset)
+                offset += ERROR.size
+                error = data[offset:offset + error_length].decode()
+                offset += error_length
+                entry = CacheEntry(mtime_ns, size, entry_name, error=error)
+
+            entries[map_path] = entry
+
+        if offset != len(data):
+            raise ValueError("Invalid map cache.")
+        return entries
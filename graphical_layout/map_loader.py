@@ -0,0 +1,109 @@
+# -*-coding:Utf-8 -*
+
+"""
+This module contains the functions used to load all the maps of a directory.
+The maps that need to be parsed can be parsed in parallel by a pool of processes.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import parameters.parameters as parameters
+from graphical_layout.map import Map
+from graphical_layout.map_parser import MapError, parse_map
+
+
+def list_map_files(directory):
+    """
+    Returns the names and paths of the map files of the directory,
+    sorted by name so that the maps are always loaded in the same order.
+    """
+    map_files = []
+    for name_file in sorted(os.listdir(directory)):
+        if name_file.endswith(".txt"):
+            map_files.append((name_file[:-4].lower(), os.path.join(directory, name_file)))
+    return map_files
+
+
+def parse_map_file(map_name, map_path):
+    """
+    Check and parse one map file.
+    Runs in the worker processes when the maps are parsed in parallel.
+    Returns the ParsedMap and None if the map is valid,
+    None and the error message otherwise.
+    """
+    with open(map_path, "r") as map_file:
+        try:
+            return parse_map(map_file), None
+        except MapError as error_creating_map:
+            error_creating_map.name = map_name
+            return None, str(error_creating_map)
+
+
+def iter_maps(directory, map_cache, workers=None):
+    """
+    Load the maps of the directory, one after the other in the order of
+    list_map_files. Yields for each map file a Map and None if the map
+    is valid, None and the error message otherwise.
+
+    The maps found in map_cache are not parsed again.
+    If at least parameters.parallel_loading_threshold maps have to be parsed,
+    they are parsed in parallel by a pool of worker processes.
+
+    :param map_cache: MapCache updated with the maps parsed.
+    :param workers: number of worker processes. By default, one per CPU.
+    """
+    map_files = list_map_files(directory)
+
+    # Find the maps that have to be parsed.
+    stats = {}
+    to_parse = []
+    for map_name, map_path in map_files:
+        stats[map_path] = os.stat(map_path)
+        if map_cache.get(map_path, stats[map_path]) is None:
+            to_parse.append((map_name, map_path))
+
+    names = [map_name for map_name, map_path in to_parse]
+    paths = [map_path for map_name, map_path in to_parse]
+
+    pool = None
+    if len(to_parse) >= parameters.parallel_loading_threshold:
+        pool = ProcessPoolExecutor(workers)
+        chunk_size = max(1, len(to_parse) // (4 * (workers or os.cpu_count() or 1)))
+        results = pool.map(parse_map_file, names, paths, chunksize=chunk_size)
+    else:
+        results = map(parse_map_file, names, paths)
+
+    try:
+        # Results are returned in the order of to_parse.
+        parsed = iter(results)
+        for map_name, map_path in map_files:
+            entry = map_cache.get(map_path, stats[map_path])
+            if entry is None:
+                parsed_map, error = next(parsed)
+                map_cache.put(map_path, stats[map_path], map_name, parsed_map, error)
+                entry = map_cache.get(map_path, stats[map_path])
+
+            if entry.parsed_map is not None:
+                yield Map.from_parsed_map(entry.name, entry.parsed_map), None
+            else:
+                yield None, entry.error
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+def load_maps(directory, map_cache, workers=None):
+    """
+    Load all the maps of the directory.
+    Returns the list of valid maps, in the order of list_map_files,
+    and the list of the error messages of the invalid maps.
+    """
+    maps = []
+    errors = []
+    for game_map, error in iter_maps(directory, map_cache, workers):
+        if game_map is not None:
+            maps.append(game_map)
+        else:
+            errors.append(error)
+    return maps, errors
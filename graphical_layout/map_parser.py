@@ -0,0 +1,155 @@
+# -*-coding:Utf-8 -*
+
+"""
+This module contains the single pass parser of the maps,
+and the exception MapError raised when a map is invalid.
+"""
+
+import io
+import re
+
+import parameters.parameters as parameters
+from graphical_layout.grid import Grid, EMPTY, EXIT
+from graphical_layout.map_analysis import analyse_map
+
+
+# List of reasons that make a map invalid
+INVALID_CHARS_ERROR = "La carte {} contient des caractères invalides."
+U_COUNT_ERROR = "La carte {} ne peut contenir qu'un seul caractère 'U'."
+NON_RECTANGULAR_ERROR = "La carte {} n'est pas rectangulaire."
+TOO_SMALL_ERROR = "La carte {} est trop petite."
+TOO_LARGE_ERROR = "La carte {} est trop volumineuse."
+UNREACHABLE_EXIT_ERROR = "La sortie de la carte {} est inaccessible."
+
+# Matches the first character of a row that is not allowed in a map.
+INVALID_CHARACTER = re.compile('[^{}]'.format(
+    re.escape(''.join(c for c in parameters.valid_map_items if c != '\n'))))
+
+
+class MapError(ValueError):
+    """
+    Raised when a map is invalid.
+    Knows why the map is invalid, and where the error was found.
+    """
+
+    def __init__(self, template, line=None, column=None):
+        """
+        Constructor of MapError.
+        :param template: reason why the map is invalid.
+                         One of the error messages of this module.
+        :param line: line where the error was found, starting from 1.
+        :param column: column where the error was found, starting from 1.
+        """
+        ValueError.__init__(self, template)
+        self.template = template
+        self.line = line
+        self.column = column
+
+        # Name of the map, known once the error reaches the class Map.
+        self.name = ''
+
+    def __str__(self):
+        message = self.template.format(self.name)
+        if self.line is not None:
+            message += " (ligne {}, colonne {})".format(self.line, self.column)
+        return message
+
+
+class ParsedMap:
+    """
+    Result of the parsing of a valid map.
+    """
+
+    def __init__(self, grid, open_cells, analysis):
+        """
+        Constructor of ParsedMap.
+        :param grid: Grid of the map.
+        :param open_cells: number of blank cells in the map.
+        :param analysis: MapAnalysis of the map.
+        """
+        self.grid = grid
+        self.open_cells = open_cells
+        self.analysis = analysis
+
+
+def parse_map(source):
+    """
+    Check and parse a map in a single pass over its rows.
+    The map is valid if:
+    - It contains only valid items for a map,
+    - It has only one exit,
+    - It is rectangular,
+    - It is neither too small nor too big,
+    - Its exit can be reached from at least one blank cell.
+
+    The parsing stops at the first error found, raising a MapError.
+
+    :param source: content of the map, either as a string
+                   or as a file object opened in text mode.
+                   A file is read one row at a time.
+    :return: a ParsedMap.
+    """
+    if isinstance(source, str):
+        source = io.StringIO(source)
+
+    width = None
+    height = 0
+    exits = 0
+    cells = None
+
+    for line_number, line in enumerate(source, 1):
+        row = line.rstrip('\r\n').upper()
+
+        # Check if there are invalid characters
+        invalid = INVALID_CHARACTER.search(row)
+        if invalid is not None:
+            raise MapError(INVALID_CHARS_ERROR, line_number, invalid.start() + 1)
+
+        # Check there is only one exit
+        exits_in_row = row.count('U')
+        if exits_in_row > 0:
+            if exits + exits_in_row > 1:
+                # Report the first exit found after the first one of the map.
+                column = row.find('U')
+                if exits == 0:
+                    column = row.find('U', column + 1)
+                raise MapError(U_COUNT_ERROR, line_number, column + 1)
+            exits += exits_in_row
+
+        # Check the map is a rectangle no wider or higher than the maximum size
+        if width is None:
+            width = len(row)
+            if width > parameters.map_max_size:
+                raise MapError(TOO_LARGE_ERROR, line_number, parameters.map_max_size + 1)
+            stride = width + 2
+            cells = bytearray(stride)
+        elif len(row) != width:
+            raise MapError(NON_RECTANGULAR_ERROR, line_number, min(len(row), width) + 1)
+
+        if line_number > parameters.map_max_size:
+            raise MapError(TOO_LARGE_ERROR, line_number, 1)
+
+        # The initial position of the players is computed at random.
+        # The "X"s are thus replaced with blanks.
+        cells += b'\x00'
+        cells += row.replace('X', ' ').encode()
+        cells += b'\x00'
+        height = line_number
+
+    if exits != 1:
+        raise MapError(U_COUNT_ERROR)
+
+    # Check if the map reaches minimum length requirements
+    if width < parameters.map_min_size or height < parameters.map_min_size:
+        raise MapError(TOO_SMALL_ERROR)
+
+    cells += bytearray(stride)
+    grid = Grid(width, height, cells)
+
+    # Check the exit can be reached, walking through the blanks and the doors.
+    analysis = analyse_map(grid)
+    if analysis.reachable_spawns == 0:
+        row, col = grid.position(cells.find(EXIT))
+        raise MapError(UNREACHABLE_EXIT_ERROR, row + 1, col + 1)
+
+    return ParsedMap(grid, grid.count(EMPTY), analysis)
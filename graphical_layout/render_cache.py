@@ -0,0 +1,68 @@
+# -*-coding:Utf-8 -*
+
+"""
+This module contains the class RenderCache.
+It keeps the rendered state of a game ready to be sent to the players.
+"""
+
+from graphical_layout import frames
+
+KEYFRAME = frames.KEYFRAME.encode()
+
+
+class RenderCache:
+    """
+    Rendered grid of a game, with the players on it.
+
+    The grid is kept in a mutable byte buffer.
+    Each row is followed by '$', which the clients read as a newline.
+    The row r thus starts at the offset r * (width + 1).
+
+    The moves of the players and the edits of walls and doors
+    patch single bytes of the buffer in place:
+    rendering a frame is then a simple copy of the buffer.
+    """
+
+    def __init__(self, game_map):
+        """
+        Constructor of RenderCache.
+        :param game_map: map of the game to render.
+        """
+        self.width = game_map.width
+        self.height = game_map.height
+        self.row_length = self.width + 1
+
+        self.buffer = bytearray()
+        for row in game_map.grid.rows():
+            self.buffer += row.encode()
+            self.buffer += b'$'
+
+    def offset(self, row, col):
+        """
+        Returns the position of the cell (row, col) in the buffer.
+        """
+        return row * self.row_length + col
+
+    def patch(self, row, col, character):
+        """
+        Replace the character shown in the cell (row, col).
+        """
+        self.buffer[self.offset(row, col)] = ord(character)
+
+    def get(self, row, col):
+        """
+        Returns the character shown in the cell (row, col).
+        """
+        return chr(self.buffer[self.offset(row, col)])
+
+    def keyframe(self):
+        """
+        Returns a keyframe of the current state, as bytes.
+        """
+        return b''.join((KEYFRAME, memoryview(self.buffer)[:-1]))
+
+    def text(self):
+        """
+        Returns the current state as a string, one row per line.
+        """
+        return self.buffer.decode().replace('$', '\n')
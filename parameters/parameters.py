@@ -1,37 +1,142 @@
-# -*-coding:Utf-8 -*
-
-""" This module contains some global parameters to be changed if needed """
-
-#################################
-# Map parameters                #
-#################################
-
-# Minimum length of columns and rows a labyrinth must have to be considered valid.
-map_min_size = 5
-
-# Maximum length of columns and rows a labyrinth must have to be considered valid.
-map_max_size = 100
-
-# Characters authorized in maps
-valid_map_items = ['O', 'U', 'X', '.', ' ', '\n']
-
-#################################
-# Storage locations             #
-#################################
-
-# Directory where the maps are stored
-dir_maps = "_data_maps"
-
-# Test directory
-dir_test = "test"
-
-# Directory where the test maps are stored within the test directory
-dir_test_maps = "_test_data_maps"
-
-#################################
-# server parameters             #
-#################################
-
-host = ''
-port = 12800
-client_host = "localhost"
+# -*-coding:Utf-8 -*
+
+""" This module contains some global parameters to be changed if needed """
+
+#################################
+# Map parameters                #
+#################################
+
+# Minimum length of columns and rows a labyrinth must have to be considered valid.
+map_min_size = 5
+
+# Maximum length of columns and rows a labyrinth must have to be considered valid.
+map_max_size = 100
+
+# Characters authorized in maps
+valid_map_items = ['O', 'U', 'X', '.', ' ', '\n']
+
+#################################
+# Storage locations             #
+#################################
+
+# Directory where the maps are stored
+dir_maps = "_data_maps"
+
+# File where the maps already parsed are cached
+map_cache_file = "_cache/maps.bin"
+
+# If False, the maps are parsed again at each start of the server
+use_map_cache = True
+
+# Minimum number of maps to parse for the parsing to be done
+# in parallel by a pool of processes.
+parallel_loading_threshold = 16
+
+# If True, the server accepts clients while the maps are loaded in the background.
+background_map_loading = True
+
+# Test directory
+dir_test = "test"
+
+# Directory where the test maps are stored within the test directory
+dir_test_maps = "_test_data_maps"
+
+#################################
+# server parameters             #
+#################################
+
+host = ''
+port = 12800
+client_host = "localhost"
+
+# Maximum time (in seconds) spent waiting for a message from the clients.
+select_timeout = 0.05
+
+# Maximum number of bytes read from a socket at once.
+recv_buffer_size = 65536
+
+# Number of deltas sent to the players between two full states of the game.
+keyframe_interval = 20
+
+# Mode of the games:
+# - "turns": the players play one after the other,
+# - "ticks": all the players play at the same time, during ticks of tick_duration seconds.
+game_mode = "turns"
+
+# Duration (in seconds) of a tick in the "ticks" mode.
+tick_duration = 0.5
+
+# Time (in seconds) a player has to play his/her turn.
+# Once it is over, the player skips the turn. None for no limit.
+turn_timeout = 60.0
+
+# Number of turns in a row a player can skip before forfeiting the game.
+max_missed_turns = 3
+
+# Maximum duration (in seconds) of a game. None for no limit.
+game_timeout = 1800.0
+
+# Mode of the server:
+# - "session": one game at a time, the map is chosen from the server console,
+# - "lobby": many games at the same time, in rooms created by the players,
+# - "sharded": like "lobby", with the rooms spread over several processes (Unix only).
+server_mode = "session"
+
+# Engine used by the server to wait for the clients:
+# - "asyncio": all the sockets are watched together by one event loop,
+# - "select": each socket is polled one after the other.
+server_engine = "asyncio"
+
+# Maximum size (in bytes) of the messages waiting to be sent to a client of the lobby.
+# A client who doesn't read them fast enough is disconnected.
+max_write_buffer = 1048576
+
+# Number of players of a game started by the matchmaking queue of the lobby.
+matchmaking_fill_threshold = 4
+
+# Maximum time (in seconds) a player waits in the matchmaking queue
+# before a game is started with the players already waiting.
+matchmaking_deadline = 10.0
+
+# If True, the games started by the matchmaking queue with fewer than
+# matchmaking_fill_threshold players are completed with bots.
+matchmaking_bots = False
+
+# Strategy of the bots:
+# - "random": random walk,
+# - "greedy": always towards the exit,
+# - "drill": like "greedy", opening doors in the walls when it is shorter.
+bot_strategy = "greedy"
+
+# Number of processes hosting the rooms in the "sharded" mode.
+# If None, one process per CPU.
+shard_workers = None
+
+# Time (in seconds) between two reports of the load of a process hosting rooms.
+shard_heartbeat_interval = 1.0
+
+# Time (in seconds) after which a process hosting rooms
+# that hasn't reported its load is restarted.
+shard_timeout = 5.0
+
+# If True, each game is recorded in a replay log, in the directory replay_dir.
+record_replays = False
+replay_dir = "_cache/replays"
+
+# Number of turns between two snapshots of the state of a game in its replay log.
+replay_snapshot_interval = 100
+
+# Size (in bytes) of the events of a replay log kept in memory before being written.
+replay_buffer_size = 65536
+
+# Analysis of the balance of the maps (analyse_maps.py):
+# - Number of turns under which a spawn is counted as close to the exit,
+balance_distance = 10
+# - Number of players and of games simulated on each map, with the greedy bots,
+balance_players = 4
+balance_playouts = 50
+# - Maximum number of turns of a simulated game,
+balance_max_rounds = 10000
+# - Files where the analyses are cached, and where the report is written.
+balance_cache_file = "_cache/balance.json"
+balance_report_file = "_cache/balance.txt"
@@ -1,14 +1,31 @@
-# -*-coding:Utf-8 -*
-
-"""
-Execute this file to launch the server side of the game of roboc.
-"""
-
-from sessions.server_session.server_session import MainSession
-from sessions.common_session_tools.interactor import ShellInteractor, ClientInteractorFactory
-
-session = MainSession(ShellInteractor(), ClientInteractorFactory())
-session.load_maps()
-session.launch()
-
-input('Appuyez sur une touche pour continuer...')
+# -*-coding:Utf-8 -*
+
+"""
+Execute this file to launch the server side of the game of roboc.
+"""
+
+import parameters.parameters as parameters
+from sessions.server_session.server_session import MainSession
+from sessions.lobby_session.lobby_session import LobbySession
+from sessions.lobby_session.shards import ShardedLobby
+from sessions.common_session_tools.interactor import ShellInteractor, ClientInteractorFactory
+from sessions.common_session_tools.interactor import AsyncClientInteractorFactory
+
+if parameters.server_mode == "lobby":
+    session = LobbySession(ShellInteractor())
+    session.load_maps()
+elif parameters.server_mode == "sharded":
+    session = ShardedLobby(ShellInteractor(), workers_number=parameters.shard_workers)
+    session.load_maps()
+else:
+    if parameters.server_engine == "asyncio":
+        factory = AsyncClientInteractorFactory()
+    else:
+        factory = ClientInteractorFactory()
+
+    session = MainSession(ShellInteractor(), factory)
+    session.load_maps(background=parameters.background_map_loading)
+
+session.launch()
+
+input('Appuyez sur une touche pour continuer...')
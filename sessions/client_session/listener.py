@@ -1,29 +1,38 @@
-# -*-coding:Utf-8 -*
-
-"""Thread used for listening to the server"""
-
-from threading import Thread
-
-
-class Listener(Thread):
-
-    """Thread used for listening to the server"""
-
-    def __init__(self, client_session):
-        Thread.__init__(self)
-        self.session = client_session
-
-    def run(self):
-        """Keep listening to messages from the server."""
-        while self.session.server_interactor.connected:
-            received = self.session.server_interactor.get("")
-
-            if received not in ["0", ""]:
-                # A message has been received
-                self.session.print(received)
-
-            elif received == "0":
-                # The server has closed the connection.
-                self.session.print('\nLe serveur a mis fin à la connexion.')
-                self.session.server_interactor.close()
-                self.session.server_interactor.connected = False
+# -*-coding:Utf-8 -*
+
+"""Thread used for listening to the server"""
+
+from threading import Thread
+
+from graphical_layout import frames
+
+
+class Listener(Thread):
+
+    """Thread used for listening to the server"""
+
+    def __init__(self, client_session):
+        Thread.__init__(self)
+        self.session = client_session
+
+    def run(self):
+        """Keep listening to messages from the server."""
+        while self.session.server_interactor.connected:
+            received = self.session.server_interactor.get("")
+
+            if frames.is_frame(received):
+                # The state of the game has been received.
+                if self.session.grid_view.apply(received):
+                    self.session.print(self.session.grid_view.render())
+
+            elif received not in ["0", ""]:
+                # A message has been received
+                if received.startswith("Dans cette partie, vous êtes Joueur "):
+                    self.session.grid_view.identifier = int(received.split()[-1])
+                self.session.print(received)
+
+            elif received == "0":
+                # The server has closed the connection.
+                self.session.print('\nLe serveur a mis fin à la connexion.')
+                self.session.server_interactor.close()
+                self.session.server_interactor.connected = False
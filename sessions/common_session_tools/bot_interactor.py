@@ -0,0 +1,195 @@
+# -*-coding:Utf-8 -*
+
+"""
+This module contains the class BotInteractor, and the strategies of the bots.
+A bot is a player controlled by the server: it chooses its moves
+from the state of its game instead of reading them from a client.
+"""
+
+import random
+
+import parameters.parameters as parameters
+from game_logic import rules
+from game_logic.player import ASK_CONTINUE, ASK_MOVE, ASK_NEW_GAME
+from graphical_layout.distance_field import PASSABLE, UNREACHABLE
+from graphical_layout.grid import WALL
+from sessions.common_session_tools.interactor import Interactor
+
+# Answers of the bots to the other questions of the sessions.
+ANSWERS = {
+    # Play again in the main session.
+    ASK_CONTINUE: "O",
+    # Leave the room of the lobby once the game is over.
+    ASK_NEW_GAME: "0",
+}
+
+
+def free_neighbours(player):
+    """
+    Returns the directions in which the player can move,
+    with the position of the cell reached in each direction in the cells of the grid.
+    """
+    grid = player.game_map.grid
+    cells = grid.cells
+    occupancy = player.game.occupancy
+    index = grid.index(player.row, player.col)
+
+    neighbours = []
+    for direction, offset in grid.offsets.items():
+        if cells[index + offset] in PASSABLE:
+            row, col = rules.take_one_step(player.row, player.col, direction)
+            if occupancy.get(row, col) is None:
+                neighbours.append((direction, index + offset))
+    return neighbours
+
+
+def random_walk(player, generator):
+    """
+    Move in a random direction, among the cells the player can move to.
+    """
+    neighbours = free_neighbours(player)
+    if not neighbours:
+        return generator.choice(list(player.game_map.grid.offsets))
+    return generator.choice(neighbours)[0]
+
+
+def greedy(player, generator):
+    """
+    Move to the neighbour closest to the exit.
+    Walk at random if the exit can't be reached from any neighbour.
+    """
+    distances = player.game_map.get_distances().distances
+
+    best = []
+    best_distance = None
+    for direction, index in free_neighbours(player):
+        distance = distances[index]
+        if distance == UNREACHABLE:
+            continue
+        if best_distance is None or distance < best_distance:
+            best, best_distance = [direction], distance
+        elif distance == best_distance:
+            best.append(direction)
+
+    if not best:
+        return random_walk(player, generator)
+    return generator.choice(best)
+
+
+def drill(player, generator):
+    """
+    Open a door in a neighbouring wall when going through it
+    is shorter than the path to the exit. Else, move like greedy.
+
+    Going through a wall takes one turn to open the door,
+    one step into the door, then the path from the door to the exit.
+    """
+    grid = player.game_map.grid
+    cells = grid.cells
+    distances = player.game_map.get_distances().distances
+    index = grid.index(player.row, player.col)
+
+    current = distances[index]
+    best = None
+    best_turns = current if current != UNREACHABLE else None
+    for direction, offset in grid.offsets.items():
+        wall = index + offset
+        if cells[wall] != WALL:
+            continue
+        for beyond in grid.offsets.values():
+            cell = wall + beyond
+            if cell == index or cells[cell] not in PASSABLE or distances[cell] == UNREACHABLE:
+                continue
+            turns = distances[cell] + 3
+            if best_turns is None or turns < best_turns:
+                best, best_turns = direction, turns
+
+    if best is None:
+        return greedy(player, generator)
+    return 'P' + best
+
+
+# Strategies of the bots, by name.
+STRATEGIES = {
+    "random": random_walk,
+    "greedy": greedy,
+    "drill": drill,
+}
+
+
+class BotInteractor(Interactor):
+    """
+    Interactor of a player controlled by the server.
+
+    The bot reads the messages sent to its player to know when
+    a move is expected, then chooses it with its strategy,
+    from the grid, the distances to the exit and the other players.
+    It doesn't read the states of the game sent to the players:
+    a move is chosen in a few microseconds.
+
+    The sessions reading the messages of the players with select and get
+    read the moves of the bots the same way.
+    The sessions to which the messages are pushed give a wake callback:
+    it is called with the player when the bot has a message to send.
+    """
+
+    def __init__(self, strategy=None, generator=None, wake=None):
+        """
+        Constructor of BotInteractor.
+        :param strategy: name of the strategy of the bot.
+                         If None, parameters.bot_strategy.
+        :param generator: random number generator used by the strategy.
+        :param wake: called with the player when the bot has a message to send.
+        """
+        if strategy is None:
+            strategy = parameters.bot_strategy
+        self.strategy = STRATEGIES[strategy]
+        self.generator = generator if generator is not None else random.Random()
+        self.wake = wake
+
+        # Player controlled by the bot.
+        self.player = None
+
+        # Last question the bot has to answer, or None.
+        self.pending = None
+
+    def attach(self, player):
+        """
+        Remember the player controlled by the bot.
+        """
+        self.player = player
+
+    def print(self, message):
+        """
+        Read the message sent to the player,
+        and get ready to answer it if it is a question.
+        """
+        if message == ASK_MOVE or message in ANSWERS:
+            self.pending = message
+            if self.wake is not None:
+                self.wake(self.player)
+
+    def post(self, data):
+        """
+        The messages sent to all the players, like the states of the game, are ignored.
+        """
+        pass
+
+    def get(self, prompt):
+        """
+        Returns the answer to the last question asked to the player.
+        A move is chosen from the current state of the game.
+        """
+        pending, self.pending = self.pending, None
+        if pending == ASK_MOVE:
+            return self.strategy(self.player, self.generator)
+        return ANSWERS.get(pending, '')
+
+    def select(self, my_turn=True):
+        """
+        Returns the interactor if the bot has a question to answer.
+        """
+        if self.pending is not None and my_turn:
+            return self
+        return None
+
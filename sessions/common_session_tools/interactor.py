@@ -1,281 +1,507 @@
-# -*-coding:Utf-8 -*
-
-"""
-Define interactors to communicate with the user.
-"""
-
-import select
-import socket
-import time
-
-import parameters.parameters as parameters
-
-
-class Interactor:
-    """
-    Interactor class.
-    Used to communicate with either a player or the server.
-
-    To play the game:
-    - The ShellInteractor is inherited from Interactor.
-      It is used to communicate with the server through the shell
-    - The DistantInteractor communicates with each player with a socket.
-
-    To test the functionalities of the game:
-    - DeafInteractor simulates the behaviors of the players and the server.
-    """
-
-    @staticmethod
-    def print(message):
-        """
-        Send a message.
-        """
-        pass
-
-    def get(self, prompt):
-        """
-        Get a message.
-        """
-        pass
-
-    def select(self, my_turn=True):
-        """
-        Finds if a message is pending.
-        Useful mostly for DistantIterator child class.
-        Checks whether the socket contains a message.
-        """
-        return self
-
-    def connect(self, other_socket):
-        """Used in the client session to connect to the server"""
-        pass
-
-    def close(self):
-        """
-        Close the interaction with the interactor.
-        Useful mostly for DistantIterator child class.
-        Closes the socket connection.
-        """
-        pass
-
-
-class ShellInteractor(Interactor):
-    """
-    Used to communicate with the user through the shell.
-    Used for the server interactions.
-    """
-    @staticmethod
-    def print(message):
-        """Prints a message to the shell."""
-        print(message)
-
-    def get(self, prompt):
-        """
-        Gets a message entered in the shell.
-        The user can exit the session by entering:
-        - Q or q
-        - 0
-        - Ctrl + C
-        """
-        try:
-            message = input(prompt)
-            if message.upper() == "Q":
-                message = "0"
-        except KeyboardInterrupt:
-            message = "0"
-        return message
-
-
-class DistantInteractor(Interactor):
-    """
-    Communicate with a distant user.
-    Used for communication between the clients and the server.
-    """
-    def __init__(self, socket):
-        """
-        Constructor of DistantInteractor.
-        """
-        self.socket = socket
-
-    def print(self, message):
-        """Sends the message to the socket"""
-        try:
-            self.socket.send(message.encode() + b'\n')
-        except (ConnectionResetError, OSError):
-            pass
-
-    def get(self, prompt):
-        """Receives message from the socket."""
-        try:
-            message = b''
-            while True:
-                c = self.socket.recv(1)
-                if c in [b'\n', b'']:
-                    break
-                if c == b'$':
-                    c = b'\n'
-                message += c
-            message = message.decode()
-        except (ConnectionResetError, OSError):
-            message = "0"
-
-        return message
-
-    def close(self):
-        """
-        Close the interaction with the interactor.
-        """
-        self.socket.close()
-
-
-class ClientInteractor(DistantInteractor):
-    """
-    Communicate with a distant user.
-    Used by the server session to communicate with the clients.
-    """
-
-    def select(self, my_turn):
-        """
-        Return the interactor if a message is pending.
-        Else, returns None.
-        """
-        result = None
-        is_talking, wlist, xlist = select.select([self.socket], [], [], 0.05)
-        if is_talking:
-            result = self
-        return result
-
-
-class ServerInteractor(DistantInteractor):
-    """
-    Communicate with a distant server.
-    Used by the client sessions to communicate with the server.
-    """
-
-    def __init__(self, socket):
-        """
-        Constructor of DistantInteractor.
-        """
-        DistantInteractor.__init__(self, socket)
-        self.connected = False
-
-    def connect(self):
-        """
-        Connect the socket to a distant connection.
-        """
-        # Connect to the server
-        while not self.connected:
-            try:
-                self.socket.connect((parameters.client_host, parameters.port))
-            except ConnectionRefusedError:
-                time.sleep(5)
-            else:
-                self.connected = True
-
-
-class DeafInteractor(Interactor):
-    """
-    Used to simulate a player during tests.
-    - The print method doesn't do anything.
-    - The get method returns one after the other the values
-      of the parameter 'outputs' given to the constructor.
-    Once they've all been returned, we return the empty string.
-    """
-    def __init__(self, outputs):
-        """
-        Constructor of DeafInteractor.
-        """
-        # Which element of outputs is next to be returned by the get method.
-        self.next_output = 0
-
-        # Ouputs is a list.
-        # It lists all the consecutive outputs returned by the get method.
-        self.outputs = outputs
-
-    @staticmethod
-    def print(message):
-        """Stays mute"""
-        pass
-
-    def get(self, prompt):
-        """
-        Returns the next output.
-        If all outputs have already been returned, return the emty string.
-        """
-        if self.next_output < len(self.outputs):
-            result = self.outputs[self.next_output]
-            self.next_output += 1
-        else:
-            result = ''
-        return result
-
-    def select(self, my_turn):
-        """
-        Find if a message is pending.
-        The mock player returns something only if it is his/her turn.
-        """
-        selected = None
-        if self.next_output < len(self.outputs) and my_turn:
-            selected = self
-        return selected
-
-
-class InteractorFactory:
-    def create(self):
-        pass
-
-    def close(self):
-        pass
-
-
-class ClientInteractorFactory(InteractorFactory):
-
-    def __init__(self):
-        """
-        Launch the main connection.
-        """
-        self.main_connection = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.main_connection.bind((parameters.host, parameters.port))
-        self.main_connection.listen(5)
-
-    def create(self):
-        """
-        Detects the new sockets willing to connect to main_connection.
-        Accept the connection requests.
-        Returns new interactors for each connection request.
-        """
-        interactors = []
-        requests, wlist, xlist = select.select([self.main_connection], [], [], 0.05)
-        for connection in requests:
-            client_connection, client_connection_infos = connection.accept()
-            interactors.append(ClientInteractor(client_connection))
-        return interactors
-
-    def close(self):
-        """
-        Closes the main connection opened in the constructor of the factory.
-        """
-        self.main_connection.close()
-
-
-class DeafInteractorFactory(InteractorFactory):
-
-    def __init__(self, messages_per_interactor):
-        """
-        Messages is a list of lists.
-        It contains, for each interactor to be created,
-        the list of everything it will say.
-        """
-        self.messages_per_interactor = messages_per_interactor
-
-    def create(self):
-        """
-        Create one interactor for each of the
-        sublists of messages_per_interactor.
-        """
-        interactors = []
-        for messages in self.messages_per_interactor:
-            interactors.append(DeafInteractor(messages))
-
-        self.messages_per_interactor = []
-        return interactors
+# -*-coding:Utf-8 -*
+
+"""
+Define interactors to communicate with the user.
+"""
+
+import select
+import socket
+import time
+
+import parameters.parameters as parameters
+from sessions.common_session_tools.line_reader import LineReader
+from sessions.common_session_tools.reactor import Reactor
+
+
+class Interactor:
+    """
+    Interactor class.
+    Used to communicate with either a player or the server.
+
+    To play the game:
+    - The ShellInteractor is inherited from Interactor.
+      It is used to communicate with the server through the shell
+    - The DistantInteractor communicates with each player with a socket.
+
+    To test the functionalities of the game:
+    - DeafInteractor simulates the behaviors of the players and the server.
+
+    To add players controlled by the server:
+    - BotInteractor chooses the moves of a player from the state of the game.
+    """
+
+    @staticmethod
+    def print(message):
+        """
+        Send a message.
+        """
+        pass
+
+    def post(self, data):
+        """
+        Send a message already encoded, ending with a newline.
+        Used to share one encoding of a message between several interactors.
+        """
+        self.print(data[:-1].decode())
+
+    def get(self, prompt):
+        """
+        Get a message.
+        """
+        pass
+
+    def cork(self):
+        """
+        Hold back the messages sent until flush is called.
+        Useful mostly for DistantIterator child class.
+        """
+        pass
+
+    def flush(self):
+        """
+        Send the messages held back since cork was called.
+        Useful mostly for DistantIterator child class.
+        """
+        pass
+
+    def select(self, my_turn=True):
+        """
+        Finds if a message is pending.
+        Useful mostly for DistantIterator child class.
+        Checks whether the socket contains a message.
+        """
+        return self
+
+    def connect(self, other_socket):
+        """Used in the client session to connect to the server"""
+        pass
+
+    def attach(self, player):
+        """
+        Called with the player the interactor communicates with.
+        Useful mostly for BotInteractor child class.
+        """
+        pass
+
+    def close(self):
+        """
+        Close the interaction with the interactor.
+        Useful mostly for DistantIterator child class.
+        Closes the socket connection.
+        """
+        pass
+
+
+class ShellInteractor(Interactor):
+    """
+    Used to communicate with the user through the shell.
+    Used for the server interactions.
+    """
+    @staticmethod
+    def print(message):
+        """Prints a message to the shell."""
+        print(message)
+
+    def get(self, prompt):
+        """
+        Gets a message entered in the shell.
+        The user can exit the session by entering:
+        - Q or q
+        - 0
+        - Ctrl + C
+        """
+        try:
+            message = input(prompt)
+            if message.upper() == "Q":
+                message = "0"
+        except KeyboardInterrupt:
+            message = "0"
+        return message
+
+
+class DistantInteractor(Interactor):
+    """
+    Communicate with a distant user.
+    Used for communication between the clients and the server.
+    """
+    def __init__(self, socket):
+        """
+        Constructor of DistantInteractor.
+        """
+        self.socket = socket
+
+        # Used to read the messages received from the socket line by line.
+        self.reader = LineReader(socket)
+
+        # Messages held back while the interactor is corked.
+        self.outbox = None
+
+    def print(self, message):
+        """Sends the message to the socket"""
+        self.post(message.encode() + b'\n')
+
+    def post(self, data):
+        """
+        Sends the encoded message to the socket.
+        If the interactor is corked, keep it for the next flush.
+        """
+        if self.outbox is not None:
+            self.outbox.append(data)
+            return
+        try:
+            self.socket.send(data)
+        except (ConnectionResetError, OSError):
+            pass
+
+    def cork(self):
+        """
+        Hold back the messages sent until flush is called.
+        """
+        if self.outbox is None:
+            self.outbox = []
+
+    def flush(self):
+        """
+        Send all the messages held back since cork was called
+        with a single vectored write.
+        """
+        outbox, self.outbox = self.outbox, None
+        if not outbox:
+            return
+        try:
+            if hasattr(self.socket, 'sendmsg'):
+                sent = self.socket.sendmsg(outbox)
+                if sent < sum(len(data) for data in outbox):
+                    self.socket.sendall(b''.join(outbox)[sent:])
+            else:
+                self.socket.sendall(b''.join(outbox))
+        except (ConnectionResetError, OSError):
+            pass
+
+    def get(self, prompt):
+        """Receives message from the socket."""
+        return self.reader.readline()
+
+    def close(self):
+        """
+        Close the interaction with the interactor.
+        """
+        self.socket.close()
+
+
+class ClientInteractor(DistantInteractor):
+    """
+    Communicate with a distant user.
+    Used by the server session to communicate with the clients.
+    """
+
+    def select(self, my_turn):
+        """
+        Return the interactor if a message is pending.
+        Else, returns None.
+        """
+        if self.reader.has_line():
+            return self
+
+        result = None
+        is_talking, wlist, xlist = select.select([self.socket], [], [], parameters.select_timeout)
+        if is_talking:
+            result = self
+        return result
+
+
+class AsyncClientInteractor(ClientInteractor):
+    """
+    Communicate with a distant user.
+    Used by the server session when the asyncio engine is enabled.
+    Its socket is watched by a Reactor shared with all the other clients.
+    """
+
+    def __init__(self, socket, reactor):
+        """
+        Constructor of AsyncClientInteractor.
+        """
+        ClientInteractor.__init__(self, socket)
+        self.reactor = reactor
+        self.reactor.register(self.socket)
+
+        # Epoch of the reactor in which the socket was last checked.
+        self.epoch = -1
+
+    def select(self, my_turn):
+        """
+        Return the interactor if a message is pending.
+        Else, returns None.
+        """
+        if self.reader.has_line():
+            return self
+
+        result = None
+        is_talking, self.epoch = self.reactor.select(self.socket, self.epoch)
+        if is_talking:
+            result = self
+        return result
+
+    def get(self, prompt):
+        """Receives message from the socket."""
+        message = ClientInteractor.get(self, prompt)
+        self.reactor.consume(self.socket)
+        return message
+
+    def close(self):
+        """
+        Stop watching the socket, then close it.
+        """
+        self.reactor.unregister(self.socket)
+        ClientInteractor.close(self)
+
+
+class StreamInteractor(Interactor):
+    """
+    Communicate with a distant user through asyncio streams.
+    Used by the lobby session, which runs all its games on one event loop.
+    The messages of the user are not read by the interactor:
+    they are pushed to the session by the coroutine reading the stream.
+
+    The messages are written without waiting for the user to receive them.
+    If more than parameters.max_write_buffer bytes are waiting to be sent,
+    the user doesn't read them: the connection is dropped.
+    """
+
+    def __init__(self, writer):
+        """
+        Constructor of StreamInteractor.
+        :param writer: asyncio.StreamWriter of the connection.
+        """
+        self.writer = writer
+
+        # Messages held back while the interactor is corked.
+        self.outbox = None
+
+    def print(self, message):
+        """Sends the message to the stream"""
+        self.post(message.encode() + b'\n')
+
+    def post(self, data):
+        """
+        Sends the encoded message to the stream.
+        If the interactor is corked, keep it for the next flush.
+        """
+        if self.outbox is not None:
+            self.outbox.append(data)
+        elif not self.writer.is_closing():
+            self.writer.write(data)
+            self.check_backlog()
+
+    def select(self, my_turn=True):
+        """The messages are pushed to the session: nothing is ever pending."""
+        return None
+
+    def cork(self):
+        """
+        Hold back the messages sent until flush is called.
+        """
+        if self.outbox is None:
+            self.outbox = []
+
+    def flush(self):
+        """
+        Send all the messages held back since cork was called at once.
+        """
+        outbox, self.outbox = self.outbox, None
+        if outbox and not self.writer.is_closing():
+            self.writer.writelines(outbox)
+            self.check_backlog()
+
+    def check_backlog(self):
+        """
+        Drop the connection if too many messages are waiting to be sent.
+        The coroutine reading the stream then disconnects the user.
+        """
+        transport = self.writer.transport
+        if transport.get_write_buffer_size() > parameters.max_write_buffer:
+            transport.abort()
+
+    def close(self):
+        """
+        Close the stream.
+        """
+        self.flush()
+        self.writer.close()
+
+
+class ServerInteractor(DistantInteractor):
+    """
+    Communicate with a distant server.
+    Used by the client sessions to communicate with the server.
+    """
+
+    def __init__(self, socket):
+        """
+        Constructor of DistantInteractor.
+        """
+        DistantInteractor.__init__(self, socket)
+        self.connected = False
+
+    def connect(self):
+        """
+        Connect the socket to a distant connection.
+        """
+        # Connect to the server
+        while not self.connected:
+            try:
+                self.socket.connect((parameters.client_host, parameters.port))
+            except ConnectionRefusedError:
+                time.sleep(5)
+            else:
+                self.connected = True
+
+
+class DeafInteractor(Interactor):
+    """
+    Used to simulate a player during tests.
+    - The print method doesn't do anything.
+    - The get method returns one after the other the values
+      of the parameter 'outputs' given to the constructor.
+    Once they've all been returned, we return the empty string.
+    """
+    def __init__(self, outputs):
+        """
+        Constructor of DeafInteractor.
+        """
+        # Which element of outputs is next to be returned by the get method.
+        self.next_output = 0
+
+        # Ouputs is a list.
+        # It lists all the consecutive outputs returned by the get method.
+        self.outputs = outputs
+
+    @staticmethod
+    def print(message):
+        """Stays mute"""
+        pass
+
+    def get(self, prompt):
+        """
+        Returns the next output.
+        If all outputs have already been returned, return the emty string.
+        """
+        if self.next_output < len(self.outputs):
+            result = self.outputs[self.next_output]
+            self.next_output += 1
+        else:
+            result = ''
+        return result
+
+    def select(self, my_turn):
+        """
+        Find if a message is pending.
+        The mock player returns something only if it is his/her turn.
+        """
+        selected = None
+        if self.next_output < len(self.outputs) and my_turn:
+            selected = self
+        return selected
+
+
+class InteractorFactory:
+    def create(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class ClientInteractorFactory(InteractorFactory):
+
+    def __init__(self):
+        """
+        Launch the main connection.
+        """
+        self.main_connection = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.main_connection.bind((parameters.host, parameters.port))
+        self.main_connection.listen(5)
+
+    def create(self):
+        """
+        Detects the new sockets willing to connect to main_connection.
+        Accept the connection requests.
+        Returns new interactors for each connection request.
+        """
+        interactors = []
+        requests, wlist, xlist = select.select([self.main_connection], [], [], parameters.select_timeout)
+        for connection in requests:
+            client_connection, client_connection_infos = connection.accept()
+            interactors.append(ClientInteractor(client_connection))
+        return interactors
+
+    def close(self):
+        """
+        Closes the main connection opened in the constructor of the factory.
+        """
+        self.main_connection.close()
+
+
+class AsyncClientInteractorFactory(ClientInteractorFactory):
+    """
+    Factory of the asyncio server engine.
+    The listening socket and all the client sockets are watched
+    together by one Reactor. Waiting for new connections and
+    for the messages of the players is thus done in a single wait,
+    whatever the number of players.
+    """
+
+    def __init__(self):
+        """
+        Launch the main connection and watch it with a new reactor.
+        """
+        ClientInteractorFactory.__init__(self)
+        self.reactor = Reactor()
+        self.reactor.register(self.main_connection)
+
+        # Epoch of the reactor in which the main connection was last checked.
+        self.epoch = -1
+
+    def create(self):
+        """
+        Accept the pending connection requests.
+        Returns new interactors for each connection request.
+        """
+        interactors = []
+        is_requested, self.epoch = self.reactor.select(self.main_connection, self.epoch)
+        if is_requested:
+            client_connection, client_connection_infos = self.main_connection.accept()
+            self.reactor.consume(self.main_connection)
+            interactors.append(AsyncClientInteractor(client_connection, self.reactor))
+        return interactors
+
+    def close(self):
+        """
+        Closes the main connection and the reactor.
+        """
+        self.reactor.unregister(self.main_connection)
+        ClientInteractorFactory.close(self)
+        self.reactor.close()
+
+
+class DeafInteractorFactory(InteractorFactory):
+
+    def __init__(self, messages_per_interactor):
+        """
+        Messages is a list of lists.
+        It contains, for each interactor to be created,
+        the list of everything it will say.
+        """
+        self.messages_per_interactor = messages_per_interactor
+
+    def create(self):
+        """
+        Create one interactor for each of the
+        sublists of messages_per_interactor.
+        """
+        interactors = []
+        for messages in self.messages_per_interactor:
+            interactors.append(DeafInteractor(messages))
+
+        self.messages_per_interactor = []
+        return interactors
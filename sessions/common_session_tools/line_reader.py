@@ -0,0 +1,95 @@
+# -*-coding:Utf-8 -*
+
+"""
+This module contains the class LineReader.
+It is used by the DistantInteractors to read the messages
+received from a socket, one line at a time.
+"""
+
+from collections import deque
+
+import parameters.parameters as parameters
+
+
+class LineReader:
+    """
+    Buffered reader of the lines received from a socket.
+
+    The socket is read in bulk into a reusable buffer.
+    The bytes received are split on newlines as they arrive,
+    each complete line is decoded once and kept until it is asked for.
+    The bytes following the last newline are kept for the next read.
+
+    As with the original DistantInteractor:
+    - the character '$' in a line is replaced by a newline,
+    - "0" is returned when the connection is lost.
+    """
+
+    def __init__(self, sock, size=parameters.recv_buffer_size):
+        """
+        Constructor of LineReader.
+        :param sock: socket to read from.
+        :param size: maximum number of bytes read by one call to recv_into.
+        """
+        self.socket = sock
+        self.buffer = bytearray(size)
+        self.view = memoryview(self.buffer)
+
+        # Bytes received after the last newline.
+        self.pending = bytearray()
+
+        # Complete lines received but not read yet.
+        self.lines = deque()
+
+        # True once the connection has been closed by the distant user.
+        self.closed = False
+
+    def has_line(self):
+        """
+        Return True if a line can be returned without reading the socket.
+        """
+        return len(self.lines) > 0
+
+    def readline(self):
+        """
+        Return the next line received from the socket.
+        Block until a complete line has been received.
+        """
+        while not self.lines:
+            if self.closed:
+                return "0"
+            self.fill()
+        return self.lines.popleft()
+
+    def fill(self):
+        """
+        Read the socket once and store the complete lines received.
+        """
+        try:
+            size = self.socket.recv_into(self.buffer)
+        except (ConnectionResetError, OSError):
+            size = 0
+
+        if size == 0:
+            # The connection has been closed.
+            # The last line may not end with a newline.
+            self.closed = True
+            if self.pending:
+                self.lines.append(self.decode(self.pending))
+                self.pending = bytearray()
+            return
+
+        self.pending += self.view[:size]
+
+        # Only split if the bytes just received contain a newline.
+        if self.buffer.find(b'\n', 0, size) != -1:
+            parts = self.pending.split(b'\n')
+            self.pending = parts.pop()
+            self.lines.extend(self.decode(part) for part in parts)
+
+    @staticmethod
+    def decode(line):
+        """
+        Convert the bytes of one line into a message.
+        """
+        return line.replace(b'$', b'\n').decode(errors='replace')
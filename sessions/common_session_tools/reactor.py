@@ -0,0 +1,144 @@
+# -*-coding:Utf-8 -*
+
+"""
+This module contains the class Reactor.
+It is used by the asyncio server engine to wait on
+all the client sockets and on the listening socket at once.
+"""
+
+import asyncio
+
+import parameters.parameters as parameters
+
+
+class Reactor:
+    """
+    Wait on several sockets together with an asyncio event loop.
+
+    Each socket is registered as a reader of the event loop.
+    When one of them becomes readable, its file descriptor
+    is added to the set of ready sockets.
+
+    The sockets are scanned one after the other by their owners
+    (interactors and factory). To keep the cost of one scan independent
+    of the number of sockets, a scan blocks at most once:
+    the reactor only waits when an owner checks its socket
+    a second time without anything having changed since.
+
+    Only the sockets checked during the current epoch can end a wait:
+    a socket nobody is polling (for example the listening socket during a game)
+    stays ready without waking up the owners which are polling.
+    Once readable, a socket is not watched anymore until it is consumed.
+    """
+
+    def __init__(self, timeout=parameters.select_timeout):
+        """
+        Constructor of Reactor.
+        :param timeout: maximum time spent waiting for a socket to be readable.
+        """
+        self.loop = asyncio.new_event_loop()
+        self.timeout = timeout
+
+        # File descriptors of the sockets watched, and of those that can be read without blocking.
+        self.registered = set()
+        self.ready = set()
+
+        # Epoch in which each socket was last checked by its owner, by file descriptor.
+        self.polled = {}
+
+        # Incremented after each wait.
+        # Owners remember the epoch in which they last checked their socket.
+        self.epoch = 0
+
+        # Set by the event loop as soon as one socket is readable.
+        self.wakeup = asyncio.Event()
+
+    def register(self, sock):
+        """
+        Start watching the socket.
+        """
+        self.registered.add(sock.fileno())
+        self.loop.add_reader(sock.fileno(), self.on_readable, sock.fileno())
+
+    def unregister(self, sock):
+        """
+        Stop watching the socket.
+        """
+        fd = sock.fileno()
+        if fd >= 0:
+            self.loop.remove_reader(fd)
+            self.registered.discard(fd)
+            self.ready.discard(fd)
+            self.polled.pop(fd, None)
+
+    def on_readable(self, fd):
+        """
+        Called by the event loop when the socket fd can be read.
+        The socket stays ready until it is consumed: stop watching it meanwhile.
+        """
+        self.loop.remove_reader(fd)
+        self.ready.add(fd)
+        self.wakeup.set()
+
+    def consume(self, sock):
+        """
+        Called once the pending data of the socket has been read.
+        If the socket still has data, the next wait will detect it again.
+        """
+        fd = sock.fileno()
+        if fd in self.ready:
+            self.ready.discard(fd)
+            if fd in self.registered:
+                self.loop.add_reader(fd, self.on_readable, fd)
+
+    def select(self, sock, last_epoch):
+        """
+        Check whether sock is readable.
+        last_epoch is the epoch in which the owner of sock last checked it.
+        Returns whether the socket is readable, and the current epoch.
+        """
+        fd = sock.fileno()
+        self.polled[fd] = self.epoch
+        if last_epoch == self.epoch:
+            self.wait()
+        return fd in self.ready, self.epoch
+
+    def wait(self):
+        """
+        Wait until at least one of the sockets checked during this epoch is readable,
+        or until the timeout has expired.
+        """
+        if not self.polled_ready():
+            self.loop.run_until_complete(self.wait_for_wakeup())
+        self.epoch += 1
+
+    def polled_ready(self):
+        """
+        Returns whether one of the sockets checked during this epoch is readable.
+        """
+        return any(self.polled.get(fd) == self.epoch for fd in self.ready)
+
+    async def wait_for_wakeup(self):
+        """
+        Coroutine returning when a socket checked during this epoch is readable,
+        or after the timeout.
+        """
+        deadline = self.loop.time() + self.timeout
+        while not self.polled_ready():
+            self.wakeup.clear()
+            remaining = deadline - self.loop.time()
+            if remaining <= 0:
+                break
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+
+    def close(self):
+        """
+        Close the event loop.
+        """
+        self.registered.clear()
+        self.ready.clear()
+        self.polled.clear()
+        self.loop.close()
@@ -0,0 +1,389 @@
+# -*-coding:Utf-8 -*
+
+"""
+This module contains the class LobbySession.
+LobbySession is a server hosting many games at the same time.
+"""
+
+import asyncio
+import time
+
+import parameters.parameters as parameters
+from graphical_layout import map_loader
+from graphical_layout.map_cache import MapCache
+from game_logic.player import Player
+from game_logic.scheduler import Scheduler
+from sessions.common_session_tools.bot_interactor import BotInteractor
+from sessions.common_session_tools.interactor import Interactor, StreamInteractor
+from sessions.common_session_tools.line_reader import LineReader
+from sessions.common_session_tools.session import Session
+from sessions.lobby_session.matchmaker import Matchmaker
+from sessions.lobby_session.room import Room
+
+
+class LobbySession(Session):
+    """
+    Class LobbySession.
+    Hosts many concurrent games in one server, all multiplexed
+    over one asyncio event loop.
+
+    The clients connecting to the lobby choose a room,
+    or join the matchmaking queue to be placed in a room automatically.
+    Each room has its own map and players, and plays its own games.
+    The messages of each player are routed to the room he/she is in.
+    """
+
+    def __init__(self, interactor, maps=None):
+        """
+        Generates a lobby session.
+        - interactor is used to interact with the server.
+        - maps are the maps the rooms can be created with.
+          They can also be loaded with load_maps.
+        """
+        Session.__init__(self, interactor)
+
+        self.maps = maps if maps is not None else []
+
+        # Rooms of the lobby, by name.
+        self.rooms = {}
+
+        # Room of each player who has joined one.
+        self.locations = {}
+
+        # Players connected to the lobby.
+        self.connected_players = []
+
+        # asyncio server accepting the connections.
+        self.server = None
+
+        # Queue of the players waiting for a game, created with the first player.
+        self.matchmaker = None
+
+        # Call of match_players scheduled for the next deadline of the queue.
+        self.matchmaking = None
+
+        # Number of rooms created by the matchmaking.
+        self.matches = 0
+
+        # Deadlines of the games of all the rooms,
+        # run by one call of the event loop at the earliest deadline.
+        self.scheduler = Scheduler()
+        self.scheduler.on_change = self.schedule_deadlines
+        self.deadlines = None
+
+    def load_maps(self):
+        """
+        Loads maps present in dir_maps.
+        """
+        map_cache = MapCache()
+        if parameters.use_map_cache:
+            map_cache.load()
+
+        maps, errors = map_loader.load_maps(parameters.dir_maps, map_cache)
+        self.maps.extend(maps)
+
+        if parameters.use_map_cache:
+            map_cache.save()
+
+        for error in errors:
+            self.print(error)
+
+    def launch(self):
+        """
+        Launch the session.
+        The lobby runs until the server is interrupted with Ctrl + C.
+        """
+        try:
+            asyncio.run(self.serve(parameters.host, parameters.port))
+        except KeyboardInterrupt:
+            pass
+        self.print("Fermeture de la connexion.")
+
+    async def serve(self, host, port):
+        """
+        Accept the connections of the clients until the server is closed.
+        """
+        await self.start(host, port)
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def start(self, host, port):
+        """
+        Start listening to the connections of the clients.
+        """
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        self.print("Salon ouvert. {} labyrinthe(s) disponible(s).".format(len(self.maps)))
+
+    async def handle_connection(self, reader, writer, initial=b''):
+        """
+        Coroutine run for each client, from its connection to its disconnection.
+        Reads the messages of the client, and routes them.
+
+        If the client has been greeted and has already sent some data
+        to another process, this data is given as initial.
+        """
+        player = Player(StreamInteractor(writer))
+        self.connected_players.append(player)
+        if not initial:
+            self.greet(player)
+
+        try:
+            while not player.has_left:
+                if b'\n' in initial:
+                    line, initial = initial.split(b'\n', 1)
+                else:
+                    line, initial = initial + await reader.readline(), b''
+                    if not line.endswith(b'\n'):
+                        # The client has closed the connection.
+                        self.disconnect(player)
+                        break
+                self.receive(player, LineReader.decode(line.rstrip(b'\r\n')))
+                await writer.drain()
+        except (ConnectionError, OSError):
+            self.disconnect(player)
+
+    async def adopt(self, sock, initial):
+        """
+        Handle the connection of a client accepted by another process.
+        :param sock: socket connected to the client.
+        :param initial: data already received from the client.
+        """
+        reader, writer = await asyncio.open_connection(sock=sock)
+        await self.handle_connection(reader, writer, initial)
+
+    def load(self):
+        """
+        Returns the load of the lobby: the number of players connected
+        and the names of the rooms opened.
+        """
+        load = {"connections": len(self.connected_players), "rooms": list(self.rooms)}
+        if self.matchmaker is not None:
+            load["queue"] = self.matchmaker.stats()
+        return load
+
+    def greet(self, player):
+        """
+        Greet a new client and tell him/her how to join a room.
+        """
+        player.send("Bienvenue dans le jeu Roboc.")
+        self.print_rooms(player)
+        self.print_maps(player)
+        player.send("Saisissez R, le nom d'une salle et le numéro d'un labyrinthe "
+                    "pour créer une salle (ex: R salle1 2).")
+        player.send("Saisissez R et le nom d'une salle pour la rejoindre (ex: R salle1).")
+        player.send("Saisissez A pour rejoindre automatiquement une partie.")
+
+    def receive(self, player, message):
+        """
+        Route a message received from a player.
+        """
+        room = self.locations.get(player)
+
+        if room is not None and (message != "0" or room.is_playing()):
+            room.receive(player, message)
+            if player.has_left:
+                self.disconnect(player)
+
+        elif message == "0":
+            self.disconnect(player)
+
+        elif message.upper() == "A":
+            self.enqueue(player)
+
+        else:
+            words = message.split()
+            if len(words) in [2, 3] and words[0].upper() == "R":
+                self.join_room(player, *words[1:])
+            else:
+                player.send("Saisie incorrecte.")
+                self.greet(player)
+
+    def join_room(self, player, name, map_number=None):
+        """
+        Add a player to the room called name.
+        If the room doesn't exist, create it with the map map_number.
+        """
+        room = self.rooms.get(name)
+
+        if room is None:
+            valid_inputs = [str(n) for n in range(1, len(self.maps) + 1)]
+            if map_number not in valid_inputs:
+                player.send("Pour créer la salle {}, saisissez aussi "
+                            "le numéro de son labyrinthe.".format(name))
+                return
+            room = Room(name, self.maps[int(map_number) - 1], Interactor(), self.scheduler)
+            self.rooms[name] = room
+            self.print("Salle {0} créée (labyrinthe {1}). {2} salle(s) ouverte(s)."
+                       .format(name, room.game_map, len(self.rooms)))
+
+        if room.is_full():
+            player.send("La salle {} est pleine.".format(name))
+            return
+
+        self.locations[player] = room
+        room.add_player(player)
+
+    def enqueue(self, player):
+        """
+        Add a player to the matchmaking queue.
+        """
+        if len(self.maps) == 0:
+            player.send("Aucun labyrinthe disponible.")
+            return
+        if self.matchmaker is None:
+            self.matchmaker = Matchmaker(self.maps)
+
+        self.matchmaker.add(player, time.monotonic())
+        player.send("Vous êtes dans la file d'attente. "
+                    "La partie commencera dès que d'autres joueurs seront prêts.")
+        self.match_players()
+
+    def match_players(self):
+        """
+        Start a game for each group of players formed by the matchmaker,
+        then wait for the next deadline of the queue.
+        """
+        self.matchmaking = None
+        for players, game_map in self.matchmaker.match(time.monotonic()):
+            name = self.match_name()
+            room = Room(name, game_map, Interactor(), self.scheduler)
+            self.rooms[name] = room
+            for player in players:
+                self.locations[player] = room
+                room.add_player(player)
+
+            if parameters.matchmaking_bots:
+                self.add_bots(room, min(self.matchmaker.fill_threshold, game_map.max_players))
+
+            stats = self.matchmaker.stats()
+            self.print("Partie {0} lancée avec {1} joueur(s) (labyrinthe {2}). "
+                       "Attente moyenne : {3:.1f} s, {4} joueur(s) en attente."
+                       .format(name, len(players), game_map,
+                               stats["average_wait"], stats["waiting"]))
+            room.start_game()
+            if room.is_empty():
+                del self.rooms[name]
+
+        self.schedule_matchmaking()
+
+    def match_name(self):
+        """
+        Returns the name of the room of a new game of the matchmaking queue.
+        The names of the rooms created by the players are skipped.
+        """
+        self.matches += 1
+        while "partie{}".format(self.matches) in self.rooms:
+            self.matches += 1
+        return "partie{}".format(self.matches)
+
+    def add_bots(self, room, size):
+        """
+        Complete the players of a room with bots, up to size players.
+        The bots leave the room at the end of the game.
+        """
+        while len(room.players) < size:
+            bot = Player(BotInteractor(wake=self.wake_bot))
+            self.locations[bot] = room
+            room.add_player(bot)
+
+    def wake_bot(self, player):
+        """
+        Called when a bot has a message to send.
+        The message is read once the current message has been handled.
+        """
+        asyncio.get_running_loop().call_soon(self.play_bot, player)
+
+    def play_bot(self, player):
+        """
+        Route the message of a bot, if it is still waiting to be read.
+        """
+        if player.select(True) is not None:
+            self.receive(player, player.recv())
+
+    def schedule_matchmaking(self):
+        """
+        Schedule a call of match_players for the next deadline of the queue.
+        """
+        if self.matchmaking is not None:
+            self.matchmaking.cancel()
+            self.matchmaking = None
+
+        deadline = self.matchmaker.next_deadline()
+        if deadline is not None:
+            loop = asyncio.get_running_loop()
+            delay = max(0, deadline - time.monotonic())
+            self.matchmaking = loop.call_later(delay, self.match_players)
+
+    def schedule_deadlines(self, deadline):
+        """
+        Run the deadlines of the games when the earliest one is reached.
+        """
+        if self.deadlines is not None:
+            self.deadlines.cancel()
+        loop = asyncio.get_running_loop()
+        self.deadlines = loop.call_at(deadline, self.run_deadlines)
+
+    def run_deadlines(self):
+        """
+        Run the deadlines of the games that are reached.
+        """
+        self.deadlines = None
+        self.scheduler.run_due()
+
+    def disconnect(self, player):
+        """
+        Disconnect a player, and remove him/her from his/her room.
+        Empty rooms are closed.
+        """
+        if self.matchmaker is not None:
+            self.matchmaker.remove(player)
+
+        room = self.locations.pop(player, None)
+        if room is not None:
+            room.remove_player(player)
+            if room.is_empty():
+                del self.rooms[room.name]
+
+        if not player.has_left:
+            player.send("Au revoir!")
+            player.send("0")
+            player.close()
+
+        if player in self.connected_players:
+            self.connected_players.remove(player)
+
+    def print_rooms(self, player):
+        """
+        Send the list of the rooms to a player.
+        """
+        if len(self.rooms) == 0:
+            player.send("\nAucune salle ouverte.")
+        else:
+            player.send("\nSalles ouvertes :")
+            for room in self.rooms.values():
+                message = " - {0} : labyrinthe {1}, {2} joueur(s){3}"
+                status = ", partie en cours" if room.is_playing() else ""
+                player.send(message.format(room, room.game_map, len(room.players), status))
+
+    def print_maps(self, player):
+        """
+        Send the list of the maps to a player.
+        """
+        player.send("\nLabyrinthes existants :")
+        for i, m in enumerate(self.maps):
+            player.send(" - {0} : Labyrinthe {1}".format(i + 1, m))
+
+    def close(self):
+        """
+        Disconnect all the players and stop accepting connections.
+        """
+        if self.matchmaking is not None:
+            self.matchmaking.cancel()
+            self.matchmaking = None
+        if self.deadlines is not None:
+            self.deadlines.cancel()
+            self.deadlines = None
+        for player in list(self.connected_players):
+            self.disconnect(player)
+        if self.server is not None:
+            self.server.close()
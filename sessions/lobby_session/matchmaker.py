@@ -0,0 +1,119 @@
+# -*-coding:Utf-8 -*
+
+"""
+This module contains the class Matchmaker.
+The Matchmaker groups the players waiting in the queue of a lobby,
+and chooses the map of the game of each group.
+"""
+
+from bisect import bisect_left
+from itertools import islice
+
+import parameters.parameters as parameters
+
+
+class Matchmaker:
+    """
+    Queue of the players waiting for a game.
+
+    A group is formed as soon as fill_threshold players are waiting,
+    or when the first player of the queue has waited for deadline seconds.
+    Each group plays on the smallest map that can hold all its players.
+    """
+
+    def __init__(self, maps, fill_threshold=None, deadline=None):
+        """
+        Constructor of Matchmaker.
+        :param maps: maps the games can be played on.
+        :param fill_threshold: number of players of a full group.
+        :param deadline: maximum time (in seconds) a player waits for a group,
+                         as long as the queue is not empty.
+        """
+        if fill_threshold is None:
+            fill_threshold = parameters.matchmaking_fill_threshold
+        if deadline is None:
+            deadline = parameters.matchmaking_deadline
+
+        # Index of the maps by capacity: the capacities are sorted,
+        # and maps[i] can hold capacities[i] players.
+        indexed = sorted(maps, key=lambda m: m.max_players)
+        self.maps = [m for m in indexed if m.max_players > 0]
+        self.capacities = [m.max_players for m in self.maps]
+
+        max_capacity = self.capacities[-1] if self.capacities else 0
+        self.fill_threshold = max(1, min(fill_threshold, max_capacity))
+        self.deadline = deadline
+
+        # Players waiting, with the time they joined the queue, oldest first.
+        self.queue = {}
+
+        # Waiting times of the players who have been placed in a group.
+        self.waited = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def __len__(self):
+        return len(self.queue)
+
+    def add(self, player, now):
+        """
+        Add a player at the end of the queue.
+        """
+        self.queue[player] = now
+
+    def remove(self, player):
+        """
+        Remove a player from the queue, if he/she is waiting.
+        """
+        self.queue.pop(player, None)
+
+    def choose_map(self, size):
+        """
+        Returns the smallest map that can hold size players.
+        If none is big enough, returns the biggest map.
+        """
+        i = bisect_left(self.capacities, size)
+        return self.maps[min(i, len(self.maps) - 1)]
+
+    def next_deadline(self):
+        """
+        Returns the time when the first player of the queue reaches the deadline,
+        or None if the queue is empty.
+        """
+        for enqueued in self.queue.values():
+            return enqueued + self.deadline
+        return None
+
+    def match(self, now):
+        """
+        Form the groups that are ready to play.
+        Returns a list of (players, map) for each group formed.
+        """
+        groups = []
+        while self.maps and self.queue:
+            if len(self.queue) < self.fill_threshold and now < self.next_deadline():
+                break
+
+            size = min(len(self.queue), self.fill_threshold)
+            players = list(islice(self.queue, size))
+            for player in players:
+                self.record_wait(now - self.queue.pop(player))
+            groups.append((players, self.choose_map(size)))
+        return groups
+
+    def record_wait(self, wait):
+        """
+        Record the time a player has waited in the queue.
+        """
+        self.waited += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    def stats(self):
+        """
+        Returns the metrics of the queue: number of players waiting,
+        number of players placed, average and maximum waiting times.
+        """
+        average = self.total_wait / self.waited if self.waited else 0.0
+        return {"waiting": len(self.queue), "placed": self.waited,
+                "average_wait": average, "max_wait": self.max_wait}
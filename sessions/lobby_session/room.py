@@ -0,0 +1,134 @@
+# -*-coding:Utf-8 -*
+
+"""
+This module contains the class Room.
+A lobby session hosts many rooms, each one playing its own games.
+"""
+
+from game_logic.player import ASK_NEW_GAME
+from game_logic.tick_game import new_game
+
+
+class Room:
+    """
+    A room of the lobby.
+    The players of a room play together on the map of the room,
+    one game after the other.
+    """
+
+    def __init__(self, name, game_map, interactor, scheduler=None):
+        """
+        Constructor of Room.
+        :param name: name of the room, chosen by the player who created it.
+        :param game_map: map used for all the games of the room.
+        :param interactor: used by the games to interact with the server.
+        :param scheduler: Scheduler running the deadlines of the games.
+        """
+        self.name = name
+        self.game_map = game_map
+        self.interactor = interactor
+        self.scheduler = scheduler
+
+        # Players in the room, playing or waiting for the next game.
+        self.players = []
+
+        # Game currently played in the room, None between two games.
+        self.game = None
+
+        # Keep track of the number of games played in the room.
+        self.games_played = 0
+
+    def __repr__(self):
+        return self.name
+
+    def is_full(self):
+        """
+        Returns True if no more players can join the room.
+        """
+        return len(self.players) >= self.game_map.max_players
+
+    def is_empty(self):
+        """
+        Returns True if there is no player left in the room.
+        """
+        return len(self.players) == 0
+
+    def is_playing(self):
+        """
+        Returns True if a game is being played in the room.
+        """
+        return self.game is not None
+
+    def add_player(self, player):
+        """
+        Add a new player to the room.
+        """
+        for other_player in self.players:
+            other_player.send("Un nouveau joueur a rejoint la salle.")
+
+        self.players.append(player)
+
+        message = "Vous avez rejoint la salle {0} (labyrinthe {1})."
+        player.send(message.format(self.name, self.game_map))
+        if self.is_playing():
+            player.send("Une partie est en cours. Vous jouerez la prochaine.")
+        else:
+            player.send("Lorsque tout le monde est connecté, "
+                        "saisissez c ou C pour lancer le jeu.")
+
+    def remove_player(self, player):
+        """
+        Remove a player from the room.
+        If the player is playing, he/she leaves the game.
+        """
+        if self.is_playing() and player in self.game.players.values():
+            if not player.has_left:
+                self.receive(player, "0")
+        if player in self.players:
+            self.players.remove(player)
+
+    def receive(self, player, message):
+        """
+        Handle a message sent by a player of the room.
+        """
+        if self.is_playing():
+            if player in self.game.players.values():
+                self.game.handle_message(player, message)
+                self.game.advance()
+                if self.game.finished:
+                    self.end_game()
+            else:
+                player.send("Une partie est en cours dans cette salle. Veuillez patienter.")
+
+        elif message.upper() == "C":
+            self.start_game()
+
+        else:
+            player.send("Les seules saisies autorisées "
+                        "sont c ou C pour commencer le jeu.")
+
+    def start_game(self):
+        """
+        Start a new game with all the players of the room.
+        """
+        self.game = new_game(self.game_map.copy(), self.interactor, self.scheduler)
+        self.game.on_finished = self.end_game
+        for player in self.players:
+            self.game.add_player(player)
+
+        self.game.launch()
+        self.game.advance()
+        if self.game.finished:
+            self.end_game()
+
+    def end_game(self):
+        """
+        Called when the game of the room is over.
+        The players still connected stay in the room for the next game.
+        """
+        self.players = [p for p in self.players if not p.has_left]
+        self.games_played += 1
+        self.game = None
+
+        for player in self.players:
+            player.send(ASK_NEW_GAME)
@@ -0,0 +1,498 @@
+# -*-coding:Utf-8 -*
+
+"""
+This module contains the class ShardedLobby.
+ShardedLobby is a lobby whose rooms are spread over several worker processes.
+
+- The front process owns the listening socket.
+  It greets the clients, and waits for them to choose a room.
+- Each worker process runs a LobbySession hosting a shard of the rooms.
+  Once a client has chosen a room, the front process passes
+  the socket of the client to the worker hosting the room (SCM_RIGHTS).
+
+The workers report their load to the front process at regular intervals.
+The front process uses these reports to place the new rooms on the least
+loaded worker, and to restart the workers that stopped responding.
+"""
+
+import asyncio
+import json
+import multiprocessing
+import socket
+import time
+
+import parameters.parameters as parameters
+from game_logic.player import Player
+from sessions.common_session_tools.interactor import Interactor, DistantInteractor
+from sessions.common_session_tools.line_reader import LineReader
+from sessions.lobby_session.lobby_session import LobbySession
+
+# Maximum size of the messages exchanged between the front process and the workers.
+CONTROL_BUFFER_SIZE = 65536
+
+# Time (in seconds) between two attempts to pass a client to a busy worker.
+HAND_OVER_RETRY_DELAY = 0.01
+
+
+def run_worker(control, maps, inherited):
+    """
+    Entry point of the worker processes.
+    :param control: socket connected to the front process.
+    :param maps: maps the rooms can be created with.
+    :param inherited: sockets of the front process copied by the fork.
+                      They are closed so that only the front process holds them.
+    """
+    for sock in inherited:
+        sock.close()
+
+    lobby = LobbySession(Interactor(), maps)
+    try:
+        asyncio.run(serve_shard(lobby, control))
+    except KeyboardInterrupt:
+        pass
+
+
+async def serve_shard(lobby, control):
+    """
+    Coroutine run by the worker processes.
+    Adopt the clients passed by the front process, and report the load
+    of the worker, until the front process closes the control socket.
+    """
+    loop = asyncio.get_running_loop()
+    control.setblocking(False)
+    front_closed = loop.create_future()
+
+    def receive_client():
+        try:
+            data, fds, flags, address = socket.recv_fds(control, CONTROL_BUFFER_SIZE, 1)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data, fds = b'', []
+
+        if not data and not fds:
+            # The front process has closed the control socket.
+            if not front_closed.done():
+                front_closed.set_result(None)
+            return
+
+        for fd in fds:
+            loop.create_task(lobby.adopt(socket.socket(fileno=fd), data))
+
+    loop.add_reader(control.fileno(), receive_client)
+
+    while not front_closed.done():
+        try:
+            control.send(json.dumps(lobby.load()).encode())
+        except (BlockingIOError, InterruptedError):
+            pass
+        except OSError:
+            break
+        await asyncio.wait([front_closed], timeout=parameters.shard_heartbeat_interval)
+
+    loop.remove_reader(control.fileno())
+    lobby.close()
+
+
+def stop_process(process):
+    """
+    Wait for a worker process to end once its control socket is closed.
+    If it doesn't within parameters.shard_timeout seconds, terminate it, then kill it.
+    Blocks: the front process runs it in an executor.
+    """
+    process.join(parameters.shard_timeout)
+    if process.is_alive():
+        process.terminate()
+        process.join(parameters.shard_timeout)
+    if process.is_alive():
+        process.kill()
+        process.join()
+
+
+class Worker:
+    """
+    Handle used by the front process to manage one worker process.
+    """
+
+    def __init__(self, number, maps):
+        """
+        Constructor of Worker.
+        :param number: number of the worker, used in the messages of the server.
+        :param maps: maps the rooms can be created with.
+        """
+        self.number = number
+        self.maps = maps
+        self.process = None
+        self.control = None
+
+        # Load reported by the worker, updated by the clients passed since.
+        self.connections = 0
+        self.rooms = set()
+        self.last_report = 0
+        self.started = 0
+
+    def start(self, inherited=()):
+        """
+        Start the worker process.
+        :param inherited: sockets of the front process the worker must not keep open.
+        """
+        self.control, worker_control = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        inherited = list(inherited) + [self.control]
+        self.process = multiprocessing.Process(target=run_worker,
+                                               args=(worker_control, self.maps, inherited))
+        self.process.daemon = True
+        self.process.start()
+        worker_control.close()
+
+        self.control.setblocking(False)
+        self.connections = 0
+        self.rooms = set()
+        self.started = self.last_report = time.monotonic()
+
+    def stop(self):
+        """
+        Stop the worker process.
+        """
+        if self.control is not None:
+            self.control.close()
+        if self.process is not None:
+            stop_process(self.process)
+
+    def restart(self, inherited=()):
+        """
+        Start a new worker process in place of the current one.
+        Returns the previous process, which is left to be stopped with stop_process.
+        :param inherited: sockets of the front process the worker must not keep open.
+        """
+        process = self.process
+        if self.control is not None:
+            self.control.close()
+        self.start(inherited)
+        return process
+
+    def is_healthy(self):
+        """
+        Returns True if the worker is alive and has reported its load recently.
+        """
+        recent = time.monotonic() - self.last_report < parameters.shard_timeout
+        return self.process.is_alive() and recent
+
+    def read_reports(self):
+        """
+        Read the load reports sent by the worker.
+        """
+        while True:
+            try:
+                data = self.control.recv(CONTROL_BUFFER_SIZE)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                data = b''
+            if not data:
+                # The worker process has stopped. It will be restarted.
+                asyncio.get_running_loop().remove_reader(self.control.fileno())
+                self.last_report = 0
+                return
+
+            report = json.loads(data.decode())
+            self.connections = report["connections"]
+            self.rooms = set(report["rooms"])
+            self.last_report = time.monotonic()
+
+    async def hand_over(self, sock, data):
+        """
+        Pass the socket of a client to the worker, with the data
+        already received from the client.
+        While the control socket is full, try again until parameters.shard_timeout.
+        Returns False if the worker can't receive the client.
+        """
+        control = self.control
+        deadline = time.monotonic() + parameters.shard_timeout
+        while True:
+            try:
+                socket.send_fds(control, [data], [sock.fileno()])
+            except (BlockingIOError, InterruptedError):
+                if time.monotonic() > deadline:
+                    return False
+                await asyncio.sleep(HAND_OVER_RETRY_DELAY)
+                if control is not self.control:
+                    # The worker has been restarted in the meantime.
+                    return False
+            except OSError:
+                return False
+            else:
+                self.connections += 1
+                return True
+
+
+class ShardedLobby(LobbySession):
+    """
+    Front process of a lobby whose rooms are hosted by several worker processes.
+    The clients are greeted by the front process, and passed to the worker
+    hosting their room as soon as they have chosen it.
+    """
+
+    def __init__(self, interactor, maps=None, workers_number=None):
+        """
+        Generates a sharded lobby.
+        - interactor is used to interact with the server.
+        - maps are the maps the rooms can be created with.
+          They can also be loaded with load_maps.
+        - workers_number is the number of worker processes.
+          By default, one per CPU.
+        """
+        LobbySession.__init__(self, interactor, maps)
+        self.workers_number = workers_number or multiprocessing.cpu_count()
+        self.workers = []
+
+        # Worker hosting each room, and when the room was placed on it.
+        self.placements = {}
+
+        # Worker holding the matchmaking queue, chosen when the first player joins it.
+        self.queue_worker = None
+
+        # Listening socket, and sockets of the clients being greeted.
+        self.listener = None
+        self.clients = set()
+
+    def launch(self):
+        """
+        Launch the session.
+        The lobby runs until the server is interrupted with Ctrl + C.
+        """
+        self.start_workers()
+        try:
+            asyncio.run(self.serve(parameters.host, parameters.port))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.close()
+        self.print("Fermeture de la connexion.")
+
+    def start_workers(self):
+        """
+        Start the worker processes.
+        """
+        for number in range(1, self.workers_number + 1):
+            worker = Worker(number, self.maps)
+            worker.start(self.inherited_sockets())
+            self.workers.append(worker)
+        self.print("{} processus de jeu démarrés.".format(len(self.workers)))
+
+    def inherited_sockets(self):
+        """
+        Returns the sockets of the front process a new worker process must close.
+        """
+        sockets = [w.control for w in self.workers if w.control is not None]
+        sockets.extend(self.clients)
+        if self.listener is not None:
+            sockets.append(self.listener)
+        return sockets
+
+    async def serve(self, host, port):
+        """
+        Accept the connections of the clients until the server is closed.
+        """
+        await self.start(host, port)
+        await self.accept_clients()
+
+    async def start(self, host, port):
+        """
+        Start listening to the connections of the clients.
+        """
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind((host, port))
+        self.listener.listen(128)
+        self.listener.setblocking(False)
+        self.print("Salon ouvert. {} labyrinthe(s) disponible(s).".format(len(self.maps)))
+
+    async def accept_clients(self):
+        """
+        Accept the connections of the clients, and watch the workers.
+        """
+        loop = asyncio.get_running_loop()
+        for worker in self.workers:
+            loop.add_reader(worker.control.fileno(), worker.read_reports)
+
+        watcher = loop.create_task(self.watch_workers())
+        try:
+            while True:
+                client, address = await loop.sock_accept(self.listener)
+                loop.create_task(self.handle_client(client))
+        finally:
+            watcher.cancel()
+            for worker in self.workers:
+                loop.remove_reader(worker.control.fileno())
+
+    async def watch_workers(self):
+        """
+        Restart the workers that are not healthy anymore,
+        and forget the rooms that have been closed.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(parameters.shard_heartbeat_interval)
+            for worker in self.workers:
+                if not worker.is_healthy():
+                    self.print("Le processus de jeu {} ne répond plus. Redémarrage."
+                               .format(worker.number))
+                    loop.remove_reader(worker.control.fileno())
+                    process = worker.restart(self.inherited_sockets())
+                    loop.add_reader(worker.control.fileno(), worker.read_reports)
+                    # The previous process is stopped without blocking the connections.
+                    await loop.run_in_executor(None, stop_process, process)
+            self.update_placements()
+
+    def update_placements(self):
+        """
+        Forget the rooms which are not hosted by their worker anymore.
+        Recently placed rooms are kept until their worker reports them.
+        """
+        now = time.monotonic()
+        for name, (worker, placed) in list(self.placements.items()):
+            recent = now - placed < 2 * parameters.shard_heartbeat_interval
+            restarted = placed < worker.started
+            if restarted or (name not in worker.rooms and not recent):
+                del self.placements[name]
+
+    async def handle_client(self, client):
+        """
+        Greet a client and wait until he/she has chosen a room.
+        Then pass the client to the worker hosting the room.
+        """
+        loop = asyncio.get_running_loop()
+        player = Player(DistantInteractor(client))
+        self.clients.add(client)
+        self.greet(player)
+
+        data = b''
+        try:
+            while not player.has_left:
+                received = await loop.sock_recv(client, CONTROL_BUFFER_SIZE)
+                if not received:
+                    break
+                data += received
+
+                while b'\n' in data and not player.has_left:
+                    line, rest = data.split(b'\n', 1)
+                    message = LineReader.decode(line.rstrip(b'\r'))
+                    if await self.pass_client(player, client, message, data):
+                        self.clients.discard(client)
+                        client.close()
+                        return
+                    data = rest
+        except (ConnectionError, OSError):
+            pass
+
+        self.clients.discard(client)
+        if not player.has_left:
+            player.close()
+
+    async def pass_client(self, player, client, message, data):
+        """
+        Handle a message received from a player who hasn't chosen a room yet,
+        and pass the client to the worker hosting the room chosen, if any.
+        If this worker can't receive the client, it is considered as stopped:
+        its rooms are forgotten, and the room is placed again.
+        Returns True if the client has been passed to a worker.
+        """
+        for attempt in range(0, len(self.workers)):
+            worker = self.place(player, message)
+            if worker is None:
+                return False
+
+            # The line choosing the room is processed again by the worker.
+            if await worker.hand_over(client, data):
+                return True
+
+            self.print("Le processus de jeu {} ne reçoit plus les joueurs."
+                       .format(worker.number))
+            worker.last_report = 0
+            for name, (host, placed) in list(self.placements.items()):
+                if host is worker:
+                    del self.placements[name]
+
+        player.send("Aucun processus de jeu disponible. Réessayez plus tard.")
+        return False
+
+    def place(self, player, message):
+        """
+        Handle a message received from a player who hasn't chosen a room yet.
+        Returns the worker hosting the room chosen by the player, if any.
+        """
+        words = message.split()
+
+        if message == "0":
+            player.send("Au revoir!")
+            player.send("0")
+            player.close()
+
+        elif len(words) in [2, 3] and words[0].upper() == "R":
+            name = words[1]
+            if name in self.placements:
+                return self.placements[name][0]
+
+            valid_inputs = [str(n) for n in range(1, len(self.maps) + 1)]
+            if len(words) == 3 and words[2] in valid_inputs:
+                worker = self.least_loaded()
+                self.placements[name] = (worker, time.monotonic())
+                return worker
+
+            player.send("Pour créer la salle {}, saisissez aussi "
+                        "le numéro de son labyrinthe.".format(name))
+
+        elif message.upper() == "A":
+            return self.get_queue_worker()
+
+        else:
+            player.send("Saisie incorrecte.")
+            self.greet(player)
+
+        return None
+
+    def get_queue_worker(self):
+        """
+        Returns the worker holding the matchmaking queue.
+        The whole queue is held by one worker, so that the players waiting
+        are grouped together. It moves to another worker only when
+        its worker is not healthy anymore.
+        """
+        if self.queue_worker is None or not self.queue_worker.is_healthy():
+            self.queue_worker = self.least_loaded()
+        return self.queue_worker
+
+    def least_loaded(self):
+        """
+        Returns the least loaded healthy worker.
+        """
+        workers = [w for w in self.workers if w.is_healthy()] or self.workers
+        return min(workers, key=lambda w: (w.connections, len(w.rooms)))
+
+    def print_rooms(self, player):
+        """
+        Send the list of the rooms reported by the workers to a player.
+        """
+        if len(self.placements) == 0:
+            player.send("\nAucune salle ouverte.")
+        else:
+            player.send("\nSalles ouvertes :")
+            for name in self.placements:
+                player.send(" - {}".format(name))
+
+    def close(self):
+        """
+        Disconnect the clients being greeted, stop the worker processes
+        and stop accepting connections.
+        """
+        for client in list(self.clients):
+            client.close()
+        self.clients = set()
+
+        for worker in self.workers:
+            worker.stop()
+        self.workers = []
+
+        if self.listener is not None:
+            self.listener.close()
+            self.listener = None
@@ -0,0 +1,42 @@
+# -*-coding:Utf-8 -*
+
+"""
+Threads used by the server session to do some work in the background:
+- MapLoader loads the maps,
+- Greeter accepts and greets the new clients.
+"""
+
+from threading import Thread, Event
+
+
+class MapLoader(Thread):
+
+    """Thread loading the maps of the session"""
+
+    def __init__(self, server_session):
+        Thread.__init__(self)
+        self.session = server_session
+
+    def run(self):
+        """Load the maps. They are made available to the session one by one."""
+        self.session.load_maps()
+
+
+class Greeter(Thread):
+
+    """Thread accepting and greeting the new clients"""
+
+    def __init__(self, server_session):
+        Thread.__init__(self)
+        self.session = server_session
+        self.stopped = Event()
+
+    def run(self):
+        """Keep accepting the new clients until the greeter is stopped."""
+        while not self.stopped.is_set():
+            self.session.accept_clients()
+
+    def stop(self):
+        """Stop accepting clients and wait for the thread to end."""
+        self.stopped.set()
+        self.join()
@@ -1,46 +1,46 @@
-# -*-coding:Utf-8 -*
-
-""" This module contains global variables used in the unit tests."""
-
-#################################
-# variables used in the tests   #
-#################################
-
-test_grid = [
-    "OOOOOOOO",
-    "O      U",
-    "OOOOOOOO"
-]
-map_name = 'prison'
-
-correct_grid = [
-    "OOOOOOOOOOOOOOOOOOOO",
-    "O O . O    O .     O",
-    "O.O O O    O O     O",
-    "O O O O    O O     O",
-    "O.O O .    O O     O",
-    "O O O OOOOOO O     O",
-    "O O O        O     O",
-    "O O OOOOOOOOOO     O",
-    "O.O .        O     O",
-    "O O O        O     O",
-    "O O O        O     O",
-    "O O.O        O     O",
-    "O.O .        O     O",
-    "O O O        O     O",
-    "O O O        O     O",
-    "O O O        O     O",
-    "O O O        O     O",
-    "O.O O        O     O",
-    "O   O        O     U",
-    "OOOOOOOOOOOOOOOOOOOO"
-]
-
-easy_to_win = [
-    "OOOOOOOOOOOOOOOOOOOO",
-    "OOOOOOOOOOOOOOOOOOOO",
-    "OOOOOOOOOOOOOOOOOOOO",
-    "OOOOOOOOOOOOOOOOOOOO",
-    "OOOOOOOOOOOOOOOO   U",
-    "OOOOOOOOOOOOOOOOOOOO"
-]
+# -*-coding:Utf-8 -*
+
+""" This module contains global variables used in the unit tests."""
+
+#################################
+# variables used in the tests   #
+#################################
+
+test_grid = [
+    "OOOOOOOO",
+    "O      U",
+    "OOOOOOOO"
+]
+map_name = 'prison'
+
+correct_grid = [
+    "OOOOOOOOOOOOOOOOOOOO",
+    "O O . O    O .     O",
+    "O.O O O    O O     O",
+    "O O O O    O O     O",
+    "O.O O .    O O     O",
+    "O O O OOOOOO O     O",
+    "O O O        O     O",
+    "O O OOOOOOOOOO     O",
+    "O.O .        O     O",
+    "O O O        O     O",
+    "O O O        O     O",
+    "O O.O        O     O",
+    "O.O .        O     O",
+    "O O O        O     O",
+    "O O O        O     O",
+    "O O O        O     O",
+    "O O O        O     O",
+    "O.O O        O     O",
+    "O   O        O     U",
+    "OOOOOOOOOOOOOOOOOOOO"
+]
+
+easy_to_win = [
+    "OOOOOOOOOOOOOOOOOOOO",
+    "OOOOOOOOOOOOOOOOOOOO",
+    "OOOOOOOOOOOOOOOOOOOO",
+    "OOOOOOOOOOOOOOOOOOOO",
+    "OOOOOOOOOOOOOOOO   U",
+    "OOOOOOOOOOOOOOOOOOOO"
+]
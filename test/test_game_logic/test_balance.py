@@ -0,0 +1,78 @@
+# -*-coding:Utf-8 -*
+
+"""This module contains tests for the module balance."""
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import test.parameters_for_testing as test_parameters
+from game_logic import balance
+from graphical_layout.grid import Grid
+
+
+class TestBalance(unittest.TestCase):
+    """TestCase for functions of the 'balance' module."""
+
+    def setUp(self):
+        """Create a directory of maps, and the settings of a short analysis."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.maps = os.path.join(self.directory.name, "maps")
+        os.makedirs(self.maps)
+        self.write("correct_map", test_parameters.correct_grid)
+        self.write("invalid", ["OOOO"])
+        self.cache_path = os.path.join(self.directory.name, "cache", "balance.json")
+        self.settings = {"k": 10, "players": 2, "playouts": 5, "max_rounds": 1000}
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.directory.cleanup()
+
+    def write(self, name, rows):
+        """Write a map file."""
+        with open(os.path.join(self.maps, name + ".txt"), "w") as map_file:
+            map_file.write("\n".join(rows))
+
+    def test_drilling_distances(self):
+        """Going through a wall costs two turns: one to open the door, one to step in it."""
+        grid = Grid.from_rows(["OOOOOOO", "O  O  U", "O OOO O", "OOOOOOO"])
+        distances = balance.drilling_distances(grid)
+        self.assertEqual(distances[grid.index(1, 4)], 2)
+        self.assertEqual(distances[grid.index(1, 2)], 5)
+        self.assertEqual(distances[grid.index(2, 1)], 7)
+
+    def test_analyse_directory(self):
+        """
+        The maps are analysed once, then read from the cache
+        until their content changes.
+        """
+        results = balance.analyse_directory(self.maps, self.cache_path, self.settings)
+        self.assertEqual([result["name"] for result in results], ["correct_map", "invalid"])
+        self.assertIn("error", results[1])
+        self.assertEqual(results[0]["shortest"], 1)
+
+        with mock.patch("game_logic.balance.analyse_map", wraps=balance.analyse_map) as analyse:
+            self.assertEqual(balance.analyse_directory(self.maps, self.cache_path, self.settings),
+                             results)
+            self.assertEqual(analyse.call_count, 0)
+
+            self.write("invalid", test_parameters.easy_to_win)
+            results = balance.analyse_directory(self.maps, self.cache_path, self.settings)
+            self.assertEqual(analyse.call_count, 1)
+            self.assertNotIn("error", results[1])
+
+        report = balance.format_report(results, 10)
+        self.assertEqual(len(report.splitlines()), 3)
+        self.assertIn("<=10", report)
+
+    def test_no_spawn(self):
+        """A map without any spawn is reported as an error, instead of failing the analysis."""
+        content = "\n".join(test_parameters.correct_grid)
+        with mock.patch("game_logic.rules.spawn_positions", return_value=[]):
+            result = balance.analyse_map("correct_map", content, self.settings)
+        self.assertEqual(result, {"name": "correct_map",
+                                  "error": balance.NO_SPAWN_ERROR.format("correct_map")})
+
+
+if __name__ == '__main__':
+    unittest.main()
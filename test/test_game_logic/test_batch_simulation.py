@@ -0,0 +1,72 @@
+# -*-coding:Utf-8 -*
+
+"""This module contains tests for the class BatchSimulation."""
+import random
+import unittest
+
+import test.parameters_for_testing as test_parameters
+from game_logic import batch_simulation, rules
+from game_logic.simulation import Simulation
+from graphical_layout.map import Map
+
+
+@unittest.skipIf(batch_simulation.numpy is None, "BatchSimulation requires NumPy.")
+class TestBatchSimulation(unittest.TestCase):
+    """
+    TestCase for the class BatchSimulation.
+    """
+
+    def setUp(self):
+        """
+        Load the correct_map.
+        """
+        self.game_map = Map("correct_map", "\n".join(test_parameters.correct_grid))
+
+    def test_same_as_simulation(self):
+        """
+        Tests that the games of a batch given random commands end in the same state
+        as simulations given the same commands one at a time.
+        """
+        batch = batch_simulation.BatchSimulation(self.game_map, 20, players_number=3, seed=0)
+        grid = self.game_map.grid
+
+        simulations = []
+        for spawns in batch.spawns:
+            simulation = Simulation(self.game_map, 3)
+            for runner, spawn in zip(simulation.runners, spawns):
+                old_row, old_col = runner.row, runner.col
+                runner.row, runner.col = grid.position(int(spawn))
+                simulation.occupancy.move(runner, old_row, old_col)
+            simulations.append(simulation)
+
+        generator = random.Random(1)
+        for i in range(0, 300):
+            games = batch.running()
+            kinds = batch_simulation.numpy.array([generator.choice([0, 0, 1, 2]) for g in games])
+            directions = batch_simulation.numpy.array([generator.randrange(4) for g in games])
+            batch.step(games, kinds, directions)
+            for game, kind, direction in zip(games, kinds, directions):
+                simulations[game].play(batch_simulation.KINDS[kind] + rules.DIRECTIONS[direction])
+
+        for game, simulation in enumerate(simulations):
+            self.assertEqual(bytes(batch.grids[game]), bytes(simulation.grid.cells))
+            self.assertEqual([grid.position(int(p)) for p in batch.positions[game]],
+                             [(r.row, r.col) for r in simulation.runners])
+            self.assertEqual(batch.how_many_rounds[game], simulation.how_many_rounds)
+            winner = simulation.winner.identifier - 1 if simulation.winner is not None else -1
+            self.assertEqual(batch.winner[game], winner)
+
+    def test_stats(self):
+        """Tests that greedy players win every game, each from his/her spawn."""
+        batch = batch_simulation.BatchSimulation(self.game_map, 200, seed=2)
+        batch.run('greedy', max_rounds=1000)
+        stats = batch.stats()
+
+        self.assertEqual(stats["won"], 200)
+        self.assertEqual(sum(s["count"] for s in stats["by_spawn"].values()), 200)
+        for (row, col), turns in stats["by_spawn"].items():
+            self.assertEqual(turns["min"], self.game_map.get_distances().get(row, col))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,112 +1,285 @@
-# -*-coding:Utf-8 -*
-
-"""This module contains tests for the class Game."""
-import unittest
-from unittest.mock import MagicMock
-
-import test.parameters_for_testing as parameters
-from game_logic.game import Game
-from sessions.common_session_tools.interactor import DeafInteractor
-
-
-class TestGame(unittest.TestCase):
-    """
-    TestCase for functions of the 'game' module.
-    We call the two methods called from outside the class:
-    - play
-    - add_player
-    This ensures entire coverage of the Game methods.
-    """
-
-    def setUp(self):
-        """
-        Before performing the tests on the Game class:
-         - create a player, a map and a game.
-        """
-
-        # Create a mock Map.
-        self.game_map = MagicMock()
-        self.game_map.grid = [list(row) for row in parameters.test_grid]
-        self.game_map.width = 8
-        self.game_map.height = 3
-
-        # Create a Game object with:
-        # - The mock map created above
-        # - A server user that anwers '1' once, then ''.
-        self.game = Game(self.game_map, DeafInteractor(['1']))
-
-    def test_available_positions(self):
-        """
-        Check that the game has correctly found 6 available positions
-        in the test_grid.
-        """
-        # The method has already been called in the constructor of Game.
-        # There is no need to call it again.
-        self.assertEqual(len(self.game.available_positions), 6)
-
-    def test_add_player(self):
-        """
-        Test if the method add_player from the Game class:
-         - Adds a player to the game
-         - Chooses an available position for this player.
-        """
-
-        # Add a mock player to the game.
-        player = MagicMock()
-        self.game.add_player(player)
-
-        # Check the number of players of the game has been incremented
-        self.assertEqual(self.game.player_number, 1)
-
-        # Check that the number of available positions has been decremented.
-        self.assertEqual(len(self.game.available_positions), 5)
-
-        # Check that the mock player's parameters have been correctly updated.
-        self.assertTrue(player.game is self.game)
-        self.assertTrue(player.game_map is self.game_map)
-
-    def test_play(self):
-        """
-        Tests one run of the game with two players.
-        """
-
-        # Add two mock players to the game.
-        # Both of them only play 'E' all the time.
-
-        # The game should be won by the first player.
-        # For each mock player:
-        #   - The two first calls of has_won return False.
-        #   - The third call returns True.
-
-        for i in range(0, 2):
-            player = MagicMock()
-            player.recv.return_value = 'E'
-            player.has_left = False
-
-            # has_won returns twice False, and True the third time.
-            player.has_won.side_effect = [False, False, True]
-            player.check_input.return_value = True
-            self.game.add_player(player)
-
-        # The game should thus be won by the first player on the 5th round:
-        # Round 1: player1.has_won = False
-        # Round 2: player2.has_won = False
-        # Round 3: player1.has_won = False
-        # Round 4: player2.has_won = False
-        # Round 5: player1.has_won = True => wins game
-
-        # We play the game.
-        self.game.play()
-
-        # We check that the game is over.
-        self.assertTrue(self.game.finished)
-
-        # We check that player one has won the game.
-        self.assertEqual(self.game.winner, self.game.players[0])
-
-        # We check there were 5 rounds in the game
-        self.assertEqual(self.game.how_many_rounds, 5)
-
-
-if __name__ == '__main__':
-    unittest.main()
+# -*-coding:Utf-8 -*
+
+"""This module contains tests for the class Game."""
+import unittest
+from unittest import mock
+from unittest.mock import MagicMock
+
+import test.parameters_for_testing as parameters
+from game_logic.game import Game
+from game_logic.player import Player
+from game_logic.scheduler import Scheduler
+from graphical_layout import frames
+from graphical_layout.grid import Grid
+from sessions.common_session_tools.interactor import DeafInteractor
+
+
+class TestGame(unittest.TestCase):
+    """
+    TestCase for functions of the 'game' module.
+    We call the two methods called from outside the class:
+    - play
+    - add_player
+    This ensures entire coverage of the Game methods.
+    """
+
+    def setUp(self):
+        """
+        Before performing the tests on the Game class:
+         - create a player, a map and a game.
+        """
+
+        # Create a mock Map.
+        self.game_map = MagicMock()
+        self.game_map.grid = Grid.from_rows(parameters.test_grid)
+        self.game_map.width = 8
+        self.game_map.height = 3
+
+        # Create a Game object with:
+        # - The mock map created above
+        # - A server user that anwers '1' once, then ''.
+        self.game = Game(self.game_map, DeafInteractor(['1']))
+
+    def test_available_positions(self):
+        """
+        Check that the game has correctly found 6 available positions
+        in the test_grid.
+        """
+        # The method has already been called in the constructor of Game.
+        # There is no need to call it again.
+        self.assertEqual(len(self.game.available_positions), 6)
+
+    def test_add_player(self):
+        """
+        Test if the method add_player from the Game class:
+         - Adds a player to the game
+         - Chooses an available position for this player.
+        """
+
+        # Add a mock player to the game.
+        player = MagicMock()
+        self.game.add_player(player)
+
+        # Check the number of players of the game has been incremented
+        self.assertEqual(self.game.player_number, 1)
+
+        # Check that the number of available positions has been decremented.
+        self.assertEqual(len(self.game.available_positions), 5)
+
+        # Check that the mock player's parameters have been correctly updated.
+        self.assertTrue(player.game is self.game)
+        self.assertTrue(player.game_map is self.game_map)
+
+    def test_state_update(self):
+        """
+        Check that after a keyframe, only the cells
+        marked as changed are sent to the players.
+        """
+        player = MagicMock()
+        player.row, player.col = 1, 1
+        player.identifier = 1
+        self.game.players[0] = player
+        self.game.occupancy.add(player)
+
+        keyframe = self.game.get_keyframe()
+        self.assertEqual(keyframe, frames.encode_keyframe(
+            ["OOOOOOOO", "O1     U", "OOOOOOOO"]).encode())
+
+        # The player moves one step East.
+        player.col = 2
+        self.game.occupancy.move(player, 1, 1)
+        self.game.mark_changed(1, 1)
+        self.game.mark_changed(1, 2)
+
+        delta = self.game.get_state_update()
+        self.assertEqual(delta, frames.encode_delta([(1, 1, ' '), (1, 2, '1')]))
+
+        # Nothing changed since the last delta.
+        self.assertEqual(self.game.get_state_update(), frames.encode_delta([]))
+
+        # The player opens a door in the wall to the North.
+        player = Player(DeafInteractor([]))
+        player.game, player.game_map = self.game, self.game_map
+        player.row, player.col = 1, 2
+        player.current_step = "PN"
+        player.perform_move()
+        self.assertEqual(self.game.get_state_update(), frames.encode_delta([(0, 2, '.')]))
+
+    def test_many_players(self):
+        """
+        Check that 500 players can play on a large map, and that
+        the players beyond the glyph table are sent with their positions.
+        """
+        rows = ["O" * 52] + ["O" + " " * 50 + "O"] * 20 + ["O" * 51 + "U"]
+        game_map = MagicMock()
+        game_map.grid = Grid.from_rows(rows)
+        game_map.width, game_map.height = 52, 22
+        game = Game(game_map, DeafInteractor([]))
+
+        for i in range(0, 500):
+            game.add_player(Player(DeafInteractor([])))
+        self.assertEqual(len(game.available_positions), 500)
+
+        keyframe = game.get_keyframe().decode()
+        self.assertEqual(keyframe.count(frames.SHARED_GLYPH), 500 - len(frames.GLYPHS))
+        view = frames.GridView()
+        view.apply(keyframe.replace('$', '\n'))
+        self.assertEqual(len(view.positions), 500 - len(frames.GLYPHS))
+
+        # Every player tries to go North: the players get in each other's way.
+        for player in game.players.values():
+            player.current_step = 'N'
+            if player.check_move():
+                player.perform_move()
+        view.apply(game.get_state_update().replace('$', '\n'))
+
+        for player in game.players.values():
+            self.assertIs(game.occupancy.get(player.row, player.col), player)
+            if player.identifier > len(frames.GLYPHS):
+                self.assertEqual(view.positions[player.identifier], (player.row, player.col))
+        self.assertEqual(view.render(), game.get_current_state())
+
+    def test_play(self):
+        """
+        Tests one run of the game with two players.
+        """
+
+        # Add two mock players to the game.
+        # Both of them only play 'E' all the time.
+
+        # The game should be won by the first player.
+        # For each mock player:
+        #   - The two first calls of has_won return False.
+        #   - The third call returns True.
+
+        for i in range(0, 2):
+            player = MagicMock()
+            player.recv.return_value = 'E'
+            player.has_left = False
+
+            # has_won returns twice False, and True the third time.
+            player.has_won.side_effect = [False, False, True]
+            player.check_input.return_value = True
+            self.game.add_player(player)
+
+        # The game should thus be won by the first player on the 5th round:
+        # Round 1: player1.has_won = False
+        # Round 2: player2.has_won = False
+        # Round 3: player1.has_won = False
+        # Round 4: player2.has_won = False
+        # Round 5: player1.has_won = True => wins game
+
+        # We play the game.
+        self.game.play()
+
+        # We check that the game is over.
+        self.assertTrue(self.game.finished)
+
+        # We check that player one has won the game.
+        self.assertEqual(self.game.winner, self.game.players[0])
+
+        # We check there were 5 rounds in the game
+        self.assertEqual(self.game.how_many_rounds, 5)
+
+    def launch_idle_game(self):
+        """
+        Launch a game with two players who never play,
+        and a clock controlled by the test.
+        """
+        self.now = 0
+        game = Game(self.game_map, DeafInteractor([]), Scheduler(lambda: self.now))
+        for i in range(0, 2):
+            game.add_player(Player(DeafInteractor([])))
+        game.launch()
+        return game
+
+    @staticmethod
+    def place(game, player, col):
+        """Move a player to the given column of the corridor."""
+        old_row, old_col = player.row, player.col
+        player.row, player.col = 1, col
+        game.occupancy.move(player, old_row, old_col)
+
+    def wait(self, game, seconds):
+        """Let some time pass, and run the deadlines reached."""
+        self.now += seconds
+        game.scheduler.run_due()
+
+    @mock.patch("parameters.parameters.game_timeout", None)
+    @mock.patch("parameters.parameters.max_missed_turns", 2)
+    @mock.patch("parameters.parameters.turn_timeout", 1)
+    def test_turn_deadline(self):
+        """
+        Tests that a player who doesn't play in time skips his/her turn,
+        and forfeits after missing two turns in a row.
+        """
+        game = self.launch_idle_game()
+        first, second = game.players[0], game.players[1]
+
+        self.wait(game, 1)
+        self.assertIs(game.players[game.turn], second)
+        self.assertEqual(first.missed_turns, 1)
+
+        self.wait(game, 1)
+        self.wait(game, 1)
+        self.assertTrue(first.has_left)
+        self.assertIs(game.players[game.turn], second)
+        self.assertFalse(game.finished)
+
+        # The game is over once everyone has forfeited.
+        self.wait(game, 1)
+        self.assertTrue(second.has_left)
+        self.assertTrue(game.finished)
+        self.assertIsNone(game.scheduler.next_deadline())
+
+    def test_command_script(self):
+        """
+        Tests that the commands sent in advance by a player are played
+        at his/her turns without waiting for him/her.
+        """
+        game = self.launch_idle_game()
+        first, second = game.players[0], game.players[1]
+        self.place(game, first, 1)
+        self.place(game, second, 5)
+
+        # The second player sends a command before his/her turn.
+        game.handle_message(second, "O2")
+        game.handle_message(first, "E")
+        game.advance()
+        self.assertIs(game.players[game.turn], first)
+        self.assertEqual(second.col, 4)
+
+        # The second player cancels the step left.
+        game.handle_message(second, "A")
+        game.handle_message(first, "E")
+        game.advance()
+        self.assertIs(game.players[game.turn], second)
+        self.assertEqual(second.col, 4)
+
+        # The second player sends several commands: the first one is played at once.
+        game.handle_message(second, "E E")
+        game.advance()
+        game.handle_message(first, "E")
+        game.advance()
+        self.assertIs(game.players[game.turn], first)
+        self.assertEqual((first.col, second.col), (4, 6))
+
+    @mock.patch("parameters.parameters.game_timeout", 10)
+    @mock.patch("parameters.parameters.turn_timeout", None)
+    def test_game_deadline(self):
+        """
+        Tests that the game ends without winner once it has lasted too long.
+        """
+        game = self.launch_idle_game()
+
+        self.wait(game, 9)
+        self.assertFalse(game.finished)
+
+        self.wait(game, 1)
+        self.assertTrue(game.finished)
+        self.assertIsNone(game.winner)
+        self.assertIsNone(game.scheduler.next_deadline())
+
+
+if __name__ == '__main__':
+    unittest.main()
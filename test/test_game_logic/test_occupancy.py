@@ -0,0 +1,77 @@
+# -*-coding:Utf-8 -*
+
+"""This module contains tests for the classes Occupancy and FreeCells."""
+import random
+import unittest
+from unittest.mock import MagicMock
+
+from game_logic.occupancy import Occupancy, FreeCells
+
+
+class TestFreeCells(unittest.TestCase):
+    """
+    TestCase for the class FreeCells.
+    """
+
+    def test_remove_and_sample(self):
+        """
+        Tests that the cells removed are never drawn,
+        and that all the cells left can be drawn.
+        """
+        free = FreeCells([(0, i) for i in range(0, 10)])
+        for i in [0, 9, 4]:
+            free.remove((0, i))
+        free.add((0, 4))
+
+        self.assertEqual(len(free), 8)
+        self.assertNotIn((0, 9), free)
+        self.assertEqual(sorted(free), [(0, i) for i in range(1, 9)])
+
+        generator = random.Random(0)
+        drawn = set(free.sample(generator) for i in range(0, 500))
+        self.assertEqual(drawn, set(free))
+
+
+class TestOccupancy(unittest.TestCase):
+    """
+    TestCase for the class Occupancy.
+    """
+
+    def setUp(self):
+        """
+        Create the occupancy of a row of three spawn cells.
+        """
+        self.occupancy = Occupancy([(1, 1), (1, 2), (1, 3)])
+        self.player = MagicMock()
+        self.player.row, self.player.col = 1, 1
+        self.occupancy.add(self.player)
+
+    def test_move(self):
+        """
+        Tests that a player moving frees his/her previous cell.
+        """
+        self.player.col = 2
+        self.occupancy.move(self.player, 1, 1)
+
+        self.assertIsNone(self.occupancy.get(1, 1))
+        self.assertIs(self.occupancy.get(1, 2), self.player)
+        self.assertEqual(sorted(self.occupancy.free), [(1, 1), (1, 3)])
+
+        # Cells which are not spawns never become free.
+        self.player.row = 0
+        self.occupancy.move(self.player, 1, 2)
+        self.player.row = 1
+        self.occupancy.move(self.player, 0, 2)
+        self.assertEqual(sorted(self.occupancy.free), [(1, 1), (1, 3)])
+
+    def test_remove(self):
+        """
+        Tests that the cell of a player who left is free again.
+        """
+        self.occupancy.remove(self.player)
+        self.assertIsNone(self.occupancy.get(1, 1))
+        self.assertEqual(len(self.occupancy.free), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
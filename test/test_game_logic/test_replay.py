@@ -0,0 +1,153 @@
+# -*-coding:Utf-8 -*
+
+"""This module contains tests for the replay logs of the games."""
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+import test.parameters_for_testing as test_parameters
+from game_logic import replay
+from game_logic.game import Game
+from game_logic.player import Player
+from graphical_layout.map import Map
+from sessions.common_session_tools.interactor import DeafInteractor
+
+
+class TestReplay(unittest.TestCase):
+    """
+    TestCase for the classes ReplayWriter and Replay.
+    """
+
+    def setUp(self):
+        """
+        Load the correct_map, and record the replay logs of the games in a temporary directory.
+        """
+        self.game_map = Map("correct_map", "\n".join(test_parameters.correct_grid))
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        for name, value in [("record_replays", True), ("replay_dir", directory.name)]:
+            patcher = mock.patch("parameters.parameters." + name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def new_game(self, players_number, seed):
+        """
+        Returns a game of players_number players, launched.
+        """
+        game = Game(self.game_map.copy(), DeafInteractor([]), seed=seed)
+        for i in range(0, players_number):
+            game.add_player(Player(DeafInteractor([])))
+        game.launch()
+        return game
+
+    @staticmethod
+    def state_of(game):
+        """
+        Returns the grid and the positions of the players of a game, as Replay.state_at does.
+        """
+        positions = [None if p.has_left else (p.row, p.col) for p in game.players.values()]
+        return game.game_map.grid.rows(), positions
+
+    def end(self, game):
+        """
+        End the game, and returns its replay log once written.
+        """
+        writer = game.replay
+        game.end()
+        # The chunks are written one after the other: wait for the last one.
+        writer.flush().result()
+        return replay.Replay.load(writer.path)
+
+    @mock.patch("parameters.parameters.replay_snapshot_interval", 7)
+    @mock.patch("parameters.parameters.replay_buffer_size", 64)
+    def test_seek(self):
+        """
+        Tests that the state of the game rebuilt at any turn is the state the game had.
+        """
+        game = self.new_game(3, seed=5)
+        states = {0: self.state_of(game)}
+
+        generator = random.Random(1)
+        moves = ["N", "S", "E", "O", "N2", "S3", "PN", "PE", "MS", "MO", "X"]
+        for i in range(0, 300):
+            game.handle_message(game.players[game.turn], generator.choice(moves))
+            game.advance()
+            states[game.how_many_rounds] = self.state_of(game)
+
+        # A player leaves, and the game goes on.
+        leaving = game.players[(game.turn + 1) % 3]
+        game.handle_message(leaving, '0')
+        game.handle_message(game.players[game.turn], 'PN')
+        game.advance()
+        states[game.how_many_rounds] = self.state_of(game)
+        self.assertIn(None, states[game.how_many_rounds][1])
+
+        log = self.end(game)
+        self.assertEqual(log.seed, 5)
+        self.assertEqual(log.turns, game.how_many_rounds)
+        self.assertEqual(sorted(log.snapshots), list(range(7, game.how_many_rounds + 1, 7)))
+
+        for turn, (rows, positions) in states.items():
+            grid, replayed = log.state_at(self.game_map, turn)
+            self.assertEqual(grid.rows(), rows)
+            self.assertEqual(replayed, positions)
+
+    def test_other_player_leaves(self):
+        """
+        Tests that a player leaving during the turn of another player
+        doesn't end this turn, and is recorded as a departure.
+        """
+        game = self.new_game(3, seed=8)
+        player = game.players[game.turn]
+        leaving = game.players[(game.turn + 1) % 3]
+
+        game.handle_message(leaving, '0')
+        game.advance()
+        self.assertIs(game.players[game.turn], player)
+        self.assertIsNone(player.current_step)
+        self.assertEqual(game.how_many_rounds, 0)
+
+        game.handle_message(player, 'PN')
+        game.advance()
+        state = self.state_of(game)
+
+        log = self.end(game)
+        self.assertEqual(log.turns, 1)
+        grid, positions = log.state_at(self.game_map, 1)
+        self.assertEqual(grid.rows(), state[0])
+        self.assertEqual(positions, state[1])
+        self.assertIsNone(positions[leaving.identifier - 1])
+
+    def test_header(self):
+        """
+        Tests that the seed of a game reproduces its spawns, which are in its replay log,
+        and that a replay log can't be read on another map.
+        """
+        game = self.new_game(4, seed=12)
+        log = self.end(game)
+        self.assertEqual(log.spawns, [(p.row, p.col) for p in game.players.values()])
+
+        other = self.new_game(4, seed=12)
+        self.assertEqual([(p.row, p.col) for p in other.players.values()], log.spawns)
+        other.end()
+
+        easy_map = Map("easy_to_win", "\n".join(test_parameters.easy_to_win))
+        with self.assertRaises(ValueError):
+            log.state_at(easy_map, 0)
+
+    def test_varint(self):
+        """Tests the encoding of the numbers of the replay logs."""
+        buffer = bytearray()
+        for value in [0, 1, 127, 128, 300, 2 ** 40]:
+            replay.encode_varint(value, buffer)
+        self.assertEqual(len(buffer), 1 + 1 + 1 + 2 + 2 + 6)
+
+        offset = 0
+        for value in [0, 1, 127, 128, 300, 2 ** 40]:
+            decoded, offset = replay.decode_varint(buffer, offset)
+            self.assertEqual(decoded, value)
+
+
+if __name__ == '__main__':
+    unittest.main()
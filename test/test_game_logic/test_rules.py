@@ -0,0 +1,87 @@
+# -*-coding:Utf-8 -*
+
+"""This module contains tests for the functions of the module rules."""
+import unittest
+from unittest.mock import MagicMock
+
+from game_logic import rules
+from game_logic.occupancy import Occupancy
+from game_logic.simulation import Runner
+from graphical_layout.grid import Grid, DOOR, WALL
+from graphical_layout.map import Map
+
+
+class TestRules(unittest.TestCase):
+    """
+    TestCase for functions of the 'rules' module.
+    The players stand on a corridor with a door:
+    OOOOOO
+    O .  U
+    OOOOOO
+    """
+
+    def setUp(self):
+        """
+        Create the grid, and a player on each side of the door.
+        """
+        self.grid = Grid.from_rows(["OOOOOO", "O .  U", "OOOOOO"])
+        self.occupancy = Occupancy([(1, 1), (1, 3), (1, 4)])
+
+        game = MagicMock()
+        self.first = Runner(1, 1, 1, game)
+        self.second = Runner(2, 1, 3, game)
+        self.occupancy.add(self.first)
+        self.occupancy.add(self.second)
+
+    def test_split_move(self):
+        """Tests that the moves of several steps are split."""
+        self.assertEqual(rules.split_move("E"), ("E", None, 0))
+        self.assertEqual(rules.split_move("E1"), ("E", None, 0))
+        self.assertEqual(rules.split_move("N3"), ("N", "N", 2))
+        self.assertEqual(rules.split_move("PN"), ("PN", None, 0))
+
+    def test_check_move(self):
+        """Tests the reasons why a step can't be played."""
+        self.assertEqual(rules.check_move(self.grid, self.occupancy, self.first, "N"),
+                         rules.WALL_ERROR)
+        self.assertEqual(rules.check_move(self.grid, self.occupancy, self.first, "PE"),
+                         rules.NO_WALL_ERROR)
+        self.assertEqual(rules.check_move(self.grid, self.occupancy, self.first, "MN"),
+                         rules.NO_DOOR_ERROR)
+        self.assertEqual(rules.check_move(self.grid, self.occupancy, self.second, "O"), None)
+        self.second.col = 2
+        self.assertEqual(rules.check_move(self.grid, self.occupancy, self.first, "E"), None)
+        self.occupancy.move(self.second, 1, 3)
+        self.assertEqual(rules.check_move(self.grid, self.occupancy, self.first, "E"),
+                         rules.PLAYER_ERROR)
+
+    def test_perform_move(self):
+        """Tests that the doors and walls are created, and the players moved."""
+        self.assertEqual(rules.perform_move(self.grid, self.occupancy, self.second, "MO"), [(1, 2)])
+        self.assertEqual(self.grid.get(1, 2), WALL)
+        self.assertEqual(rules.perform_move(self.grid, self.occupancy, self.second, "PO"), [(1, 2)])
+        self.assertEqual(self.grid.get(1, 2), DOOR)
+
+        changed = rules.perform_move(self.grid, self.occupancy, self.second, "E")
+        self.assertEqual(changed, [(1, 3), (1, 4)])
+        self.assertIs(self.occupancy.get(1, 4), self.second)
+        self.assertFalse(rules.has_won(self.grid, self.second))
+
+        rules.perform_move(self.grid, self.occupancy, self.second, "E")
+        self.assertTrue(rules.has_won(self.grid, self.second))
+
+    def test_spawn_positions(self):
+        """
+        Tests that the players can appear on every reachable blank,
+        including the blanks of the last row and of the last column.
+        """
+        for content, edge in [("OOOOO\nOUOOO\nO OOO\nO OOO\nO    ", (4, 4)),
+                              ("OOOOO\nOU  O\nO    \nOOOOO\nOOOOO", (2, 4))]:
+            game_map = Map("edges", content)
+            positions = rules.spawn_positions(game_map)
+            self.assertEqual(len(positions), game_map.max_players)
+            self.assertIn(edge, positions)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+# -*-coding:Utf-8 -*
+
+"""This module contains tests for the class Scheduler."""
+import unittest
+
+from game_logic.scheduler import Scheduler
+
+
+class TestScheduler(unittest.TestCase):
+    """
+    TestCase for the class Scheduler, with a clock controlled by the test.
+    """
+
+    def setUp(self):
+        self.now = 0
+        self.scheduler = Scheduler(lambda: self.now)
+        self.calls = []
+
+    def test_run_due(self):
+        """
+        Tests that the callbacks are run in the order of their deadlines,
+        once their deadline is reached.
+        """
+        self.scheduler.schedule(3, self.calls.append, "c")
+        self.scheduler.schedule(1, self.calls.append, "a")
+        self.scheduler.schedule(2, self.calls.append, "b")
+        self.assertEqual(self.scheduler.next_deadline(), 1)
+
+        self.now = 2
+        self.scheduler.run_due()
+        self.assertEqual(self.calls, ["a", "b"])
+
+        self.now = 5
+        self.scheduler.run_due()
+        self.assertEqual(self.calls, ["a", "b", "c"])
+        self.assertIsNone(self.scheduler.next_deadline())
+
+    def test_cancel(self):
+        """
+        Tests that a cancelled timer is never run, and is dropped from the heap.
+        """
+        timer = self.scheduler.schedule(1, self.calls.append, "a")
+        self.scheduler.schedule(2, self.calls.append, "b")
+        timer.cancel()
+        self.assertEqual(self.scheduler.next_deadline(), 2)
+
+        self.now = 2
+        self.scheduler.run_due()
+        self.assertEqual(self.calls, ["b"])
+        self.assertEqual(len(self.scheduler), 0)
+
+    def test_on_change(self):
+        """
+        Tests that the owner of the scheduler is told when the earliest deadline changes.
+        """
+        deadlines = []
+        self.scheduler.on_change = deadlines.append
+        self.scheduler.schedule(5, self.calls.append, "a")
+        self.scheduler.schedule(7, self.calls.append, "b")
+        self.scheduler.schedule(2, self.calls.append, "c")
+        self.assertEqual(deadlines, [5, 2])
+
+        self.now = 2
+        self.scheduler.run_due()
+        self.assertEqual(deadlines, [5, 2, 5])
+
+
+if __name__ == '__main__':
+    unittest.main()
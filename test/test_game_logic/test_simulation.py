@@ -0,0 +1,70 @@
+# -*-coding:Utf-8 -*
+
+"""This module contains tests for the class Simulation."""
+import random
+import unittest
+
+import test.parameters_for_testing as test_parameters
+from game_logic.game import Game
+from game_logic.player import Player
+from game_logic.simulation import Simulation
+from graphical_layout.map import Map
+from sessions.common_session_tools.bot_interactor import greedy
+from sessions.common_session_tools.interactor import DeafInteractor
+
+
+class TestSimulation(unittest.TestCase):
+    """
+    TestCase for the class Simulation.
+    """
+
+    def setUp(self):
+        """
+        Load the correct_map.
+        """
+        self.game_map = Map("correct_map", "\n".join(test_parameters.correct_grid))
+
+    def test_same_as_game(self):
+        """
+        Tests that a simulation and a live game given the same moves
+        end in the same state.
+        """
+        simulation = Simulation(self.game_map, 3, seed=0)
+
+        game = Game(self.game_map.copy(), DeafInteractor([]))
+        for runner in simulation.runners:
+            player = Player(DeafInteractor([]))
+            game.add_player(player)
+            old_row, old_col = player.row, player.col
+            player.row, player.col = runner.row, runner.col
+            game.occupancy.move(player, old_row, old_col)
+        game.launch()
+
+        generator = random.Random(1)
+        moves = ["N", "S", "E", "O", "N2", "S3", "PN", "PE", "MS", "MO", "X", "I"]
+        for i in range(0, 600):
+            # The game plays the next steps of the moves of several steps at once.
+            move = generator.choice(moves)
+            game.handle_message(game.players[game.turn], move)
+            game.advance()
+
+            simulation.play(move)
+            while simulation.runners[simulation.turn].direction is not None:
+                simulation.play(None)
+
+        self.assertEqual(simulation.grid.rows(), game.game_map.grid.rows())
+        self.assertEqual([(r.row, r.col) for r in simulation.runners],
+                         [(p.row, p.col) for p in game.players.values()])
+        self.assertEqual(simulation.how_many_rounds, game.how_many_rounds)
+        self.assertEqual(simulation.turn, game.turn)
+
+    def test_run(self):
+        """Tests that a simulation of greedy bots is won."""
+        simulation = Simulation(self.game_map, 4, seed=2)
+        winner = simulation.run(greedy)
+        self.assertIs(winner, simulation.runners[simulation.turn])
+        self.assertEqual(simulation.game_map.grid.get(winner.row, winner.col), ord('U'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+# -*-coding:Utf-8 -*
+
+"""This module contains tests for the class TickGame."""
+import unittest
+from unittest.mock import MagicMock
+
+from game_logic.player import Player
+from game_logic.scheduler import Scheduler
+from game_logic.tick_game import TickGame
+from graphical_layout.grid import Grid, DOOR, WALL
+from sessions.common_session_tools.interactor import DeafInteractor
+
+
+class TestTickGame(unittest.TestCase):
+    """
+    TestCase for the class TickGame.
+    The players are placed on a corridor with two doors:
+    OOOOOOOOO
+    O . .   U
+    OOOOOOOOO
+    """
+
+    def setUp(self):
+        """
+        Create a game on the corridor, with a clock controlled by the test.
+        """
+        self.game_map = MagicMock()
+        self.game_map.grid = Grid.from_rows(["OOOOOOOOO", "O . .   U", "OOOOOOOOO"])
+        self.game_map.width = 9
+        self.game_map.height = 3
+
+        self.now = 0
+        self.game = TickGame(self.game_map, DeafInteractor([]), Scheduler(lambda: self.now))
+
+    def launch(self, *columns):
+        """
+        Add one player in each of the given columns of the corridor, and launch the game.
+        """
+        for col in columns:
+            player = Player(DeafInteractor([]))
+            self.game.add_player(player)
+            old_row, old_col = player.row, player.col
+            player.row, player.col = 1, col
+            self.game.occupancy.move(player, old_row, old_col)
+        self.game.launch()
+        return list(self.game.players.values())
+
+    def play(self, commands):
+        """
+        Each player sends his/her command, then the tick is resolved.
+        """
+        for player, command in zip(self.game.players.values(), commands):
+            if command is not None:
+                self.game.handle_message(player, command)
+        self.game.advance()
+
+    def test_same_target(self):
+        """
+        Tests that the players moving to the same cell all bounce back.
+        """
+        first, second = self.launch(1, 3)
+        self.play(["E", "O"])
+        self.assertEqual((first.col, second.col), (1, 3))
+        self.assertEqual(self.game.how_many_rounds, 1)
+
+    def test_occupied_target(self):
+        """
+        Tests that a player can't move to a cell occupied at the beginning of the tick,
+        even if its occupant leaves it during the tick.
+        """
+        first, second = self.launch(5, 6)
+        self.play(["E", "E"])
+        self.assertEqual((first.col, second.col), (5, 7))
+
+    def test_same_edit(self):
+        """
+        Tests that the players editing the same cell cancel each other.
+        """
+        self.launch(1, 3)
+        self.play(["ME", "MO"])
+        self.assertEqual(self.game_map.grid.get(1, 2), DOOR)
+
+    def test_wall_occupied_door(self):
+        """
+        Tests that a door can't be walled while a player stands in it.
+        """
+        self.launch(1, 2)
+        self.play(["ME", None])
+        self.now += 1
+        self.game.scheduler.run_due()
+        self.assertEqual(self.game_map.grid.get(1, 2), DOOR)
+
+    def test_edits_before_moves(self):
+        """
+        Tests that the walls are created before the players move.
+        """
+        first, second = self.launch(3, 5)
+        self.play(["ME", "O"])
+        self.assertEqual(self.game_map.grid.get(1, 4), WALL)
+        self.assertEqual(second.col, 5)
+
+    def test_tick_timer(self):
+        """
+        Tests that a tick is resolved at the end of its timer,
+        with the commands received, and that the game is won.
+        """
+        first, second = self.launch(1, 7)
+        self.play([None, "E"])
+        self.assertEqual(second.col, 7)
+
+        self.now += 1
+        self.game.scheduler.run_due()
+        self.assertEqual(second.col, 8)
+        self.assertTrue(self.game.finished)
+        self.assertIs(self.game.winner, second)
+        self.assertIsNone(self.game.scheduler.next_deadline())
+
+
+if __name__ == '__main__':
+    unittest.main()
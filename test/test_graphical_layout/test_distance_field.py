@@ -0,0 +1,76 @@
+# -*-coding:Utf-8 -*
+
+"""This module contains tests for the class DistanceField."""
+import random
+import unittest
+
+from graphical_layout.distance_field import DistanceField, UNREACHABLE
+from graphical_layout.grid import Grid, WALL, DOOR
+
+
+class TestDistanceField(unittest.TestCase):
+    """TestCase for functions of the 'distance_field' module."""
+
+    def setUp(self):
+        """
+        Create a grid whose exit can only be reached through a door.
+        """
+        self.grid = Grid.from_rows([
+            "OOOOOOO",
+            "O  O  U",
+            "O  .  O",
+            "OOOOOOO",
+        ])
+        self.field = DistanceField(self.grid)
+
+    def test_distances(self):
+        """The distances are the lengths of the shortest paths to the exit."""
+        self.assertEqual(self.field.get(1, 6), 0)
+        self.assertEqual(self.field.get(1, 4), 2)
+        self.assertEqual(self.field.get(2, 3), 4)
+        self.assertEqual(self.field.get(1, 1), 7)
+        self.assertEqual(self.field.get(1, 3), UNREACHABLE)
+
+    def test_updates(self):
+        """
+        Opening a door shortens the paths, walling it cuts them.
+        """
+        self.grid.set(1, 3, DOOR)
+        self.field.update(1, 3)
+        self.assertEqual(self.field.get(1, 1), 5)
+
+        self.grid.set(2, 3, WALL)
+        self.field.update(2, 3)
+        self.assertEqual(self.field.get(2, 1), 6)
+
+        self.grid.set(1, 3, WALL)
+        self.field.update(1, 3)
+        self.assertEqual(self.field.get(1, 1), UNREACHABLE)
+        self.assertEqual(self.field.get(2, 4), 3)
+
+    def test_random_updates(self):
+        """
+        After random doors are opened and walled, the distances updated
+        incrementally are the same as the distances computed again from scratch.
+        """
+        generator = random.Random(1)
+        size = 30
+        rows = ["".join(generator.choice("  O.") for i in range(0, size)) for j in range(0, size)]
+        rows[size // 2] = rows[size // 2][:-1] + "U"
+        grid = Grid.from_rows(rows)
+        field = DistanceField(grid)
+
+        for i in range(0, 300):
+            row, col = generator.randrange(size), generator.randrange(size)
+            if grid.get(row, col) == WALL:
+                grid.set(row, col, DOOR)
+            elif grid.get(row, col) == DOOR:
+                grid.set(row, col, WALL)
+            else:
+                continue
+            field.update(row, col)
+            self.assertEqual(field.distances, DistanceField(grid).distances)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+# -*-coding:Utf-8 -*
+
+"""This module contains tests for the state frames and the class GridView."""
+import unittest
+
+from graphical_layout import frames
+from graphical_layout.frames import GridView
+
+
+def receive(frame):
+    """Simulate the conversion of '$' into newlines done by the clients."""
+    return frame.replace('$', '\n')
+
+
+class TestFrames(unittest.TestCase):
+    """TestCase for functions of the 'frames' module."""
+
+    def setUp(self):
+        """Create an empty GridView."""
+        self.view = GridView()
+        self.rows = ["OOOOO", "O1  U", "OOOOO"]
+
+    def test_keyframe(self):
+        """A keyframe replaces the whole grid."""
+        self.assertTrue(self.view.apply(receive(frames.encode_keyframe(self.rows))))
+        self.assertEqual(self.view.render(), '\n' + '\n'.join(self.rows) + '\n')
+
+    def test_delta(self):
+        """
+        A delta only changes the given cells.
+        It is ignored if no keyframe has been received before.
+        """
+        delta = frames.encode_delta([(1, 1, ' '), (1, 2, '1'), (0, 2, '.')])
+        self.assertFalse(self.view.apply(receive(delta)))
+
+        self.view.apply(receive(frames.encode_keyframe(self.rows)))
+        self.assertTrue(self.view.apply(receive(delta)))
+        self.assertEqual(self.view.render(), "\nOO.OO\nO 1 U\nOOOOO\n")
+
+        # An empty delta doesn't change anything.
+        self.assertTrue(self.view.apply(receive(frames.encode_delta([]))))
+        self.assertEqual(self.view.render(), "\nOO.OO\nO 1 U\nOOOOO\n")
+
+    def test_shared_glyph(self):
+        """
+        The players beyond the glyph table share one glyph.
+        Their positions are sent with the frames, and the player
+        using the client sees his/her own position marked with '@'.
+        """
+        self.assertEqual(frames.glyph(1), '1')
+        self.assertEqual(frames.glyph(10), 'a')
+        self.assertEqual(frames.glyph(36), frames.SHARED_GLYPH)
+
+        rows = ["OOOOO", "O** U", "OOOOO"]
+        self.view.identifier = 40
+        self.view.apply(receive(frames.encode_keyframe(rows, [(40, 1, 1), (41, 1, 2)])))
+        self.assertEqual(self.view.render(), "\nOOOOO\nO@* U\nOOOOO\n")
+
+        delta = frames.encode_delta([(1, 1, ' '), (1, 3, '*')], [(40, 1, 3)])
+        self.view.apply(receive(delta))
+        self.assertEqual(self.view.positions, {40: (1, 3), 41: (1, 2)})
+        self.assertEqual(self.view.render(), "\nOOOOO\nO *@U\nOOOOO\n")
+
+    def test_is_frame(self):
+        """Frames are told apart from the other messages."""
+        self.assertTrue(frames.is_frame(frames.encode_delta([])))
+        self.assertFalse(frames.is_frame("C'est au tour du Joueur 1."))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+# -*-coding:Utf-8 -*
+
+"""This module contains tests for the function analyse_map."""
+import unittest
+
+from graphical_layout.distance_field import UNREACHABLE
+from graphical_layout.grid import Grid
+from graphical_layout.map_analysis import analyse_map
+
+
+class TestMapAnalysis(unittest.TestCase):
+    """TestCase for functions of the 'map_analysis' module."""
+
+    def test_doors_needed(self):
+        """
+        The exit can only be reached through a door,
+        and the blank walled in is not counted.
+        """
+        analysis = analyse_map(Grid.from_rows([
+            "OOOOOOO",
+            "O  .UOO",
+            "O OOOO ",
+            "OOOOOOO",
+        ]))
+        self.assertEqual(analysis.reachable_spawns, 3)
+        self.assertEqual(analysis.exit_distance, 2)
+        self.assertTrue(analysis.doors_needed)
+
+    def test_open_path(self):
+        """The closest blank is counted, and no door is needed."""
+        analysis = analyse_map(Grid.from_rows([
+            "OOOOO",
+            "O . U",
+            "OOOOO",
+        ]))
+        self.assertEqual(analysis.reachable_spawns, 2)
+        self.assertEqual(analysis.exit_distance, 1)
+        self.assertFalse(analysis.doors_needed)
+
+    def test_unreachable_exit(self):
+        """No blank reaches the exit."""
+        analysis = analyse_map(Grid.from_rows([
+            "OOOOO",
+            "O  OU",
+            "OOOOO",
+        ]))
+        self.assertEqual(analysis.reachable_spawns, 0)
+        self.assertEqual(analysis.exit_distance, UNREACHABLE)
+        self.assertFalse(analysis.doors_needed)
+
+
+if __name__ == '__main__':
+    unittest.main()
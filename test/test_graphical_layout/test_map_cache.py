@@ -0,0 +1,98 @@
+# -*-coding:Utf-8 -*
+
+"""This module contains tests for the class MapCache."""
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import test.parameters_for_testing as test_parameters
+from graphical_layout.map_cache import MapCache
+from graphical_layout.map_parser import parse_map
+
+
+def parse_file(map_path):
+    """Parse the map stored in the file map_path."""
+    with open(map_path, "r") as map_file:
+        return parse_map(map_file)
+
+
+class TestMapCache(unittest.TestCase):
+    """TestCase for functions of the 'map_cache' module."""
+
+    def setUp(self):
+        """Create a map file and an empty cache in a temporary directory."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.map_path = os.path.join(self.directory.name, "correct_map.txt")
+        with open(self.map_path, "w") as map_file:
+            map_file.write("\n".join(test_parameters.correct_grid))
+        self.cache_path = os.path.join(self.directory.name, "cache", "maps.bin")
+
+    def tearDown(self):
+        """Remove the temporary directory."""
+        self.directory.cleanup()
+
+    def test_save_and_load(self):
+        """
+        A map stored in the cache is read back identical,
+        along with the error of an invalid map.
+        """
+        stat = os.stat(self.map_path)
+        map_cache = MapCache(self.cache_path)
+        map_cache.put(self.map_path, stat, "correct_map", parsed_map=parse_file(self.map_path))
+        map_cache.put("invalid.txt", stat, "invalid", error="La carte invalid est trop petite.")
+        map_cache.save()
+
+        map_cache = MapCache(self.cache_path)
+        map_cache.load()
+
+        entry = map_cache.get(self.map_path, stat)
+        self.assertEqual(entry.name, "correct_map")
+        self.assertEqual(entry.parsed_map.grid.rows(), test_parameters.correct_grid)
+        parsed_map = parse_file(self.map_path)
+        self.assertEqual(entry.parsed_map.open_cells, parsed_map.open_cells)
+        self.assertEqual(entry.parsed_map.analysis.__dict__, parsed_map.analysis.__dict__)
+
+        entry = map_cache.get("invalid.txt", stat)
+        self.assertIsNone(entry.parsed_map)
+        self.assertEqual(entry.error, "La carte invalid est trop petite.")
+
+    def test_modified_file(self):
+        """An entry is not used once its file has changed."""
+        stat = os.stat(self.map_path)
+        map_cache = MapCache(self.cache_path)
+        map_cache.put(self.map_path, stat, "correct_map", parsed_map=parse_file(self.map_path))
+
+        with open(self.map_path, "a") as map_file:
+            map_file.write("\n")
+        self.assertIsNone(map_cache.get(self.map_path, os.stat(self.map_path)))
+
+    def test_changed_settings(self):
+        """The cache is discarded once the parameters validating the maps have changed."""
+        stat = os.stat(self.map_path)
+        map_cache = MapCache(self.cache_path)
+        map_cache.put(self.map_path, stat, "correct_map", parsed_map=parse_file(self.map_path))
+        map_cache.save()
+
+        with mock.patch("parameters.parameters.map_max_size", 10):
+            map_cache = MapCache(self.cache_path)
+            map_cache.load()
+            self.assertIsNone(map_cache.get(self.map_path, stat))
+
+        map_cache = MapCache(self.cache_path)
+        map_cache.load()
+        self.assertIsNotNone(map_cache.get(self.map_path, stat))
+
+    def test_invalid_cache_file(self):
+        """A corrupted cache file is ignored."""
+        os.makedirs(os.path.dirname(self.cache_path))
+        with open(self.cache_path, "wb") as cache_file:
+            cache_file.write(b"RBMC garbage")
+
+        map_cache = MapCache(self.cache_path)
+        map_cache.load()
+        self.assertEqual(map_cache.entries, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
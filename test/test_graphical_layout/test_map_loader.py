@@ -0,0 +1,60 @@
+# -*-coding:Utf-8 -*
+
+"""This module contains tests for the 'map_loader' module."""
+import os
+import tempfile
+import unittest
+
+import parameters.parameters as parameters
+import test.parameters_for_testing as test_parameters
+from graphical_layout import map_loader
+from graphical_layout.map_cache import MapCache
+
+
+class TestMapLoader(unittest.TestCase):
+    """TestCase for functions of the 'map_loader' module."""
+
+    def setUp(self):
+        """Find the test maps, and create an empty cache."""
+        location = os.path.realpath(os.path.join(os.getcwd(), os.path.dirname(__file__)))
+        self.dir_maps = os.path.join(location, parameters.dir_test_maps)
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.map_cache = MapCache(os.path.join(self.directory.name, "maps.bin"))
+        self.threshold = parameters.parallel_loading_threshold
+
+    def tearDown(self):
+        """Remove the temporary directory and restore the parameters."""
+        self.directory.cleanup()
+        parameters.parallel_loading_threshold = self.threshold
+
+    def check_loaded(self, maps, errors):
+        """Check the maps loaded from the test directory."""
+        self.assertEqual([m.name for m in maps], ["correct_map"])
+        self.assertEqual(maps[0].grid.rows(), test_parameters.correct_grid)
+
+        # One error per invalid map, in the order of the files.
+        self.assertEqual(len(errors), 6)
+        self.assertTrue(errors[0].startswith("La carte invalid_character_map"))
+        self.assertTrue(errors[-1].startswith("La carte too_small_map"))
+
+    def test_sequential(self):
+        """Tests the maps are loaded in the current process."""
+        parameters.parallel_loading_threshold = 100
+        self.check_loaded(*map_loader.load_maps(self.dir_maps, self.map_cache))
+
+    def test_parallel(self):
+        """
+        Tests the maps are loaded by a pool of processes,
+        then read from the cache the second time.
+        """
+        parameters.parallel_loading_threshold = 1
+        self.check_loaded(*map_loader.load_maps(self.dir_maps, self.map_cache, workers=2))
+
+        self.map_cache.modified = False
+        self.check_loaded(*map_loader.load_maps(self.dir_maps, self.map_cache, workers=2))
+        self.assertFalse(self.map_cache.modified)
+
+
+if __name__ == '__main__':
+    unittest.main()
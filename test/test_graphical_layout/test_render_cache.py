@@ -0,0 +1,96 @@
+# -*-coding:Utf-8 -*
+
+"""This module contains tests and a benchmark for the class RenderCache."""
+import time
+import unittest
+from copy import deepcopy
+from unittest.mock import MagicMock
+
+from graphical_layout import frames
+from graphical_layout.grid import Grid
+from graphical_layout.render_cache import RenderCache
+
+
+def legacy_current_state(grid, players):
+    """
+    Original implementation of Game.get_current_state.
+    Used as a reference in the benchmark.
+    """
+    shown_grid = deepcopy(grid)
+    for player in players:
+        shown_grid[player.row][player.col] = str(player.identifier)
+    result = ''.join([c for row in shown_grid for c in row + ["\n"]])
+    return '\n' + result
+
+
+class TestRenderCache(unittest.TestCase):
+    """TestCase for functions of the 'render_cache' module."""
+
+    def setUp(self):
+        """Create a mock map and its RenderCache."""
+        self.rows = ["OOOOOO", "O    U", "O .  O", "OOOOOO"]
+        self.game_map = MagicMock()
+        self.game_map.grid = Grid.from_rows(self.rows)
+        self.game_map.width = 6
+        self.game_map.height = 4
+        self.render_cache = RenderCache(self.game_map)
+
+    def test_patch(self):
+        """Patching a cell only changes this cell."""
+        self.render_cache.patch(1, 1, '1')
+        self.render_cache.patch(2, 2, 'O')
+
+        self.assertEqual(self.render_cache.get(1, 1), '1')
+        self.assertEqual(self.render_cache.text(),
+                         "OOOOOO\nO1   U\nO O  O\nOOOOOO\n")
+        self.assertEqual(self.render_cache.keyframe(), frames.encode_keyframe(
+            ["OOOOOO", "O1   U", "O O  O", "OOOOOO"]).encode())
+
+    def test_benchmark(self):
+        """
+        Compare the frames/sec rendered by the original implementation
+        and by RenderCache, on a 100x100 map with 9 players moving.
+        """
+        size = 100
+        self.game_map.grid = Grid.from_rows(['O' + ' ' * (size - 2) + 'O'] * size)
+        self.game_map.width = size
+        self.game_map.height = size
+
+        players = []
+        for i in range(0, 9):
+            player = MagicMock()
+            player.row, player.col, player.identifier = i + 1, 1, i + 1
+            players.append(player)
+
+        iterations = 200
+
+        def move(player):
+            player.col = player.col % (size - 2) + 1
+
+        # The original implementation used a list of lists of characters.
+        legacy_grid = [list(row) for row in self.game_map.grid.rows()]
+
+        start = time.perf_counter()
+        for i in range(0, iterations):
+            move(players[i % 9])
+            legacy_current_state(legacy_grid, players)
+        legacy_rate = iterations / (time.perf_counter() - start)
+
+        render_cache = RenderCache(self.game_map)
+        start = time.perf_counter()
+        for i in range(0, iterations):
+            player = players[i % 9]
+            render_cache.patch(player.row, player.col, ' ')
+            move(player)
+            render_cache.patch(player.row, player.col, str(player.identifier))
+            render_cache.keyframe()
+        cache_rate = iterations / (time.perf_counter() - start)
+
+        # RenderCache renders about 1000 times faster: keep a margin for slow machines.
+        self.assertGreater(cache_rate, 100 * legacy_rate,
+                           "get_current_state: {:.0f} frames/sec, RenderCache: {:.0f} frames/sec"
+                           .format(legacy_rate, cache_rate))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+# -*-coding:Utf-8 -*
+
+"""This module contains tests for the class BotInteractor."""
+import random
+import unittest
+
+import test.parameters_for_testing as test_parameters
+from game_logic.game import Game
+from game_logic.player import ASK_MOVE, Player
+from graphical_layout.grid import DOOR
+from graphical_layout.map import Map
+from sessions.common_session_tools.bot_interactor import BotInteractor
+from sessions.common_session_tools.interactor import DeafInteractor
+
+
+class TestBotInteractor(unittest.TestCase):
+    """
+    TestCase for the class BotInteractor.
+    The bots play on a map whose exit is closer through a wall:
+    OOOOOOO
+    O     O
+    O OOO O
+    O   O O
+    O   O U
+    OOOOOOO
+    """
+
+    def setUp(self):
+        """
+        Create a game on the map.
+        """
+        game_map = Map("test", "OOOOOOO\nO     O\nO OOO O\nO   O O\nO   O U\nOOOOOOO")
+        self.game = Game(game_map.copy(), DeafInteractor([]))
+
+    def add_bot(self, strategy, row, col):
+        """
+        Add a bot to the game on the cell (row, col).
+        """
+        player = Player(BotInteractor(strategy, random.Random(0)))
+        self.game.add_player(player)
+        old_row, old_col = player.row, player.col
+        player.row, player.col = row, col
+        self.game.occupancy.move(player, old_row, old_col)
+        return player
+
+    def ask(self, player):
+        """
+        Ask the bot for its next move.
+        """
+        player.send(ASK_MOVE)
+        self.assertIs(player.select(True), player)
+        move = player.recv()
+        self.assertIsNone(player.select(True))
+        return move
+
+    def test_greedy(self):
+        """The greedy bot goes towards the exit, around the walls."""
+        player = self.add_bot("greedy", 3, 3)
+        self.assertEqual(self.ask(player), "O")
+
+    def test_drill(self):
+        """The drilling bot opens the wall between it and the exit."""
+        player = self.add_bot("drill", 4, 3)
+        self.assertEqual(self.ask(player), "PE")
+
+        self.game.handle_message(player, "PE")
+        self.game.advance()
+        self.assertEqual(self.game.game_map.grid.get(4, 4), DOOR)
+        self.assertEqual(self.ask(player), "E")
+
+    def test_random(self):
+        """The random bot doesn't walk into the walls or the other players."""
+        player = self.add_bot("random", 1, 2)
+        self.add_bot("random", 1, 3)
+        for i in range(0, 20):
+            self.assertEqual(self.ask(player), "O")
+
+    def test_game_of_bots(self):
+        """A game played by bots only is won."""
+        game_map = Map("correct_map", "\n".join(test_parameters.correct_grid))
+        game = Game(game_map.copy(), DeafInteractor([]))
+        for i in range(0, 50):
+            game.add_player(Player(BotInteractor("greedy", random.Random(i))))
+
+        game.play()
+        self.assertTrue(game.finished)
+        self.assertIsNotNone(game.winner)
+
+
+if __name__ == '__main__':
+    unittest.main()
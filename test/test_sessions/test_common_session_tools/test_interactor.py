@@ -0,0 +1,85 @@
+# -*-coding:Utf-8 -*
+
+"""This module contains tests for the classes DistantInteractor and StreamInteractor."""
+import asyncio
+import socket
+import unittest
+from unittest import mock
+
+from sessions.common_session_tools.interactor import DistantInteractor, StreamInteractor
+
+
+class TestDistantInteractor(unittest.TestCase):
+    """
+    TestCase for the class DistantInteractor.
+    """
+
+    def setUp(self):
+        """Create an interactor on one end of a pair of sockets."""
+        self.server, self.client = socket.socketpair()
+        self.interactor = DistantInteractor(self.server)
+
+    def tearDown(self):
+        """Close both sockets."""
+        self.server.close()
+        self.client.close()
+
+    def test_cork_and_flush(self):
+        """
+        Check that the messages sent while the interactor is corked
+        are held back, then sent in order by flush.
+        """
+        self.interactor.cork()
+        self.interactor.print("Le Joueur 1 a joué E.")
+        self.interactor.post(b'$\n')
+        self.interactor.print("C'est au tour du Joueur 2.")
+
+        self.client.setblocking(False)
+        self.assertRaises(BlockingIOError, self.client.recv, 1024)
+
+        self.interactor.flush()
+        expected = "Le Joueur 1 a joué E.\n$\nC'est au tour du Joueur 2.\n".encode()
+        self.assertEqual(self.client.recv(1024), expected)
+
+        # Once flushed, the messages are sent right away.
+        self.interactor.print("Où allez-vous?")
+        self.assertEqual(self.client.recv(1024), "Où allez-vous?\n".encode())
+
+
+class TestStreamInteractor(unittest.TestCase):
+    """
+    TestCase for the class StreamInteractor.
+    """
+
+    @mock.patch("parameters.parameters.max_write_buffer", 65536)
+    def test_client_not_reading(self):
+        """
+        Check that the connection of a client who doesn't read
+        its messages is dropped, instead of piling them up in memory.
+        """
+        async def scenario():
+            accepted = asyncio.get_running_loop().create_future()
+            server = await asyncio.start_server(lambda r, w: accepted.set_result(w), 'localhost', 0)
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection('localhost', port)
+
+            interactor = StreamInteractor(await accepted)
+            chunk = b'O' * 65535 + b'\n'
+            posted = 0
+            while not interactor.writer.is_closing() and posted < 1000:
+                interactor.post(chunk)
+                posted += 1
+                await asyncio.sleep(0)
+
+            writer.close()
+            server.close()
+            await server.wait_closed()
+            return interactor.writer.is_closing(), posted
+
+        dropped, posted = asyncio.run(scenario())
+        self.assertTrue(dropped)
+        self.assertLess(posted, 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+# -*-coding:Utf-8 -*
+
+"""This module contains tests for the class Reactor."""
+import socket
+import time
+import unittest
+
+from sessions.common_session_tools.reactor import Reactor
+from sessions.common_session_tools.interactor import AsyncClientInteractor
+
+
+class TestReactor(unittest.TestCase):
+    """
+    TestCase for the class Reactor and the interactors using it.
+    """
+
+    def setUp(self):
+        """
+        Create a reactor and three connected pairs of sockets.
+        The server side of each pair is wrapped in an AsyncClientInteractor.
+        """
+        self.reactor = Reactor(timeout=0.05)
+        self.pairs = [socket.socketpair() for i in range(0, 3)]
+        self.interactors = [AsyncClientInteractor(server, self.reactor)
+                            for server, client in self.pairs]
+
+    def tearDown(self):
+        """Close the sockets and the reactor."""
+        for interactor in self.interactors:
+            interactor.close()
+        for server, client in self.pairs:
+            client.close()
+        self.reactor.close()
+
+    def scan(self):
+        """Select every interactor once, like Game.wait_for_current_step."""
+        return [i for i in self.interactors if i.select(True) is not None]
+
+    def test_one_wait_per_scan(self):
+        """
+        When no client talks, a scan of all the clients
+        waits once for the timeout, not once per client.
+        """
+        self.scan()
+        start = time.perf_counter()
+        talking = self.scan()
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(talking, [])
+        self.assertLess(elapsed, 2 * 0.05)
+
+    def test_message_detected(self):
+        """
+        A message sent by one client is detected and read,
+        then the client is not selected anymore.
+        """
+        self.pairs[1][1].send(b'E\n')
+
+        self.scan()
+        talking = self.scan()
+        self.assertEqual(talking, [self.interactors[1]])
+        self.assertEqual(talking[0].get(""), 'E')
+
+        self.scan()
+        self.assertEqual(self.scan(), [])
+
+    def test_pending_connection_during_game(self):
+        """
+        A connection request nobody accepts (the factory isn't polled during a game)
+        doesn't stop the scans of the players from waiting.
+        """
+        listener = socket.socket()
+        listener.bind(('localhost', 0))
+        listener.listen()
+        self.addCleanup(listener.close)
+        self.reactor.register(listener)
+
+        client = socket.create_connection(listener.getsockname())
+        self.addCleanup(client.close)
+
+        self.scan()
+        start = time.perf_counter()
+        for i in range(0, 3):
+            self.assertEqual(self.scan(), [])
+        self.assertGreaterEqual(time.perf_counter() - start, 2 * 0.05)
+
+        # The connection request is still detected once the listening socket is checked.
+        readable, epoch = self.reactor.select(listener, -1)
+        self.assertTrue(readable)
+        self.reactor.unregister(listener)
+
+
+if __name__ == '__main__':
+    unittest.main()
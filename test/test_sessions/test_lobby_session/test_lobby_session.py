@@ -0,0 +1,179 @@
+# -*-coding:Utf-8 -*
+
+"""This module contains tests for the class LobbySession."""
+import asyncio
+import unittest
+from unittest import mock
+
+import test.parameters_for_testing as parameters
+from game_logic.player import Player
+from graphical_layout.map import Map
+from sessions.common_session_tools.interactor import DeafInteractor
+from sessions.lobby_session.lobby_session import LobbySession
+
+
+class TestLobbySession(unittest.TestCase):
+    """
+    TestCase for the class LobbySession.
+    Several clients connect to the lobby, and play in different rooms
+    at the same time.
+    """
+
+    def setUp(self):
+        """
+        Create a lobby with the easy_to_win map.
+        This map makes it certain that a player going East wins the game.
+        """
+        game_map = Map("easy_to_win", "\n".join(parameters.easy_to_win))
+        self.session = LobbySession(DeafInteractor([]), [game_map])
+
+    async def play(self, port, room, moves):
+        """
+        Coroutine simulating a client:
+        - Join the room and start the game,
+        - Go East when it is his/her turn until the game is won.
+        Returns the messages received.
+        """
+        reader, writer = await asyncio.open_connection('localhost', port)
+        writer.write("R {} 1\nC\n".format(room).encode())
+
+        received = []
+        while True:
+            message = (await reader.readline()).decode().rstrip('\n')
+            received.append(message)
+            if message == "Où allez-vous?":
+                writer.write(moves.pop(0).encode() + b'\n')
+            if "a gagné la partie" in message:
+                break
+
+        writer.write(b'0\n')
+        await reader.read()
+        writer.close()
+        return received
+
+    async def run_rooms(self, rooms):
+        """Start the lobby, and play one game in each room at the same time."""
+        await self.session.start('localhost', 0)
+        port = self.session.server.sockets[0].getsockname()[1]
+
+        clients = [self.play(port, room, ['E'] * 3) for room in rooms]
+        results = await asyncio.wait_for(asyncio.gather(*clients), 10)
+
+        self.session.close()
+        await self.session.server.wait_closed()
+        return results
+
+    def test_concurrent_rooms(self):
+        """
+        Tests that games are played in several rooms at the same time.
+        Each room is closed once its player has left.
+        """
+        rooms = ["salle{}".format(i) for i in range(0, 20)]
+        results = asyncio.run(self.run_rooms(rooms))
+
+        for received in results:
+            self.assertIn("Le Joueur 1 a gagné la partie.", received)
+
+        self.assertEqual(self.session.rooms, {})
+        self.assertEqual(self.session.connected_players, [])
+
+    async def idle(self):
+        """
+        Start the lobby, and start a game with a client who never plays.
+        Returns the messages received until the connection is closed.
+        """
+        await self.session.start('localhost', 0)
+        port = self.session.server.sockets[0].getsockname()[1]
+
+        reader, writer = await asyncio.open_connection('localhost', port)
+        writer.write(b"R salle 1\nC\n")
+        received = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+
+        self.session.close()
+        await self.session.server.wait_closed()
+        return received.decode()
+
+    @mock.patch("parameters.parameters.max_missed_turns", 2)
+    @mock.patch("parameters.parameters.turn_timeout", 0.1)
+    def test_idle_player(self):
+        """
+        Tests that a player who doesn't play forfeits,
+        and that his/her room is closed.
+        """
+        received = asyncio.run(self.idle())
+        self.assertIn("Temps écoulé : le Joueur 1 passe son tour.", received)
+        self.assertIn("vous déclarez forfait", received)
+        self.assertEqual(self.session.rooms, {})
+
+    async def play_with_bots(self):
+        """
+        Start the lobby, and play a game from the matchmaking queue,
+        completed with bots. Returns the messages received.
+        """
+        await self.session.start('localhost', 0)
+        port = self.session.server.sockets[0].getsockname()[1]
+
+        reader, writer = await asyncio.open_connection('localhost', port)
+        writer.write(b"A\n")
+
+        received = []
+        while True:
+            message = (await reader.readline()).decode().rstrip('\n')
+            received.append(message)
+            if message == "Où allez-vous?":
+                writer.write(b"E\n")
+            if "a gagné la partie" in message:
+                break
+
+        writer.write(b'0\n')
+        await reader.read()
+        writer.close()
+
+        # The bots leave the room at the end of the game.
+        while self.session.rooms:
+            await asyncio.sleep(0.01)
+
+        self.session.close()
+        await self.session.server.wait_closed()
+        return received
+
+    @mock.patch("parameters.parameters.matchmaking_bots", True)
+    @mock.patch("parameters.parameters.matchmaking_deadline", 0.05)
+    def test_bots(self):
+        """
+        Tests that a game started by the matchmaking queue with one player
+        is completed with bots, and that the bots leave the room after the game.
+        """
+        received = asyncio.run(asyncio.wait_for(self.play_with_bots(), 10))
+        self.assertEqual(received.count("Un nouveau joueur a rejoint la salle."), 2)
+        keyframe = next(message for message in received if message.startswith("\x1eK"))
+        self.assertIn("3", keyframe)
+        self.assertEqual(self.session.rooms, {})
+
+    async def match_beside_room(self):
+        """
+        Create a room called partie1, then start a game from the matchmaking queue.
+        Returns the room created by the player, and the rooms opened.
+        """
+        self.session.join_room(Player(DeafInteractor([])), "partie1", "1")
+        room = self.session.rooms["partie1"]
+        for i in range(0, 2):
+            self.session.enqueue(Player(DeafInteractor([])))
+        rooms = dict(self.session.rooms)
+        self.session.close()
+        return room, rooms
+
+    @mock.patch("parameters.parameters.matchmaking_fill_threshold", 2)
+    def test_match_name(self):
+        """
+        Tests that the room of a game of the matchmaking queue
+        doesn't replace a room created by a player.
+        """
+        room, rooms = asyncio.run(self.match_beside_room())
+        self.assertIs(rooms["partie1"], room)
+        self.assertEqual(len(rooms["partie2"].players), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
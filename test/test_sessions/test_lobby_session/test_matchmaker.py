@@ -0,0 +1,139 @@
+# -*-coding:Utf-8 -*
+
+"""This module contains tests for the class Matchmaker."""
+import asyncio
+import unittest
+from unittest import mock
+
+import test.parameters_for_testing as parameters
+from graphical_layout.map import Map
+from sessions.common_session_tools.interactor import DeafInteractor
+from sessions.lobby_session.lobby_session import LobbySession
+from sessions.lobby_session.matchmaker import Matchmaker
+
+
+class TestMatchmaker(unittest.TestCase):
+    """
+    TestCase for the class Matchmaker.
+    """
+
+    def setUp(self):
+        """
+        Create maps of different capacities.
+        """
+        self.maps = []
+        for name, capacity in [("grande", 9), ("petite", 2), ("moyenne", 4)]:
+            game_map = mock.Mock()
+            game_map.name = name
+            game_map.max_players = capacity
+            self.maps.append(game_map)
+
+    def test_choose_map(self):
+        """
+        Tests that the smallest map holding the group is chosen.
+        """
+        matchmaker = Matchmaker(self.maps, 4, 10)
+        self.assertEqual(matchmaker.choose_map(1).name, "petite")
+        self.assertEqual(matchmaker.choose_map(2).name, "petite")
+        self.assertEqual(matchmaker.choose_map(3).name, "moyenne")
+        self.assertEqual(matchmaker.choose_map(9).name, "grande")
+        self.assertEqual(matchmaker.choose_map(12).name, "grande")
+
+    def test_fill_threshold(self):
+        """
+        Tests that a group is formed as soon as enough players are waiting.
+        """
+        matchmaker = Matchmaker(self.maps, 3, 10)
+        for player in range(0, 7):
+            matchmaker.add(player, player)
+
+        groups = matchmaker.match(7)
+        self.assertEqual([players for players, m in groups], [[0, 1, 2], [3, 4, 5]])
+        self.assertEqual([m.name for players, m in groups], ["moyenne", "moyenne"])
+        self.assertEqual(len(matchmaker), 1)
+        self.assertEqual(matchmaker.next_deadline(), 16)
+
+    def test_deadline(self):
+        """
+        Tests that the players waiting are grouped once the deadline is reached.
+        Players leaving the queue are not grouped.
+        """
+        matchmaker = Matchmaker(self.maps, 4, 10)
+        for player in range(0, 3):
+            matchmaker.add(player, 0)
+        matchmaker.remove(1)
+
+        self.assertEqual(matchmaker.match(9), [])
+        players, game_map = matchmaker.match(10)[0]
+        self.assertEqual(players, [0, 2])
+        self.assertEqual(game_map.name, "petite")
+        self.assertIsNone(matchmaker.next_deadline())
+
+        stats = matchmaker.stats()
+        self.assertEqual(stats["placed"], 2)
+        self.assertEqual(stats["average_wait"], 10)
+        self.assertEqual(stats["waiting"], 0)
+
+
+class TestLobbyMatchmaking(unittest.TestCase):
+    """
+    Clients join the matchmaking queue of a lobby,
+    and are placed in games without choosing a room.
+    """
+
+    async def play(self, port):
+        """
+        Coroutine simulating a client joining the queue.
+        Go East until the game is over.
+        Returns the messages received.
+        """
+        reader, writer = await asyncio.open_connection('localhost', port)
+        writer.write(b"A\n")
+
+        received = []
+        while True:
+            message = (await reader.readline()).decode().rstrip('\n')
+            received.append(message)
+            if message == "Où allez-vous?":
+                writer.write(b'E\n')
+            if "a gagné la partie" in message:
+                break
+
+        writer.write(b'0\n')
+        await reader.read()
+        writer.close()
+        return received
+
+    async def run_clients(self, session, clients):
+        """Start the lobby, and connect the clients."""
+        await session.start('localhost', 0)
+        port = session.server.sockets[0].getsockname()[1]
+
+        results = await asyncio.wait_for(
+            asyncio.gather(*[self.play(port) for i in range(0, clients)]), 10)
+
+        session.close()
+        await session.server.wait_closed()
+        return results
+
+    @mock.patch("parameters.parameters.matchmaking_deadline", 0.2)
+    @mock.patch("parameters.parameters.matchmaking_fill_threshold", 2)
+    def test_matchmaking(self):
+        """
+        Tests that full groups start at once, and the last player
+        starts alone once the deadline is reached.
+        """
+        game_map = Map("easy_to_win", "\n".join(parameters.easy_to_win))
+        session = LobbySession(DeafInteractor([]), [game_map])
+        results = asyncio.run(self.run_clients(session, 5))
+
+        for received in results:
+            self.assertTrue(any("a gagné la partie" in message for message in received))
+
+        self.assertEqual(session.matches, 3)
+        self.assertEqual(session.matchmaker.stats()["placed"], 5)
+        self.assertEqual(session.rooms, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,217 @@
+# -*-coding:Utf-8 -*
+
+"""This module contains tests for the class ShardedLobby."""
+import asyncio
+import os
+import signal
+import socket
+import time
+import unittest
+from unittest import mock
+
+import test.parameters_for_testing as parameters
+from graphical_layout.map import Map
+from game_logic.player import Player
+from sessions.common_session_tools.interactor import DeafInteractor
+from sessions.lobby_session.shards import ShardedLobby
+
+
+@unittest.skipUnless(hasattr(socket, "send_fds"), "Passing sockets requires Unix.")
+@mock.patch("parameters.parameters.shard_heartbeat_interval", 0.1)
+class TestShardedLobby(unittest.TestCase):
+    """
+    TestCase for the class ShardedLobby.
+    Several clients connect to the front process, and play in rooms
+    hosted by different worker processes.
+    """
+
+    def setUp(self):
+        """
+        Create a sharded lobby with the easy_to_win map, and two workers.
+        This map makes it certain that a player going East wins the game.
+        """
+        game_map = Map("easy_to_win", "\n".join(parameters.easy_to_win))
+        self.session = ShardedLobby(DeafInteractor([]), [game_map], workers_number=2)
+
+    def tearDown(self):
+        self.session.close()
+
+    async def play(self, port, room, moves):
+        """
+        Coroutine simulating a client:
+        - Join the room and start the game,
+        - Go East when it is his/her turn until the game is won.
+        Returns the messages received.
+        """
+        reader, writer = await asyncio.open_connection('localhost', port)
+        writer.write("R {} 1\nC\n".format(room).encode())
+
+        received = []
+        while True:
+            message = (await reader.readline()).decode().rstrip('\n')
+            received.append(message)
+            if message == "Où allez-vous?":
+                writer.write(moves.pop(0).encode() + b'\n')
+            if "a gagné la partie" in message:
+                break
+
+        writer.write(b'0\n')
+        await reader.read()
+        writer.close()
+        return received
+
+    async def run_rooms(self, rooms):
+        """Start the lobby, and play one game in each room at the same time."""
+        self.session.start_workers()
+        await self.session.start('localhost', 0)
+        port = self.session.listener.getsockname()[1]
+        accepting = asyncio.create_task(self.session.accept_clients())
+
+        clients = [self.play(port, room, ['E'] * 3) for room in rooms]
+        results = await asyncio.wait_for(asyncio.gather(*clients), 20)
+
+        accepting.cancel()
+        return results
+
+    def test_rooms_on_several_workers(self):
+        """
+        Tests that games are played in rooms hosted by both workers.
+        """
+        rooms = ["salle{}".format(i) for i in range(0, 8)]
+        results = asyncio.run(self.run_rooms(rooms))
+
+        for received in results:
+            self.assertIn("Le Joueur 1 a gagné la partie.", received)
+
+        self.assertEqual(set(self.session.placements), set(rooms))
+        workers = set(worker for worker, placed in self.session.placements.values())
+        self.assertEqual(workers, set(self.session.workers))
+
+    async def restart_worker(self):
+        """Kill a worker, and wait until the front process has restarted it."""
+        self.session.start_workers()
+        await self.session.start('localhost', 0)
+        accepting = asyncio.create_task(self.session.accept_clients())
+
+        worker = self.session.workers[0]
+        process = worker.process
+        process.kill()
+
+        deadline = time.monotonic() + 10
+        while worker.process is process and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+
+        accepting.cancel()
+        return worker
+
+    def test_restart_worker(self):
+        """
+        Tests that a worker which has stopped is restarted.
+        """
+        worker = asyncio.run(self.restart_worker())
+        self.assertTrue(worker.process.is_alive())
+
+    async def pass_to_lost_worker(self):
+        """
+        Pass a client creating the room salle, once the second worker has reported its load.
+        Returns whether the client has been passed.
+        """
+        client, other = socket.socketpair()
+        self.addCleanup(client.close)
+        self.addCleanup(other.close)
+        player = Player(DeafInteractor([]))
+        self.session.workers[1].last_report = time.monotonic()
+        return await self.session.pass_client(player, client, "R salle 1", b"R salle 1\n")
+
+    @mock.patch("parameters.parameters.shard_timeout", 0.2)
+    def test_hand_over_failed(self):
+        """
+        Tests that a client whose worker has stopped, or doesn't read its control socket
+        anymore, is passed to another worker, and that the room is placed again.
+        """
+        self.session.start_workers()
+        first, second = self.session.workers
+
+        # The first worker has stopped.
+        first.process.kill()
+        first.process.join()
+        self.session.placements["salle"] = (first, time.monotonic())
+        self.assertTrue(asyncio.run(self.pass_to_lost_worker()))
+        self.assertIs(self.session.placements["salle"][0], second)
+        self.assertFalse(first.is_healthy())
+
+        # The second worker is frozen, and its control socket is full.
+        os.kill(second.process.pid, signal.SIGSTOP)
+        try:
+            while True:
+                second.control.send(b"{}")
+        except BlockingIOError:
+            pass
+        try:
+            self.assertFalse(asyncio.run(self.pass_to_lost_worker()))
+        finally:
+            os.kill(second.process.pid, signal.SIGCONT)
+        self.assertNotIn("salle", self.session.placements)
+        self.assertFalse(second.is_healthy())
+
+    def test_queue_on_one_worker(self):
+        """
+        Tests that the players joining the matchmaking queue are all passed
+        to the same worker, whatever the load of the workers.
+        """
+        self.session.start_workers()
+        queue_worker = self.session.workers[0]
+        for i in range(0, 4):
+            worker = self.session.place(Player(DeafInteractor([])), "A")
+            self.assertIs(worker, queue_worker)
+            worker.connections += 1
+
+        # The queue moves once its worker is not healthy anymore, then stays on the new one.
+        queue_worker.last_report = 0
+        self.assertIs(self.session.place(Player(DeafInteractor([])), "A"), self.session.workers[1])
+        queue_worker.last_report = time.monotonic()
+        for i in range(0, 4):
+            worker = self.session.place(Player(DeafInteractor([])), "A")
+            self.assertIs(worker, self.session.workers[1])
+            worker.connections += 1
+
+    async def restart_hung_worker(self):
+        """
+        Freeze a worker, and measure the longest time the event loop of the
+        front process is unavailable until the worker is replaced and stopped.
+        """
+        self.session.start_workers()
+        await self.session.start('localhost', 0)
+        accepting = asyncio.create_task(self.session.accept_clients())
+
+        worker = self.session.workers[0]
+        process = worker.process
+        os.kill(process.pid, signal.SIGSTOP)
+
+        longest = 0
+        last = time.monotonic()
+        deadline = last + 10
+        while (worker.process is process or process.is_alive()) and last < deadline:
+            await asyncio.sleep(0.01)
+            now = time.monotonic()
+            longest = max(longest, now - last)
+            last = now
+
+        accepting.cancel()
+        return worker, process, longest
+
+    @mock.patch("parameters.parameters.shard_timeout", 0.5)
+    def test_restart_hung_worker(self):
+        """
+        Tests that a worker which doesn't answer anymore is replaced,
+        without blocking the front process while it is stopped.
+        """
+        worker, process, longest = asyncio.run(self.restart_hung_worker())
+        self.assertIsNot(worker.process, process)
+        self.assertFalse(process.is_alive())
+        self.assertTrue(worker.process.is_alive())
+        self.assertLess(longest, 0.4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,104 +1,161 @@
-# -*-coding:Utf-8 -*
-
-"""This module contains tests for the class MainSession."""
-import unittest
-from unittest.mock import MagicMock
-from sessions.server_session.server_session import MainSession
-from sessions.common_session_tools.interactor import DeafInteractor, DeafInteractorFactory
-import test.parameters_for_testing as parameters
-
-
-class TestMainSession(unittest.TestCase):
-    """
-    TestCase for the class MainSession.
-    Tests the methods called from outside the session:
-     - load_maps
-     - launch.
-    This ensures entire coverage of the MainSession methods.
-    """
-
-    def setUp(self):
-        """
-        Code to execute before performing the tests.
-        Create a session with:
-          - A mock server interactor.
-            Contains all the inputs to come from the server
-          - Three mock player interactors.
-            Contain all the inputs to come from the players
-        """
-
-        # The server will input '1' twice, and '0' to exit the session.
-        # When asked which labyrinth to use,
-        # the server will answer twice the first labyrinth.
-        server_interactor = DeafInteractor(['1', '1', '0'])
-
-        # Two games will be played during the test of the session.
-
-        # For each game:
-        # - All three players will only play East 3 times.
-        # - The first player will also launch the game with the C command
-
-        # At the end of the first game:
-        # - All the players send 'O' to continue playing.
-
-        # At the end of the second game:
-        # - All the players send 'N' to stop playing.
-
-        moves = ['E'] * 3
-        start = ['C']
-        go_on = ['O']
-        stop = ['N']
-
-        first_player = start + moves + go_on + start + moves + stop
-        second_player = moves + go_on + moves + stop
-        third_player = moves + go_on + moves + stop
-
-        players_moves = [first_player, second_player, third_player]
-        factory = DeafInteractorFactory(players_moves)
-
-        self.session = MainSession(server_interactor, factory)
-
-    def test_load_maps(self):
-        """
-        Tests the method load_maps actually loads some maps in the session.
-        """
-        self.session.load_maps()
-        self.assertTrue(len(self.session.maps) > 0)
-
-    def test_launch(self):
-        """
-        Tests a full session with three players playing two games.
-        We use the easy_to_win map from the parameters_for_testing module.
-        """
-
-        # Make sure there are no maps loaded in the session.
-        self.session.maps = []
-
-        # Create a mock map with the easy_to_win grid.
-        # This grid makes it certain that one player
-        # will win in less than 3 East steps.
-        game_map = MagicMock()
-        game_map.grid = [list(row) for row in parameters.easy_to_win]
-        game_map.width = 20
-        game_map.height = 6
-        game_map.max_players = 3
-
-        self.session.maps.append(game_map)
-        self.session.launch()
-
-        # Check all players have been disconnected.
-        self.assertEqual(len(self.session.connected_players), 0)
-
-        # Check two games have been played.
-        self.assertEqual(self.session.games_played, 2)
-
-        # Check that both games involved 3 players.
-        for i in range(0, 2):
-            self.assertEqual(self.session.players_number[i], 3)
-
-        # Check the session is over.
-        self.assertFalse(self.session.play)
-
-
-if __name__ == '__main__':
-    unittest.main()
+# -*-coding:Utf-8 -*
+
+"""This module contains tests for the class MainSession."""
+import unittest
+from unittest import mock
+from sessions.server_session.server_session import MainSession
+from sessions.common_session_tools.interactor import DeafInteractor, DeafInteractorFactory
+from graphical_layout.map import Map
+import test.parameters_for_testing as parameters
+
+
+class TestMainSession(unittest.TestCase):
+    """
+    TestCase for the class MainSession.
+    Tests the methods called from outside the session:
+     - load_maps
+     - launch.
+    This ensures entire coverage of the MainSession methods.
+    """
+
+    def setUp(self):
+        """
+        Code to execute before performing the tests.
+        Create a session with:
+          - A mock server interactor.
+            Contains all the inputs to come from the server
+          - Three mock player interactors.
+            Contain all the inputs to come from the players
+        """
+
+        # The server will input '1' twice, and '0' to exit the session.
+        # When asked which labyrinth to use,
+        # the server will answer twice the first labyrinth.
+        server_interactor = DeafInteractor(['1', '1', '0'])
+
+        # Two games will be played during the test of the session.
+
+        # For each game:
+        # - All three players will only play East 3 times.
+        # - The first player will also launch the game with the C command
+
+        # At the end of the first game:
+        # - All the players send 'O' to continue playing.
+
+        # At the end of the second game:
+        # - All the players send 'N' to stop playing.
+
+        moves = ['E'] * 3
+        start = ['C']
+        go_on = ['O']
+        stop = ['N']
+
+        first_player = start + moves + go_on + start + moves + stop
+        second_player = moves + go_on + moves + stop
+        third_player = moves + go_on + moves + stop
+
+        players_moves = [first_player, second_player, third_player]
+        factory = DeafInteractorFactory(players_moves)
+
+        self.session = MainSession(server_interactor, factory)
+
+    def test_load_maps(self):
+        """
+        Tests the method load_maps actually loads some maps in the session.
+        """
+        self.session.load_maps()
+        self.assertTrue(len(self.session.maps) > 0)
+
+    def test_load_maps_in_background(self):
+        """
+        Tests the method load_maps makes the maps available
+        one by one when they are loaded in the background.
+        """
+        self.session.maps = []
+        self.session.load_maps(background=True)
+
+        with self.session.lock:
+            while self.session.maps_loading:
+                self.session.maps_loaded.wait()
+        self.assertTrue(len(self.session.maps) > 0)
+
+    def test_launch(self):
+        """
+        Tests a full session with three players playing two games.
+        We use the easy_to_win map from the parameters_for_testing module.
+        """
+
+        # Make sure there are no maps loaded in the session.
+        self.session.maps = []
+
+        # Create a map with the easy_to_win grid.
+        # This grid makes it certain that one player
+        # will win in less than 3 East steps.
+        game_map = Map("easy_to_win", "\n".join(parameters.easy_to_win))
+
+        self.session.maps.append(game_map)
+        self.session.launch()
+
+        # Check all players have been disconnected.
+        self.assertEqual(len(self.session.connected_players), 0)
+
+        # Check two games have been played.
+        self.assertEqual(self.session.games_played, 2)
+
+        # Check that both games involved 3 players.
+        for i in range(0, 2):
+            self.assertEqual(self.session.players_number[i], 3)
+
+        # Check the session is over.
+        self.assertFalse(self.session.play)
+
+    def isolate_session(self):
+        """
+        MainSession is a singleton, shared by all the tests:
+        restore the attributes of the session at the end of the test.
+        """
+        saved = dict(self.session.__dict__)
+        saved["connected_players"] = list(self.session.connected_players)
+        self.addCleanup(self.session.__dict__.update, saved)
+        self.session.connected_players = []
+        self.session.play = True
+
+    def test_accept_clients(self):
+        """
+        Tests that the clients who can't play on any map are turned away.
+        The easy_to_win map has room for 3 players.
+        """
+        self.isolate_session()
+        self.session.maps = [Map("easy_to_win", "\n".join(parameters.easy_to_win))]
+        self.session.player_interactor_factory = DeafInteractorFactory([[]] * 5)
+        self.session.accept_clients()
+        self.assertEqual(len(self.session.connected_players), 3)
+
+    def test_too_many_players_for_the_map(self):
+        """
+        Tests that another map is asked for if players have connected
+        between the choice of a map and the end of the greeter.
+        """
+        self.isolate_session()
+        easy_map = Map("easy_to_win", "\n".join(parameters.easy_to_win))
+        correct_map = Map("correct_map", "\n".join(parameters.correct_grid))
+        self.session.maps = [easy_map, correct_map]
+        self.session.interactor = DeafInteractor(['1', '2'])
+        self.session.player_interactor_factory = DeafInteractorFactory([])
+
+        prompt_map = self.session.prompt_map
+
+        def late_players():
+            # Four players connect just after the first choice.
+            prompt_map()
+            if len(self.session.connected_players) == 0:
+                for messages in [[]] * 4:
+                    self.session.add_player(DeafInteractor(messages))
+
+        with mock.patch.object(self.session, "prompt_map", side_effect=late_players):
+            self.session.choose_game()
+        self.assertEqual(self.session.current_game.game_map.name, "correct_map")
+
+
+if __name__ == '__main__':
+    unittest.main()